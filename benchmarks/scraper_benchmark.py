@@ -0,0 +1,275 @@
+"""Benchmark the recruiter extraction paths against locally served search result pages.
+
+Serves the checked-in captured pages plus synthetic pages with a configurable number
+of cards from a local HTTP server, then times each extraction path on each page and
+reports cards/sec, browser round trips and peak RSS. Every measurement runs in a fresh
+process so peak RSS belongs to that path alone.
+
+    python -m benchmarks.scraper_benchmark
+    python -m benchmarks.scraper_benchmark --backend playwright --cards 10,100 --paths batch,html
+"""
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import argparse
+import resource
+import tempfile
+import threading
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+FIXTURE_PAGES = ['search_page.html', 'page_source_1.html']
+BROWSER_PATHS = ['element', 'batch', 'alternative', 'html']
+ALL_PATHS = ['parser'] + BROWSER_PATHS
+
+CARD_TEMPLATE = """
+<li class="reusable-search__result-container">
+  <div class="entity-result">
+    <span class="entity-result__title-text">
+      <a class="app-aware-link" href="https://www.linkedin.com/in/candidate-{i}?miniProfileUrn=x">
+        <span aria-hidden="true">{name}</span>
+      </a>
+    </span>
+    <div class="entity-result__primary-subtitle">{role}</div>
+    <div class="entity-result__secondary-subtitle">Company {company}</div>
+  </div>
+</li>"""
+
+ROLES = ['Technical Recruiter', 'Talent Acquisition Partner', 'Data Engineer', 'HR Business Partner']
+
+
+def synthetic_page(card_count: int) -> str:
+    """Build a results page with card_count cards; every tenth card has no name to exercise fallbacks"""
+    cards = []
+    for i in range(card_count):
+        name = '' if i % 10 == 9 else f'Candidate {i}'
+        cards.append(CARD_TEMPLATE.format(i=i, name=name, role=ROLES[i % len(ROLES)], company=i % 50))
+    return (
+        '<html><body><div class="search-results-container"><ul>'
+        + ''.join(cards)
+        + '</ul></div></body></html>'
+    )
+
+
+def count_cards(html: str) -> int:
+    import lxml.html
+    from lxml.cssselect import CSSSelector
+    from crawler.card_selectors import CARD_SELECTORS
+
+    document = lxml.html.fromstring(html)
+    return max(len(CSSSelector(selector)(document)) for selector in CARD_SELECTORS)
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@contextlib.contextmanager
+def serve_directory(directory: str):
+    """Serve directory over HTTP on a free local port"""
+    handler = partial(_QuietHandler, directory=directory)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _selenium_backend():
+    from selenium import webdriver
+    from crawler.browser_backends import SeleniumBackend
+
+    def driver_factory():
+        options = webdriver.ChromeOptions()
+        options.add_argument('--headless=new')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        return webdriver.Chrome(options=options)
+
+    return SeleniumBackend(driver_factory)
+
+
+def _count_round_trips(backend):
+    """Wrap the backend's transport so every browser round trip is counted"""
+    counter = {'round_trips': 0}
+
+    if getattr(backend, 'driver', None):
+        # Every WebDriver and WebElement command goes through driver.execute
+        execute = backend.driver.execute
+
+        def counting_execute(*args, **kwargs):
+            counter['round_trips'] += 1
+            return execute(*args, **kwargs)
+
+        backend.driver.execute = counting_execute
+    else:
+        page = backend.page
+        for method in ('evaluate', 'content', 'locator', 'screenshot', 'wait_for_selector', 'wait_for_function'):
+            original = getattr(page, method)
+
+            def counting(*args, _original=original, **kwargs):
+                counter['round_trips'] += 1
+                return _original(*args, **kwargs)
+
+            setattr(page, method, counting)
+
+    return counter
+
+
+def run_case(path: str, url: str, local_file: str, backend_name: str, repeat: int) -> dict:
+    """Time one extraction path on one page; runs in its own process"""
+    with open(local_file, 'r', encoding='utf-8') as f:
+        html = f.read()
+    cards = count_cards(html)
+
+    result = {'path': path, 'page': os.path.basename(local_file), 'cards': cards, 'round_trips': 0}
+    sink = io.StringIO()
+
+    if path == 'parser':
+        from crawler.html_parser import parse_search_results
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(sink):
+            for _ in range(repeat):
+                recruiters = parse_search_results(html)
+        elapsed = (time.perf_counter() - start) / repeat
+    else:
+        from crawler.browser_backends import create_backend
+        from crawler.card_selectors import CARD_SELECTORS
+        from crawler.linkedin_scraper import LinkedInScraper
+        from crawler.page_readiness import PacingPolicy
+        from crawler.selector_stats import SelectorRegistry
+
+        backend = _selenium_backend() if backend_name == 'selenium' else create_backend(backend_name)
+        backend.start()
+        try:
+            backend.goto(url)
+
+            scraper = LinkedInScraper(backend=backend_name)
+            scraper.backend = backend
+            scraper.driver = getattr(backend, 'driver', None)
+            scraper.readiness = backend
+            scraper.pacing = PacingPolicy(enabled=False)
+            # Keep benchmark lookups out of the real selector statistics
+            scraper.selector_registry = SelectorRegistry(os.path.join(tempfile.gettempdir(), 'benchmark_selector_stats.json'))
+
+            if path == 'element' and not scraper.driver:
+                return dict(result, skipped='element path needs the selenium backend')
+
+            def parse_html():
+                from crawler.html_parser import parse_search_results
+                return parse_search_results(backend.page_source())
+
+            extract = {
+                'element': lambda: scraper._extract_cards_by_element(CARD_SELECTORS[0])[1],
+                'batch': lambda: scraper._extract_cards_batch(CARD_SELECTORS[0])[1],
+                'alternative': lambda: scraper._extract_recruiters_alternative()[1],
+                'html': parse_html
+            }[path]
+
+            counter = _count_round_trips(backend)
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(sink):
+                for _ in range(repeat):
+                    recruiters = extract()
+            elapsed = (time.perf_counter() - start) / repeat
+            result['round_trips'] = counter['round_trips'] // repeat
+        finally:
+            backend.close()
+
+    result.update({
+        'recruiters': len(recruiters),
+        'seconds': elapsed,
+        'cards_per_sec': cards / elapsed if elapsed and cards else 0.0,
+        'peak_rss_mb': _peak_rss_mb()
+    })
+    return result
+
+
+def prepare_pages(directory: str, card_counts) -> list:
+    """Copy the fixture pages and write synthetic pages into directory"""
+    pages = []
+    for name in FIXTURE_PAGES:
+        source = os.path.join(ROOT_DIR, name)
+        if os.path.exists(source):
+            shutil.copy(source, os.path.join(directory, name))
+            pages.append(name)
+    for count in card_counts:
+        name = f'synthetic_{count}.html'
+        with open(os.path.join(directory, name), 'w', encoding='utf-8') as f:
+            f.write(synthetic_page(count))
+        pages.append(name)
+    return pages
+
+
+def print_report(results):
+    header = f"{'path':<12}{'page':<24}{'cards':>7}{'found':>7}{'ms':>10}{'cards/s':>11}{'trips':>8}{'rss MB':>9}"
+    print(header)
+    print('-' * len(header))
+    for row in results:
+        if row.get('skipped'):
+            print(f"{row['path']:<12}{row['page']:<24}  skipped: {row['skipped']}")
+            continue
+        print(
+            f"{row['path']:<12}{row['page']:<24}{row['cards']:>7}{row['recruiters']:>7}"
+            f"{row['seconds'] * 1000:>10.1f}{row['cards_per_sec']:>11.0f}{row['round_trips']:>8}{row['peak_rss_mb']:>9.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend', default='selenium', choices=['selenium', 'playwright'])
+    parser.add_argument('--paths', default=','.join(ALL_PATHS), help='comma separated subset of ' + ','.join(ALL_PATHS))
+    parser.add_argument('--cards', default='10,100,1000', help='synthetic page sizes')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--json', help='also write results to this file')
+    args = parser.parse_args()
+
+    paths = [path for path in args.paths.split(',') if path]
+    card_counts = [int(count) for count in args.cards.split(',') if count]
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        pages = prepare_pages(directory, card_counts)
+        with serve_directory(directory) as base_url:
+            context = multiprocessing.get_context('spawn')
+            for path in paths:
+                for page in pages:
+                    # One process per case so peak RSS is not inherited from earlier cases
+                    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                        future = executor.submit(
+                            run_case, path, f"{base_url}/{page}", os.path.join(directory, page), args.backend, args.repeat
+                        )
+                        try:
+                            results.append(future.result())
+                        except Exception as e:
+                            results.append({'path': path, 'page': page, 'skipped': str(e).splitlines()[0]})
+
+    print_report(results)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""Benchmark per-message SMTP connections against the shared session manager.
+
+Starts a local aiosmtpd server (optionally with STARTTLS and AUTH, using a throwaway
+self-signed certificate made with the openssl CLI) and sends the same messages
+twice: once opening a new connection per message as EmailSender used to, and once
+through SMTPSessionManager. Reports messages/sec, connections opened and the speedup.
+
+    python -m benchmarks.smtp_benchmark
+    python -m benchmarks.smtp_benchmark --messages 500 --tls --latency-ms 20
+"""
+import os
+import sys
+import ssl
+import socket
+import time
+import argparse
+import warnings
+import smtplib
+import tempfile
+import subprocess
+import contextlib
+from email.mime.text import MIMEText
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+USERNAME = 'bench'
+PASSWORD = 'bench'
+
+
+class _SinkHandler:
+    def __init__(self):
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return '250 OK'
+
+
+def _authenticator(server, session, envelope, mechanism, auth_data):
+    from aiosmtpd.smtp import AuthResult
+    return AuthResult(success=auth_data.login == USERNAME.encode() and auth_data.password == PASSWORD.encode())
+
+
+def _self_signed_context(directory: str) -> ssl.SSLContext:
+    cert = os.path.join(directory, 'cert.pem')
+    key = os.path.join(directory, 'key.pem')
+    subprocess.run(
+        ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+         '-subj', '/CN=localhost', '-keyout', key, '-out', cert],
+        check=True, capture_output=True
+    )
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert, key)
+    return context
+
+
+def _free_port() -> int:
+    # aiosmtpd's Controller cannot bind port 0 itself
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def smtp_server(tls: bool):
+    """Run a local SMTP sink; with tls it requires STARTTLS and AUTH like Gmail does"""
+    from aiosmtpd.controller import Controller
+
+    handler = _SinkHandler()
+    with tempfile.TemporaryDirectory() as directory:
+        kwargs = {}
+        if tls:
+            kwargs = {
+                'tls_context': _self_signed_context(directory),
+                'require_starttls': True,
+                'authenticator': _authenticator,
+                'auth_require_tls': True
+            }
+        controller = Controller(handler, hostname='127.0.0.1', port=_free_port(), **kwargs)
+        controller.start()
+        try:
+            yield controller.hostname, controller.port, handler
+        finally:
+            controller.stop()
+
+
+def _messages(count: int):
+    for i in range(count):
+        msg = MIMEText(f"Benchmark message {i}\n" * 20)
+        msg['From'] = 'bench@example.com'
+        msg['To'] = f'recruiter{i}@example.com'
+        msg['Subject'] = f'Benchmark {i}'
+        yield msg
+
+
+def _with_latency(latency: float):
+    """Delay every client command to emulate the round trip to a remote server"""
+    if not latency:
+        return contextlib.nullcontext()
+
+    original = smtplib.SMTP.send
+
+    def delayed_send(self, s):
+        time.sleep(latency)
+        return original(self, s)
+
+    return _patched(smtplib.SMTP, 'send', delayed_send)
+
+
+@contextlib.contextmanager
+def _patched(owner, name, value):
+    original = getattr(owner, name)
+    setattr(owner, name, value)
+    try:
+        yield
+    finally:
+        setattr(owner, name, original)
+
+
+def send_per_connection(host, port, tls, count) -> dict:
+    """The old EmailSender behaviour: connect, STARTTLS and log in for every message"""
+    start = time.perf_counter()
+    for msg in _messages(count):
+        with smtplib.SMTP(host, port) as server:
+            if tls:
+                server.starttls()
+                server.login(USERNAME, PASSWORD)
+            server.send_message(msg)
+    return {'mode': 'per-message', 'seconds': time.perf_counter() - start, 'connects': count}
+
+
+def send_pooled(host, port, tls, count) -> dict:
+    from email_sender.smtp_pool import SMTPSessionManager
+
+    manager = SMTPSessionManager(
+        host, port, username=USERNAME if tls else None, password=PASSWORD, use_tls=tls
+    )
+    start = time.perf_counter()
+    for msg in _messages(count):
+        manager.send_message(msg)
+    manager.close()
+    return {'mode': 'pooled', 'seconds': time.perf_counter() - start, 'connects': manager.stats['connects']}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=200)
+    parser.add_argument('--tls', action='store_true', help='require STARTTLS and AUTH (needs the openssl CLI)')
+    parser.add_argument('--latency-ms', type=float, default=0, help='simulated network delay per client command')
+    args = parser.parse_args()
+
+    latency = args.latency_ms / 1000
+    # aiosmtpd warns about its own deprecated attribute on every AUTH
+    warnings.filterwarnings('ignore', message='Session.login_data')
+    results = []
+    # smtplib's starttls() does not verify certificates by default, so the self-signed one is accepted
+    with smtp_server(args.tls) as (host, port, handler), _with_latency(latency):
+        for send in (send_per_connection, send_pooled):
+            results.append(send(host, port, args.tls, args.messages))
+
+    print(f"{'mode':<14}{'messages':>10}{'seconds':>10}{'msg/s':>10}{'connects':>10}")
+    for row in results:
+        print(f"{row['mode']:<14}{args.messages:>10}{row['seconds']:>10.2f}"
+              f"{args.messages / row['seconds']:>10.0f}{row['connects']:>10}")
+    print(f"speedup: {results[0]['seconds'] / results[1]['seconds']:.1f}x ({handler.received} messages received)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,381 @@
+from abc import ABC, abstractmethod
+from typing import Callable, List, Dict, Optional
+
+from crawler.card_selectors import BATCH_EXTRACT_SCRIPT
+from crawler.page_readiness import PageReadiness, RESULTS_CONTAINER_SELECTOR, LOADER_SELECTOR
+
+
+class BrowserBackend(ABC):
+    """Page-level browser operations the scraper needs, independent of the automation library.
+
+    Waits return True as soon as their condition holds and False on timeout, so a
+    backend can be used wherever the scraper expects a PageReadiness.
+    """
+
+    @abstractmethod
+    def start(self):
+        """Launch the browser"""
+
+    @abstractmethod
+    def goto(self, url: str):
+        """Navigate to url and wait for the document to load"""
+
+    @property
+    @abstractmethod
+    def current_url(self) -> str:
+        """URL of the current page"""
+
+    @abstractmethod
+    def execute_script(self, script: str, *args):
+        """Run a function body in the page; arguments are available as `arguments`"""
+
+    @abstractmethod
+    def wait_for_document_ready(self, timeout: float = None) -> bool:
+        """Wait until the document has finished loading"""
+
+    @abstractmethod
+    def wait_for_url_change(self, old_url: str, timeout: float = None) -> bool:
+        """Wait until the browser has navigated away from old_url"""
+
+    @abstractmethod
+    def wait_for_selector(self, selector: str, timeout: float = None) -> bool:
+        """Wait until an element matching selector is present"""
+
+    @abstractmethod
+    def wait_for_results(self, timeout: float = None) -> bool:
+        """Wait for the search results container to be present and the loader to be gone"""
+
+    @abstractmethod
+    def wait_for_stable_height(self, timeout: float = None, stable_polls: int = 2) -> bool:
+        """Wait until document scrollHeight stops changing"""
+
+    @abstractmethod
+    def extract_cards(self, card_selector: str, name_selectors: List[str], role_selectors: List[str],
+                      company_selectors: List[str], link_selector: str) -> List[Dict]:
+        """Extract every card matched by card_selector in one in-page call (see BATCH_EXTRACT_SCRIPT)"""
+
+    @abstractmethod
+    def next_page(self, selectors: List[str], before_click: Callable[[], None] = None) -> Optional[str]:
+        """Click the first visible, enabled next-page control; return the selector used or None"""
+
+    @abstractmethod
+    def screenshot(self) -> bytes:
+        """PNG screenshot of the viewport"""
+
+    @abstractmethod
+    def page_source(self) -> str:
+        """Current DOM serialized as HTML"""
+
+    @abstractmethod
+    def get_cookies(self) -> List[Dict]:
+        """Session cookies in Selenium's format, so cookie jars work with every backend"""
+
+    @abstractmethod
+    def add_cookies(self, cookies: List[Dict]):
+        """Add cookies in Selenium's format for the current domain"""
+
+    @abstractmethod
+    def is_alive(self) -> bool:
+        """Check whether the browser still responds"""
+
+    @abstractmethod
+    def close(self):
+        """Shut the browser down"""
+
+
+class SeleniumBackend(BrowserBackend):
+    """Backend on top of a Selenium WebDriver (undetected-chromedriver by default)"""
+
+    def __init__(self, driver_factory: Callable, timeout: float = 15):
+        self.driver_factory = driver_factory
+        self.timeout = timeout
+        self.driver = None
+        self._readiness = None
+
+    def start(self):
+        if not self.driver:
+            self.driver = self.driver_factory()
+            self._readiness = PageReadiness(self.driver, self.timeout)
+
+    def goto(self, url: str):
+        self.driver.get(url)
+        self.wait_for_document_ready()
+
+    @property
+    def current_url(self) -> str:
+        return self.driver.current_url
+
+    def execute_script(self, script: str, *args):
+        return self.driver.execute_script(script, *args)
+
+    def wait_for_document_ready(self, timeout: float = None) -> bool:
+        return self._readiness.wait_for_document_ready(timeout)
+
+    def wait_for_url_change(self, old_url: str, timeout: float = None) -> bool:
+        return self._readiness.wait_for_url_change(old_url, timeout)
+
+    def wait_for_selector(self, selector: str, timeout: float = None) -> bool:
+        return self._readiness.wait_for_selector(selector, timeout)
+
+    def wait_for_results(self, timeout: float = None) -> bool:
+        return self._readiness.wait_for_results(timeout)
+
+    def wait_for_stable_height(self, timeout: float = None, stable_polls: int = 2) -> bool:
+        return self._readiness.wait_for_stable_height(timeout, stable_polls)
+
+    def extract_cards(self, card_selector, name_selectors, role_selectors, company_selectors, link_selector):
+        # Unparsed cards come back as WebElements for the per-element fallback
+        return self.driver.execute_script(
+            BATCH_EXTRACT_SCRIPT,
+            card_selector,
+            name_selectors,
+            role_selectors,
+            company_selectors,
+            link_selector,
+            True
+        ) or []
+
+    def next_page(self, selectors, before_click=None):
+        from selenium.webdriver.common.by import By
+
+        for selector in selectors:
+            try:
+                for button in self.driver.find_elements(By.CSS_SELECTOR, selector):
+                    if button.is_displayed() and button.is_enabled():
+                        self.driver.execute_script("arguments[0].scrollIntoView(true);", button)
+                        if before_click:
+                            before_click()
+                        button.click()
+                        return selector
+            except Exception as e:
+                print(f"Error with next button selector {selector}: {str(e)}")
+        return None
+
+    def screenshot(self) -> bytes:
+        return self.driver.get_screenshot_as_png()
+
+    def page_source(self) -> str:
+        return self.driver.page_source
+
+    def get_cookies(self) -> List[Dict]:
+        return self.driver.get_cookies()
+
+    def add_cookies(self, cookies: List[Dict]):
+        for cookie in cookies:
+            cookie = dict(cookie)
+            cookie.pop('sameSite', None)
+            try:
+                self.driver.add_cookie(cookie)
+            except Exception:
+                continue
+
+    def is_alive(self) -> bool:
+        if not self.driver:
+            return False
+        try:
+            self.driver.execute_script("return document.readyState")
+            return True
+        except Exception:
+            return False
+
+    def close(self):
+        if self.driver:
+            try:
+                self.driver.quit()
+            finally:
+                self.driver = None
+                self._readiness = None
+
+
+# Runs a Selenium-style function body (using `arguments`) through page.evaluate
+_EVALUATE_WRAPPER = "([script, args]) => new Function(script).apply(null, args)"
+
+_STABLE_HEIGHT_SCRIPT = """(stablePolls) => {
+    const height = document.body.scrollHeight;
+    if (window.__scraperLastHeight === height) {
+        window.__scraperStablePolls = (window.__scraperStablePolls || 0) + 1;
+    } else {
+        window.__scraperLastHeight = height;
+        window.__scraperStablePolls = 0;
+    }
+    return window.__scraperStablePolls >= stablePolls;
+}"""
+
+
+class PlaywrightBackend(BrowserBackend):
+    """Backend on top of Playwright's sync API.
+
+    Uses one lightweight browser context per backend; Playwright's auto-waiting
+    replaces explicit polling for clicks and selectors.
+    """
+
+    def __init__(self, headless: bool = True, user_agent: str = None, timeout: float = 15,
+                 executable_path: str = None):
+        self.headless = headless
+        self.user_agent = user_agent
+        self.timeout = timeout
+        # A locally installed Chromium instead of the one `playwright install` downloads
+        self.executable_path = executable_path
+        self.page = None
+        self._playwright = None
+        self._browser = None
+        self._context = None
+
+    def _ms(self, timeout: Optional[float]) -> float:
+        return (timeout or self.timeout) * 1000
+
+    def start(self):
+        if self.page:
+            return
+        from playwright.sync_api import sync_playwright
+
+        self._playwright = sync_playwright().start()
+        self._browser = self._playwright.chromium.launch(
+            headless=self.headless,
+            executable_path=self.executable_path,
+            args=['--disable-blink-features=AutomationControlled']
+        )
+        self._context = self._browser.new_context(
+            user_agent=self.user_agent,
+            viewport={'width': 1920, 'height': 1080}
+        )
+        self.page = self._context.new_page()
+        self.page.set_default_timeout(self._ms(None))
+
+    def goto(self, url: str):
+        self.page.goto(url, wait_until='load')
+
+    @property
+    def current_url(self) -> str:
+        return self.page.url
+
+    def execute_script(self, script: str, *args):
+        return self.page.evaluate(_EVALUATE_WRAPPER, [script, list(args)])
+
+    def _try(self, wait: Callable[[], object]) -> bool:
+        from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+        try:
+            wait()
+            return True
+        except PlaywrightTimeoutError:
+            return False
+
+    def wait_for_document_ready(self, timeout: float = None) -> bool:
+        return self._try(lambda: self.page.wait_for_load_state('load', timeout=self._ms(timeout)))
+
+    def wait_for_url_change(self, old_url: str, timeout: float = None) -> bool:
+        return self._try(lambda: self.page.wait_for_url(lambda url: url != old_url, timeout=self._ms(timeout)))
+
+    def wait_for_selector(self, selector: str, timeout: float = None) -> bool:
+        return self._try(lambda: self.page.wait_for_selector(selector, state='attached', timeout=self._ms(timeout)))
+
+    def wait_for_results(self, timeout: float = None) -> bool:
+        return (
+            self.wait_for_selector(RESULTS_CONTAINER_SELECTOR, timeout)
+            and self._try(lambda: self.page.wait_for_selector(LOADER_SELECTOR, state='detached', timeout=self._ms(timeout)))
+        )
+
+    def wait_for_stable_height(self, timeout: float = None, stable_polls: int = 2) -> bool:
+        self.page.evaluate("() => { window.__scraperLastHeight = null; window.__scraperStablePolls = 0; }")
+        return self._try(lambda: self.page.wait_for_function(
+            _STABLE_HEIGHT_SCRIPT, arg=stable_polls, polling=250, timeout=self._ms(timeout)
+        ))
+
+    def extract_cards(self, card_selector, name_selectors, role_selectors, company_selectors, link_selector):
+        # DOM nodes cannot cross page.evaluate, so unparsed cards carry no element
+        return self.execute_script(
+            BATCH_EXTRACT_SCRIPT,
+            card_selector,
+            name_selectors,
+            role_selectors,
+            company_selectors,
+            link_selector,
+            False
+        ) or []
+
+    def next_page(self, selectors, before_click=None):
+        for selector in selectors:
+            try:
+                buttons = self.page.locator(selector)
+                for i in range(buttons.count()):
+                    button = buttons.nth(i)
+                    if button.is_visible() and button.is_enabled():
+                        button.scroll_into_view_if_needed()
+                        if before_click:
+                            before_click()
+                        button.click()
+                        return selector
+            except Exception as e:
+                print(f"Error with next button selector {selector}: {str(e)}")
+        return None
+
+    def screenshot(self) -> bytes:
+        return self.page.screenshot()
+
+    def page_source(self) -> str:
+        return self.page.content()
+
+    def get_cookies(self) -> List[Dict]:
+        cookies = []
+        for cookie in self._context.cookies():
+            converted = {
+                'name': cookie['name'],
+                'value': cookie['value'],
+                'domain': cookie['domain'],
+                'path': cookie['path'],
+                'secure': cookie['secure'],
+                'httpOnly': cookie['httpOnly']
+            }
+            if cookie.get('expires', -1) > 0:
+                converted['expiry'] = int(cookie['expires'])
+            cookies.append(converted)
+        return cookies
+
+    def add_cookies(self, cookies: List[Dict]):
+        converted = []
+        for cookie in cookies:
+            entry = {
+                'name': cookie['name'],
+                'value': cookie['value'],
+                'domain': cookie.get('domain') or '.linkedin.com',
+                'path': cookie.get('path', '/'),
+                'secure': cookie.get('secure', False),
+                'httpOnly': cookie.get('httpOnly', False)
+            }
+            if cookie.get('expiry'):
+                entry['expires'] = cookie['expiry']
+            converted.append(entry)
+        self._context.add_cookies(converted)
+
+    def is_alive(self) -> bool:
+        if not self.page or self.page.is_closed():
+            return False
+        try:
+            self.page.evaluate("() => document.readyState")
+            return True
+        except Exception:
+            return False
+
+    def close(self):
+        try:
+            if self._context:
+                self._context.close()
+            if self._browser:
+                self._browser.close()
+        finally:
+            if self._playwright:
+                self._playwright.stop()
+            self.page = None
+            self._context = None
+            self._browser = None
+            self._playwright = None
+
+
+def create_backend(name: str, **kwargs) -> BrowserBackend:
+    """Create a backend by name ('selenium' or 'playwright')"""
+    if name == 'selenium':
+        return SeleniumBackend(**kwargs)
+    if name == 'playwright':
+        return PlaywrightBackend(**kwargs)
+    raise ValueError(f"Unknown browser backend: {name}")
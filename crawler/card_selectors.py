@@ -0,0 +1,92 @@
+"""CSS selectors used to locate recruiter data inside LinkedIn search result cards.
+
+The selenium extraction paths and the in-page JavaScript extraction share these
+lists so that every extraction mode looks for the same elements in the same order.
+"""
+
+CARD_SELECTORS = [
+    '.reusable-search__result-container',
+    '.search-results-container .reusable-search__result-container',
+    '.search-results-container .ember-view.reusable-search__result-container',
+    '.scaffold-layout__list .reusable-search__result-container',
+    '.search-results__list .ember-view'
+]
+
+NAME_SELECTORS = [
+    '.entity-result__title-text a span[aria-hidden="true"]',
+    '.entity-result__title-text a span',
+    '.app-aware-link span[aria-hidden="true"]',
+    '.entity-result__title-line a span'
+]
+
+ROLE_SELECTORS = [
+    '.entity-result__primary-subtitle',
+    '.entity-result__summary.entity-result__primary-subtitle',
+    '.primary-subtitle'
+]
+
+COMPANY_SELECTORS = [
+    '.entity-result__secondary-subtitle',
+    '.entity-result__summary.entity-result__secondary-subtitle',
+    '.secondary-subtitle'
+]
+
+PROFILE_LINK_SELECTOR = '.app-aware-link'
+
+NEXT_PAGE_SELECTORS = [
+    'button.artdeco-pagination__button--next',
+    'li.artdeco-pagination__indicator--number.active + li a',
+    'a[aria-label="Next"]',
+    'button[aria-label="Next"]'
+]
+
+RECRUITER_KEYWORDS = ['recruit', 'talent', 'hr', 'hiring', 'people', 'acquisition', 'sourcing']
+
+# Extracts every card matched by arguments[0] in a single round trip.
+# Returns one entry per card, including which selector matched each field
+# under ``hits``; cards without a name or profile URL are returned with
+# ``parsed: false`` and, when arguments[5] is true, the card element so the
+# caller can fall back to the per-element extraction path.
+BATCH_EXTRACT_SCRIPT = """
+const [cardSelector, nameSelectors, roleSelectors, companySelectors, linkSelector, includeElements] = arguments;
+
+function firstText(card, selectors) {
+    for (const selector of selectors) {
+        const el = card.querySelector(selector);
+        const text = el ? (el.innerText || '').trim() : '';
+        if (text) {
+            return [text, selector];
+        }
+    }
+    return ['', null];
+}
+
+const results = [];
+document.querySelectorAll(cardSelector).forEach(card => {
+    try {
+        const [name, nameHit] = firstText(card, nameSelectors);
+        const link = card.querySelector(linkSelector);
+        const profileUrl = link && link.href ? link.href.split('?')[0] : '';
+
+        if (!name || !profileUrl) {
+            results.push({parsed: false, element: includeElements ? card : null});
+            return;
+        }
+
+        const [role, roleHit] = firstText(card, roleSelectors);
+        const [company, companyHit] = firstText(card, companySelectors);
+        results.push({
+            parsed: true,
+            name: name,
+            role: role,
+            company: company,
+            profile_url: profileUrl,
+            hits: {name: nameHit, role: roleHit, company: companyHit}
+        });
+    } catch (e) {
+        results.push({parsed: false, element: includeElements ? card : null});
+    }
+});
+
+return results;
+"""
@@ -0,0 +1,133 @@
+import os
+import glob
+import gzip
+import queue
+import random
+import hashlib
+import threading
+from typing import Optional
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional, gzip is always available
+    zstandard = None
+
+
+def _env_flag(name: str, default: str = 'false') -> bool:
+    return os.getenv(name, default).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+class ArtifactWriter:
+    """Captures debug screenshots and page sources without blocking navigation.
+
+    Capturing only grabs the bytes from the browser; compression and disk I/O happen
+    on a background writer thread fed by a bounded queue. If the queue is full the
+    artifact is dropped rather than stalling the scraper. Files are named by content
+    hash, so identical pages are stored once, and only the newest max_files are kept.
+
+    Disabled unless SCRAPER_DEBUG_ARTIFACTS is set; SCRAPER_DEBUG_SAMPLE_RATE controls
+    what fraction of routine captures is kept.
+    """
+
+    def __init__(self, directory: Optional[str] = None, enabled: Optional[bool] = None,
+                 sample_rate: Optional[float] = None, max_files: Optional[int] = None,
+                 queue_size: int = 50):
+        self.directory = directory or os.getenv('SCRAPER_DEBUG_DIR', 'debug_artifacts')
+        self.enabled = _env_flag('SCRAPER_DEBUG_ARTIFACTS') if enabled is None else enabled
+        self.sample_rate = float(os.getenv('SCRAPER_DEBUG_SAMPLE_RATE', '1.0')) if sample_rate is None else sample_rate
+        self.max_files = int(os.getenv('SCRAPER_DEBUG_MAX_FILES', '200')) if max_files is None else max_files
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def should_capture(self, force: bool = False) -> bool:
+        """Decide whether to capture; force skips sampling but never enables a disabled writer"""
+        if not self.enabled:
+            return False
+        return force or random.random() < self.sample_rate
+
+    def capture(self, backend, name: str, screenshot: bool = True, page_source: bool = False, force: bool = False):
+        """Grab a screenshot and/or page source from a browser backend and queue them for writing"""
+        if not backend or not self.should_capture(force):
+            return
+
+        try:
+            if screenshot:
+                self._enqueue(name, 'png', backend.screenshot())
+            if page_source:
+                self._enqueue(name, 'html', backend.page_source().encode('utf-8'))
+        except Exception as e:
+            print(f"Error capturing debug artifact {name}: {str(e)}")
+
+    def _enqueue(self, name: str, kind: str, data: bytes):
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait((name, kind, data))
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='artifact-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._write(*item)
+            except Exception as e:
+                print(f"Error writing debug artifact: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def _compress(self, data: bytes):
+        if zstandard is not None:
+            return zstandard.ZstdCompressor(level=3).compress(data), 'zst'
+        return gzip.compress(data, compresslevel=6), 'gz'
+
+    def _write(self, name: str, kind: str, data: bytes):
+        digest = hashlib.sha256(data).hexdigest()[:16]
+        if kind == 'html':
+            # Screenshots are already compressed; page sources shrink ~10x
+            data, suffix = self._compress(data)
+            filename = f"{name}-{digest}.html.{suffix}"
+        else:
+            filename = f"{name}-{digest}.{kind}"
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, filename)
+        if os.path.exists(path):
+            return
+
+        with open(path, 'wb') as f:
+            f.write(data)
+        self._prune()
+
+    def _prune(self):
+        """Delete the oldest artifacts beyond the retention limit"""
+        paths = glob.glob(os.path.join(self.directory, '*'))
+        if len(paths) <= self.max_files:
+            return
+        paths.sort(key=os.path.getmtime)
+        for path in paths[:len(paths) - self.max_files]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def flush(self):
+        """Block until every queued artifact has been written"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def close(self):
+        """Write out pending artifacts and stop the writer thread"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._thread = None
@@ -0,0 +1,178 @@
+import os
+import glob
+import time
+import json
+import urllib.parse
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Optional, Tuple
+
+import lxml.html
+from lxml.cssselect import CSSSelector
+
+from crawler.card_selectors import (
+    CARD_SELECTORS,
+    NAME_SELECTORS,
+    ROLE_SELECTORS,
+    COMPANY_SELECTORS,
+    PROFILE_LINK_SELECTOR,
+    RECRUITER_KEYWORDS
+)
+
+LINKEDIN_BASE_URL = 'https://www.linkedin.com'
+
+# Compile every selector once per process
+_compiled = {}
+
+
+def _selector(css: str) -> CSSSelector:
+    if css not in _compiled:
+        _compiled[css] = CSSSelector(css)
+    return _compiled[css]
+
+
+def _element_text(element) -> str:
+    """Approximate the rendered text of an element by collapsing whitespace"""
+    return ' '.join(element.text_content().split())
+
+
+def _first_text(card, group: str, selectors: List[str], registry=None) -> Optional[str]:
+    if registry:
+        selectors = registry.ordered(group, selectors)
+
+    for selector in selectors:
+        for element in _selector(selector)(card):
+            text = _element_text(element)
+            if text:
+                if registry:
+                    registry.record_attempts(group, selectors, selector)
+                return text
+            break
+
+    if registry:
+        registry.record_attempts(group, selectors, None)
+    return None
+
+
+def build_recruiter(name: str, role: str, company: str, profile_url: str) -> Optional[Dict]:
+    """Build a recruiter record, or return None if the profile is not a recruiter"""
+    if not name or not profile_url:
+        return None
+
+    role = role or "Unknown Role"
+    company = company or "Unknown Company"
+
+    # Check if this is a recruiter
+    if any(keyword in role.lower() for keyword in RECRUITER_KEYWORDS):
+        return {
+            'name': name,
+            'role': role,
+            'company': company,
+            'profile_url': profile_url,
+            'status': 'pending',
+            'created_at': time.time()
+        }
+
+    return None
+
+
+def parse_card(card, registry=None, is_known=None) -> Optional[Dict]:
+    """Extract recruiter data from a single parsed card element
+
+    is_known(name, company, profile_url) can be given to skip profiles stored by earlier runs.
+    """
+    name = _first_text(card, 'name', NAME_SELECTORS, registry)
+    if not name:
+        return None
+
+    role = _first_text(card, 'role', ROLE_SELECTORS, registry)
+    company = _first_text(card, 'company', COMPANY_SELECTORS, registry)
+
+    profile_url = None
+    for link in _selector(PROFILE_LINK_SELECTOR)(card):
+        href = link.get('href')
+        if href:
+            # Clean up the URL
+            profile_url = urllib.parse.urljoin(LINKEDIN_BASE_URL, href).split('?')[0]
+        break
+
+    if is_known and is_known(name, company, profile_url):
+        return None
+
+    return build_recruiter(name, role, company, profile_url)
+
+
+def parse_search_page(html: str, registry=None, is_known=None) -> Tuple[int, List[Dict]]:
+    """Parse a LinkedIn people search results page into (cards matched, recruiter records)
+
+    The card count includes cards dropped as known profiles or non-recruiters, so a
+    page of only known profiles still shows it had results. An optional
+    SelectorRegistry orders the fallback selectors and records hits.
+    """
+    recruiters = []
+    if not html:
+        return 0, recruiters
+
+    document = lxml.html.fromstring(html)
+
+    # Use the first card selector that matches any cards, like the live scraper
+    card_selectors = registry.ordered('card', CARD_SELECTORS) if registry else CARD_SELECTORS
+    for selector in card_selectors:
+        cards = _selector(selector)(document)
+        for card in cards:
+            try:
+                recruiter_data = parse_card(card, registry, is_known)
+                if recruiter_data:
+                    recruiters.append(recruiter_data)
+            except Exception as e:
+                print(f"Error parsing card: {str(e)}")
+                continue
+
+        # A selector that found cards worked, whatever the cards turned out to hold
+        if registry:
+            registry.record('card', selector, bool(cards))
+        if cards:
+            return len(cards), recruiters
+
+    return 0, recruiters
+
+
+def parse_search_results(html: str, registry=None, is_known=None) -> List[Dict]:
+    """Parse a LinkedIn people search results page into recruiter records
+
+    An optional SelectorRegistry orders the fallback selectors and records hits.
+    """
+    return parse_search_page(html, registry, is_known)[1]
+
+
+def parse_file(path: str) -> List[Dict]:
+    """Parse a saved search results page from disk"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_search_results(f.read())
+
+
+def parse_directory(directory: str, pattern: str = '*.html', max_workers: Optional[int] = None) -> Dict[str, List[Dict]]:
+    """Reparse every saved page in a directory across a process pool"""
+    paths = sorted(glob.glob(os.path.join(directory, pattern)))
+    results = {}
+    if not paths:
+        return results
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for path, recruiters in zip(paths, executor.map(parse_file, paths)):
+            results[path] = recruiters
+
+    return results
+
+
+# Example usage
+if __name__ == "__main__":
+    import sys
+
+    directory = sys.argv[1] if len(sys.argv) > 1 else '.'
+    parsed = parse_directory(directory)
+
+    for path, recruiters in parsed.items():
+        print(f"{path}: {len(recruiters)} recruiters")
+
+    with open('parsed_recruiters.json', 'w', encoding='utf-8') as f:
+        json.dump(parsed, f, indent=2)
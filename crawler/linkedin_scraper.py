@@ -3,7 +3,7 @@ import random
 import os
 import urllib.parse
 import re
-from typing import List, Dict
+from typing import List, Dict, Iterator
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -14,10 +14,37 @@ from undetected_chromedriver import Chrome, ChromeOptions
 from dotenv import load_dotenv
 import json
 
+from crawler.card_selectors import (
+    CARD_SELECTORS,
+    NAME_SELECTORS,
+    ROLE_SELECTORS,
+    COMPANY_SELECTORS,
+    PROFILE_LINK_SELECTOR,
+    NEXT_PAGE_SELECTORS
+)
+from crawler.html_parser import build_recruiter, parse_search_page
+from crawler.selector_stats import SelectorRegistry
+from crawler.debug_artifacts import ArtifactWriter
+from crawler.page_readiness import PacingPolicy
+from crawler.browser_backends import create_backend
+
 load_dotenv()
 
+# Elements that only render for a logged-in member
+LOGIN_SUCCESS_SELECTORS = [
+    '.global-nav',
+    '.authentication-outlet',
+    '.feed-identity-module',
+    'input[placeholder="Search"]',
+    '.search-global-typeahead'
+]
+
+# 'batch' pulls every card in one execute_script call, 'html' parses page_source in-process,
+# 'element' walks each card via find_element
+EXTRACTION_MODES = ('batch', 'html', 'element')
+
 class LinkedInScraper:
-    def __init__(self):
+    def __init__(self, seen_index=None, backend: str = None, extraction_mode: str = None):
         self.options = ChromeOptions()
         # self.options.add_argument('--headless')  # Disabled headless mode for better reliability
         self.options.add_argument('--no-sandbox')
@@ -30,24 +57,120 @@ class LinkedInScraper:
         # Add user agent to appear more like a regular browser
         self.options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.110 Safari/537.36')
         
+        # 'selenium' (undetected-chromedriver) or 'playwright'; page-level work goes through self.backend
+        self.backend_name = backend or os.getenv('SCRAPER_BACKEND', 'selenium')
+        self.backend = None
+        # Selenium-only: the raw WebDriver for the typed login flow and per-element extraction
         self.driver = None
         self.wait = None
-        self.debug_mode = True  # Set to True to enable additional debugging
+        # Load waits return as soon as the page is usable; pacing sleeps are configured separately
+        self.readiness = None
+        self.pacing = PacingPolicy()
+        self.debug_mode = os.getenv('SCRAPER_DEBUG', 'false').lower() == 'true'  # Extra logging
+        # Screenshots and page sources are written off the hot path, only when SCRAPER_DEBUG_ARTIFACTS is set
+        self.artifacts = ArtifactWriter()
+        # One of EXTRACTION_MODES; 'element' needs the Selenium backend and falls back to 'batch' otherwise
+        self.extraction_mode = extraction_mode or os.getenv('SCRAPER_EXTRACTION_MODE', 'batch')
+        if self.extraction_mode not in EXTRACTION_MODES:
+            raise ValueError(f"Unknown extraction mode: {self.extraction_mode}")
+        # Orders fallback selectors by observed hit rate and persists the stats between runs
+        self.selector_registry = SelectorRegistry()
+        # Optional persistent index of profiles stored by earlier runs (see database.seen_profiles)
+        self.seen_index = seen_index
+        self.cookie_path = os.getenv('LINKEDIN_COOKIE_PATH', 'linkedin_cookies.json')
+
+    def start_driver(self):
+        """Start the browser backend if it is not already running"""
+        if not self.backend:
+            print(f"Initializing {self.backend_name} browser...")
+            if self.backend_name == 'selenium':
+                self.backend = create_backend('selenium', driver_factory=lambda: Chrome(options=self.options))
+            else:
+                self.backend = create_backend(self.backend_name)
+            self.backend.start()
+
+            self.driver = getattr(self.backend, 'driver', None)
+            if self.driver:
+                self.wait = WebDriverWait(self.driver, 30)  # Extended timeout
+            self.readiness = self.backend
+
+    def is_alive(self) -> bool:
+        """Check whether the browser still responds"""
+        return bool(self.backend) and self.backend.is_alive()
+
+    def is_logged_in(self, timeout: int = 5) -> bool:
+        """Check for any logged-in-only element on the current page"""
+        try:
+            return self.backend.wait_for_selector(', '.join(LOGIN_SUCCESS_SELECTORS), timeout)
+        except Exception:
+            return False
+
+    def save_cookies(self, path: str = None):
+        """Save the session cookies so a later process can skip the login flow"""
+        path = path or self.cookie_path
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(self.backend.get_cookies(), f)
+        except Exception as e:
+            print(f"Error saving cookies: {str(e)}")
+
+    def restore_session(self, path: str = None) -> bool:
+        """Restore a saved cookie jar and confirm it is still logged in"""
+        path = path or self.cookie_path
+        if not os.path.exists(path):
+            return False
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                cookies = json.load(f)
+
+            self.start_driver()
+            # Cookies can only be set for the domain currently loaded
+            self.backend.goto('https://www.linkedin.com')
+            self.backend.add_cookies(cookies)
+
+            self.backend.goto('https://www.linkedin.com/feed/')
+            if self.is_logged_in():
+                print("Restored LinkedIn session from saved cookies")
+                return True
+
+            print("Saved cookies are no longer valid")
+            return False
+
+        except Exception as e:
+            print(f"Error restoring session: {str(e)}")
+            return False
+
+    def ensure_logged_in(self) -> bool:
+        """Reuse the running session, then saved cookies, and only then the full login flow"""
+        if self.backend and not self.is_alive():
+            # start_driver only creates a backend when there is none, so a crashed browser must go first
+            print("Browser is not responding, starting a new one...")
+            self._reset_backend()
+        if self.is_alive() and self.is_logged_in(timeout=2):
+            return True
+        if self.restore_session():
+            return True
+        if self.login():
+            self.save_cookies()
+            return True
+        return False
 
     def login(self):
         """Login to LinkedIn with enhanced error handling and debugging"""
         try:
-            print("Initializing Chrome driver...")
-            self.driver = Chrome(options=self.options)
-            self.wait = WebDriverWait(self.driver, 30)  # Extended timeout
+            self.start_driver()
+            if not self.driver:
+                print(f"The typed login flow needs the selenium backend; save a cookie jar to {self.cookie_path} first")
+                return False
             
             print("Navigating to LinkedIn login page...")
             self.driver.get('https://www.linkedin.com/login')
-            time.sleep(random.uniform(3, 5))
+            self.readiness.wait_for_document_ready()
             
             # Take screenshot of login page
+            self.artifacts.capture(self.backend, 'login_page')
             if self.debug_mode:
-                self.driver.save_screenshot('login_page.png')
                 print(f"Current URL: {self.driver.current_url}")
             
             # Enter credentials with more human-like typing
@@ -62,9 +185,7 @@ class LinkedInScraper:
                     password_field = self.wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, 'input[name="session_password"]')))
                 except TimeoutException:
                     print("Still cannot find login fields. Saving page source...")
-                    with open('login_page_source.html', 'w', encoding='utf-8') as f:
-                        f.write(self.driver.page_source)
-                    self.driver.save_screenshot('login_fields_not_found.png')
+                    self.artifacts.capture(self.backend, 'login_fields_not_found', page_source=True, force=True)
                     return False
             
             # Clear fields first
@@ -74,45 +195,40 @@ class LinkedInScraper:
             # Type like a human with variable speed
             for char in os.getenv('LINKEDIN_EMAIL'):
                 email_field.send_keys(char)
-                time.sleep(random.uniform(0.05, 0.25))
+                self.pacing.keystroke()
             
             # Slight pause between fields
-            time.sleep(random.uniform(0.5, 1.5))
+            self.pacing.before_action()
             
             for char in os.getenv('LINKEDIN_PASSWORD'):
                 password_field.send_keys(char)
-                time.sleep(random.uniform(0.05, 0.25))
+                self.pacing.keystroke()
             
             # Click login button
             print("Clicking login button...")
             try:
                 login_button = self.wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, 'button[type="submit"]')))
+                login_url = self.driver.current_url
                 # Add a small delay before clicking
-                time.sleep(random.uniform(0.5, 1.5))
+                self.pacing.before_action()
                 login_button.click()
             except TimeoutException:
                 print("Could not find login button. Trying to press Enter instead...")
+                login_url = self.driver.current_url
                 password_field.send_keys(Keys.RETURN)
             
-            # Wait for login to complete with improved detection
-            time.sleep(random.uniform(5, 8))
+            # Wait for the login redirect, then for the landing page to load
+            self.readiness.wait_for_url_change(login_url)
+            self.readiness.wait_for_document_ready()
             
             # Take screenshot after login attempt
+            self.artifacts.capture(self.backend, 'after_login_attempt')
             if self.debug_mode:
-                self.driver.save_screenshot('after_login_attempt.png')
                 print(f"Current URL after login attempt: {self.driver.current_url}")
             
             # Check if login was successful with multiple indicators
-            success_selectors = [
-                '.global-nav',
-                '.authentication-outlet',
-                '.feed-identity-module',
-                'input[placeholder="Search"]',
-                '.search-global-typeahead'
-            ]
-            
             login_successful = False
-            for selector in success_selectors:
+            for selector in LOGIN_SUCCESS_SELECTORS:
                 try:
                     self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
                     login_successful = True
@@ -124,56 +240,78 @@ class LinkedInScraper:
             if login_successful:
                 print("Successfully logged in to LinkedIn")
                 # Take a screenshot of the logged-in home page
-                self.driver.save_screenshot('logged_in_home.png')
+                self.artifacts.capture(self.backend, 'logged_in_home')
                 return True
             else:
                 print("Failed to confirm login to LinkedIn")
-                self.driver.save_screenshot('login_failed.png')
                 
                 # Check for security verification
                 if "checkpoint" in self.driver.current_url or "security-verification" in self.driver.current_url:
                     print("Security verification detected. Manual intervention required.")
                     
-                # Save the page source for debugging
-                with open('login_failed_source.html', 'w', encoding='utf-8') as f:
-                    f.write(self.driver.page_source)
+                # Save a screenshot and the page source for debugging
+                self.artifacts.capture(self.backend, 'login_failed', page_source=True, force=True)
                 
                 return False
                 
         except Exception as e:
             print(f"Error during login: {str(e)}")
-            if self.driver:
-                self.driver.save_screenshot('login_error.png')
+            self.artifacts.capture(self.backend, 'login_error', force=True)
             return False
 
     def search_recruiters(self, job_title: str, location: str, max_results: int = 100) -> List[Dict]:
         """Search for recruiters based on job title and location with enhanced parsing"""
         try:
-            if not self.driver:
-                print("Starting new session...")
-                if not self.login():
-                    return []
+            unique_recruiters = []
+            for batch in self.iter_recruiters(job_title, location, max_results):
+                unique_recruiters.extend(batch)
 
-            # Try direct navigation to search results
-            self._perform_search(job_title, location)
-            
-            # Wait for page to fully load
-            time.sleep(random.uniform(5, 8))
+            print(f"Found {len(unique_recruiters)} unique recruiters in total.")
             
-            # Debug the current state
-            if self.debug_mode:
-                print(f"Current URL after search: {self.driver.current_url}")
-                self.driver.save_screenshot('search_results_initial.png')
+            # Save results to JSON file for reference
+            with open('scraped_recruiters.json', 'w') as f:
+                json.dump(unique_recruiters, f, indent=2)
                 
-                # Save page source for analysis
-                with open('search_page_source.html', 'w', encoding='utf-8') as f:
-                    f.write(self.driver.page_source)
-            
-            recruiters = []
-            page = 1
-            max_pages = 10  # Limit to 10 pages in case of issues
+            return unique_recruiters
+
+        except Exception as e:
+            print(f"Error during recruiter search: {str(e)}")
+            self.artifacts.capture(self.backend, 'search_error', force=True)
+            return []
 
-            while len(recruiters) < max_results and page <= max_pages:
+    def iter_recruiters(self, job_title: str, location: str, max_results: int = 100) -> Iterator[List[Dict]]:
+        """Yield each page's new, deduplicated recruiters as soon as the page is extracted
+
+        Duplicates are tracked across pages, so every recruiter is yielded at most once.
+        The next page is only requested after the consumer has handled the current batch.
+        """
+        if not self.backend:
+            print("Starting new session...")
+            if not self.ensure_logged_in():
+                return
+
+        # Try direct navigation to search results
+        self._perform_search(job_title, location)
+        
+        # Wait for the results to render
+        self.readiness.wait_for_results()
+        
+        # Debug the current state
+        if self.debug_mode:
+            print(f"Current URL after search: {self.backend.current_url}")
+        
+        # Save screenshot and page source for analysis
+        self.artifacts.capture(self.backend, 'search_results_initial', page_source=True)
+        
+        seen_urls = set()
+        seen_name_company = set()
+        found = 0
+        page = 1
+        max_pages = 10  # Limit to 10 pages in case of issues
+
+        try:
+            while found < max_results and page <= max_pages:
+                batch = []
                 try:
                     print(f"Processing page {page}...")
                     
@@ -181,62 +319,57 @@ class LinkedInScraper:
                     self._scroll_page()
                     
                     # Take screenshot after scrolling
-                    if self.debug_mode:
-                        self.driver.save_screenshot(f'search_results_page_{page}_scrolled.png')
+                    self.artifacts.capture(self.backend, f'search_results_page_{page}_scrolled')
                     
                     # Extract data using different methods
-                    page_recruiters = self._extract_recruiters_from_page()
-                    
+                    cards, page_recruiters = self._extract_recruiters_from_page()
+
+                    if not cards:
+                        print(f"No result cards found on page {page}. Checking alternative extraction methods...")
+                        # Try alternative extraction as a fallback
+                        cards, page_recruiters = self._extract_recruiters_alternative()
+                        if not cards:
+                            print("No results with alternative method either, breaking search.")
+                            break
+
                     if page_recruiters:
                         print(f"Found {len(page_recruiters)} recruiters on page {page}")
-                        recruiters.extend(page_recruiters)
-                        
+
                         # Print some examples for verification
                         for i, recruiter in enumerate(page_recruiters[:3]):
                             print(f"Example {i+1}: {recruiter['name']} - {recruiter['role']} at {recruiter['company']}")
                     else:
-                        print(f"No recruiters found on page {page}. Checking alternative extraction methods...")
-                        # Try alternative extraction as a fallback
-                        alt_recruiters = self._extract_recruiters_alternative()
-                        if alt_recruiters:
-                            print(f"Found {len(alt_recruiters)} recruiters using alternative method")
-                            recruiters.extend(alt_recruiters)
-                        else:
-                            print("No results with alternative method either, breaking search.")
-                            break
-                    
-                    if len(recruiters) >= max_results:
-                        print(f"Reached maximum results limit ({max_results})")
-                        break
-                    
-                    # Try to navigate to next page
-                    if not self._go_to_next_page():
-                        print("Could not navigate to next page. Ending pagination.")
-                        break
-                    
-                    page += 1
-                    time.sleep(random.uniform(4, 7))  # Wait between page navigations
+                        # Pages of profiles stored by earlier runs are skipped, not treated as the end of the results
+                        print(f"No new recruiters among {cards} cards on page {page}")
+
+                    # Filter out duplicates against everything yielded so far
+                    batch = self._filter_unique_recruiters(page_recruiters, seen_urls, seen_name_company)
                 
                 except Exception as e:
                     print(f"Error processing page {page}: {str(e)}")
-                    self.driver.save_screenshot(f'error_page_{page}.png')
+                    if not self.is_alive():
+                        # A dead browser is fatal; raising lets the session pool discard it
+                        raise
+                    self.artifacts.capture(self.backend, f'error_page_{page}', page_source=True, force=True)
                     break
-            
-            # Filter out duplicates and only keep recruiters
-            unique_recruiters = self._filter_unique_recruiters(recruiters)
-            print(f"Found {len(unique_recruiters)} unique recruiters in total.")
-            
-            # Save results to JSON file for reference
-            with open('scraped_recruiters.json', 'w') as f:
-                json.dump(unique_recruiters, f, indent=2)
-                
-            return unique_recruiters
 
-        except Exception as e:
-            print(f"Error during recruiter search: {str(e)}")
-            if self.driver:
-                self.driver.save_screenshot('search_error.png')
-            return []
+                if batch:
+                    found += len(batch)
+                    yield batch
+                
+                if found >= max_results:
+                    print(f"Reached maximum results limit ({max_results})")
+                    break
+                
+                # Try to navigate to next page
+                if not self._go_to_next_page():
+                    print("Could not navigate to next page. Ending pagination.")
+                    break
+                
+                page += 1
+                self.pacing.between_pages()  # Pace page navigations
+        finally:
+            self.selector_registry.save()
     
     def _perform_search(self, job_title: str, location: str):
         """Perform search using LinkedIn's search functionality"""
@@ -247,11 +380,10 @@ class LinkedInScraper:
             search_url = f"https://www.linkedin.com/search/results/people/?keywords={encoded_title}&location={encoded_location}&origin=GLOBAL_SEARCH_HEADER"
             
             print(f"Navigating to search URL: {search_url}")
-            self.driver.get(search_url)
-            time.sleep(random.uniform(4, 6))
+            self.backend.goto(search_url)
             
-            # If direct navigation doesn't work well, try using the search box
-            if "keywords" not in self.driver.current_url:
+            # If direct navigation doesn't work well, try using the search box (selenium only)
+            if "keywords" not in self.backend.current_url and self.driver:
                 print("Direct URL navigation might not have worked, trying search box...")
                 try:
                     # Find search box
@@ -262,18 +394,20 @@ class LinkedInScraper:
                     search_query = f"recruiter {job_title} {location}"
                     for char in search_query:
                         search_box.send_keys(char)
-                        time.sleep(random.uniform(0.05, 0.15))
+                        self.pacing.keystroke()
                     
                     # Submit search
-                    time.sleep(random.uniform(0.5, 1))
+                    self.pacing.before_action()
+                    current_url = self.driver.current_url
                     search_box.send_keys(Keys.RETURN)
-                    time.sleep(random.uniform(3, 5))
+                    self.readiness.wait_for_url_change(current_url)
+                    self.readiness.wait_for_document_ready()
                     
                     # Click on People filter if available
                     try:
                         people_filter = self.wait.until(EC.element_to_be_clickable((By.XPATH, "//button[contains(., 'People')]")))
                         people_filter.click()
-                        time.sleep(random.uniform(2, 4))
+                        self.readiness.wait_for_results()
                     except:
                         print("People filter not found or not needed")
                 except:
@@ -285,28 +419,28 @@ class LinkedInScraper:
         """Scroll through the page gradually to load all content"""
         try:
             # Get initial page height
-            last_height = self.driver.execute_script("return document.body.scrollHeight")
+            last_height = self.backend.execute_script("return document.body.scrollHeight")
             
             # Scroll down in smaller increments
             for i in range(10):  # More granular scrolling
                 # Scroll down in smaller steps
                 scroll_amount = random.randint(300, 700)
-                self.driver.execute_script(f"window.scrollBy(0, {scroll_amount});")
+                self.backend.execute_script(f"window.scrollBy(0, {scroll_amount});")
                 
                 # Add random pauses between scrolls
-                time.sleep(random.uniform(0.7, 1.5))
+                self.pacing.scroll()
                 
                 # Sometimes jiggle the scroll slightly to seem more human
                 if random.random() > 0.7:
-                    self.driver.execute_script(f"window.scrollBy(0, {random.randint(-100, 100)});")
-                    time.sleep(random.uniform(0.3, 0.7))
+                    self.backend.execute_script(f"window.scrollBy(0, {random.randint(-100, 100)});")
+                    self.pacing.scroll()
             
-            # Final scroll to bottom
-            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(random.uniform(2, 3))
+            # Final scroll to bottom, then wait for lazy-loaded results to render
+            self.backend.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            self.readiness.wait_for_stable_height()
             
             # Check if we've scrolled all the way down
-            new_height = self.driver.execute_script("return document.body.scrollHeight")
+            new_height = self.backend.execute_script("return document.body.scrollHeight")
             if new_height == last_height:
                 print("Reached bottom of page")
             else:
@@ -316,131 +450,171 @@ class LinkedInScraper:
             print(f"Error during page scrolling: {str(e)}")
     
     def _extract_recruiters_from_page(self):
-        """Extract recruiter information using multiple approaches"""
-        recruiters = []
+        """Extract recruiter information using multiple approaches
+
+        Returns (cards matched, new recruiters); cards holding known profiles or
+        non-recruiters are counted but yield no recruiter.
+        """
+        cards, recruiters = 0, []
         
-        # Wait for the search results to load
-        try:
-            # First wait for the main container
-            self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'div.search-results-container')))
-            # Then wait for the loading animation to disappear
-            self.wait.until_not(EC.presence_of_element_located((By.CSS_SELECTOR, '.artdeco-loader')))
-            # Give a moment for everything to settle
-            time.sleep(2)
-        except TimeoutException:
+        # Wait for the results container, for the loader to disappear and for the layout to settle
+        if not self.readiness.wait_for_results(timeout=30):
             print("Timeout waiting for search results to load")
-            return []
+            return cards, recruiters
+        self.readiness.wait_for_stable_height()
+
+        if self.extraction_mode == 'html':
+            # One page_source round trip, then parse without touching the DOM again
+            return parse_search_page(self.backend.page_source(), self.selector_registry, self._is_known)
 
         # Try several different selectors for the recruiter cards
-        possible_card_selectors = [
-            '.reusable-search__result-container',
-            '.search-results-container .reusable-search__result-container',
-            '.search-results-container .ember-view.reusable-search__result-container',
-            '.scaffold-layout__list .reusable-search__result-container',
-            '.search-results__list .ember-view'
-        ]
-        
-        for selector in possible_card_selectors:
+        for selector in self.selector_registry.ordered('card', CARD_SELECTORS):
             try:
-                # Wait for elements with a shorter timeout
-                cards = WebDriverWait(self.driver, 5).until(
-                    EC.presence_of_all_elements_located((By.CSS_SELECTOR, selector))
-                )
-                
+                if self.extraction_mode == 'element' and self.driver:
+                    cards, recruiters = self._extract_cards_by_element(selector)
+                else:
+                    cards, recruiters = self._extract_cards_batch(selector)
+
+                # The selector worked if it matched cards, even if they were all known or not recruiters
+                self.selector_registry.record('card', selector, bool(cards))
+
                 if cards:
-                    print(f"Found {len(cards)} cards with selector: {selector}")
-                    
-                    # Process each card
-                    for card in cards:
-                        try:
-                            # Print the HTML of the first few cards for debugging
-                            if len(recruiters) < 3:
-                                print(f"Card {len(recruiters) + 1} HTML: {card.get_attribute('outerHTML')[:200]}")
-                            
-                            recruiter_data = self._extract_data_from_card(card)
-                            if recruiter_data:
-                                recruiters.append(recruiter_data)
-                        except Exception as e:
-                            print(f"Error extracting data from card: {str(e)}")
-                            continue
-                    
-                    # If we found any recruiters, break the loop
-                    if recruiters:
-                        break
+                    break
             except Exception as e:
                 print(f"Error with selector {selector}: {str(e)}")
                 continue
         
-        return recruiters
+        return cards, recruiters
     
+    def _extract_cards_by_element(self, selector):
+        """Extract recruiters by walking each card element through WebDriver
+
+        Returns (cards matched, recruiters), counting cards that held no new recruiter.
+        """
+        recruiters = []
+
+        # Wait for elements with a shorter timeout
+        cards = WebDriverWait(self.driver, 5).until(
+            EC.presence_of_all_elements_located((By.CSS_SELECTOR, selector))
+        )
+
+        if cards:
+            print(f"Found {len(cards)} cards with selector: {selector}")
+
+            # Process each card
+            for card in cards:
+                try:
+                    # Print the HTML of the first few cards for debugging
+                    if len(recruiters) < 3:
+                        print(f"Card {len(recruiters) + 1} HTML: {card.get_attribute('outerHTML')[:200]}")
+
+                    recruiter_data = self._extract_data_from_card(card)
+                    if recruiter_data:
+                        recruiters.append(recruiter_data)
+                except Exception as e:
+                    print(f"Error extracting data from card: {str(e)}")
+                    continue
+
+        return len(cards), recruiters
+
+    def _extract_cards_batch(self, selector):
+        """Extract every card matched by selector in a single execute_script round trip
+
+        Returns (cards matched, recruiters), counting cards that held no new recruiter.
+        """
+        recruiters = []
+
+        field_selectors = {
+            'name': self.selector_registry.ordered('name', NAME_SELECTORS),
+            'role': self.selector_registry.ordered('role', ROLE_SELECTORS),
+            'company': self.selector_registry.ordered('company', COMPANY_SELECTORS)
+        }
+
+        results = self.backend.extract_cards(
+            selector,
+            field_selectors['name'],
+            field_selectors['role'],
+            field_selectors['company'],
+            PROFILE_LINK_SELECTOR
+        )
+
+        if not results:
+            return 0, recruiters
+
+        fallback_count = 0
+        for result in results:
+            try:
+                if result.get('parsed'):
+                    hits = result.get('hits') or {}
+                    for group, selectors in field_selectors.items():
+                        self.selector_registry.record_attempts(group, selectors, hits.get(group))
+
+                    recruiter_data = self._build_recruiter(
+                        result.get('name'),
+                        result.get('role'),
+                        result.get('company'),
+                        result.get('profile_url')
+                    )
+                elif result.get('element'):
+                    # Only cards the script could not parse pay for per-element lookups
+                    fallback_count += 1
+                    recruiter_data = self._extract_data_from_card(result['element'])
+                else:
+                    recruiter_data = None
+
+                if recruiter_data:
+                    recruiters.append(recruiter_data)
+            except Exception as e:
+                print(f"Error extracting data from card: {str(e)}")
+                continue
+
+        print(f"Found {len(results)} cards with selector: {selector} ({fallback_count} needed per-element fallback)")
+        return len(results), recruiters
+
+    def _is_known(self, name, company, profile_url):
+        """Check whether a profile was already stored by a previous run"""
+        if not self.seen_index:
+            return False
+        return self.seen_index.is_known(profile_url, name, company)
+
+    def _build_recruiter(self, name, role, company, profile_url):
+        """Build a recruiter record, or return None if the profile is not a recruiter or already known"""
+        if self._is_known(name, company, profile_url):
+            return None
+        return build_recruiter(name, role, company, profile_url)
+
+    def _find_card_text(self, card, group, selectors):
+        """Return the first non-empty text among selectors, trying the best-performing selector first"""
+        ordered = self.selector_registry.ordered(group, selectors)
+        for selector in ordered:
+            try:
+                element = card.find_element(By.CSS_SELECTOR, selector)
+                text = element.text.strip()
+                if text:
+                    self.selector_registry.record_attempts(group, ordered, selector)
+                    return text
+            except:
+                continue
+
+        self.selector_registry.record_attempts(group, ordered, None)
+        return None
+
     def _extract_data_from_card(self, card):
         """Extract recruiter data from a single card element"""
         try:
             # Extract name
-            name_selectors = [
-                '.entity-result__title-text a span[aria-hidden="true"]',
-                '.entity-result__title-text a span',
-                '.app-aware-link span[aria-hidden="true"]',
-                '.entity-result__title-line a span'
-            ]
-            
-            name = None
-            for selector in name_selectors:
-                try:
-                    element = card.find_element(By.CSS_SELECTOR, selector)
-                    name = element.text.strip()
-                    if name:
-                        break
-                except:
-                    continue
-            
+            name = self._find_card_text(card, 'name', NAME_SELECTORS)
             if not name:
                 return None
             
-            # Extract role
-            role_selectors = [
-                '.entity-result__primary-subtitle',
-                '.entity-result__summary.entity-result__primary-subtitle',
-                '.primary-subtitle'
-            ]
-            
-            role = None
-            for selector in role_selectors:
-                try:
-                    element = card.find_element(By.CSS_SELECTOR, selector)
-                    role = element.text.strip()
-                    if role:
-                        break
-                except:
-                    continue
-            
-            if not role:
-                role = "Unknown Role"
-            
-            # Extract company
-            company_selectors = [
-                '.entity-result__secondary-subtitle',
-                '.entity-result__summary.entity-result__secondary-subtitle',
-                '.secondary-subtitle'
-            ]
-            
-            company = None
-            for selector in company_selectors:
-                try:
-                    element = card.find_element(By.CSS_SELECTOR, selector)
-                    company = element.text.strip()
-                    if company:
-                        break
-                except:
-                    continue
-            
-            if not company:
-                company = "Unknown Company"
+            # Extract role and company
+            role = self._find_card_text(card, 'role', ROLE_SELECTORS)
+            company = self._find_card_text(card, 'company', COMPANY_SELECTORS)
             
             # Extract profile URL
             profile_url = None
             try:
-                link_element = card.find_element(By.CSS_SELECTOR, '.app-aware-link')
+                link_element = card.find_element(By.CSS_SELECTOR, PROFILE_LINK_SELECTOR)
                 profile_url = link_element.get_attribute('href')
                 if profile_url:
                     # Clean up the URL
@@ -448,30 +622,18 @@ class LinkedInScraper:
             except:
                 pass
             
-            if not profile_url:
-                return None
-            
-            # Check if this is a recruiter
-            recruiter_keywords = ['recruit', 'talent', 'hr', 'hiring', 'people', 'acquisition', 'sourcing']
-            if any(keyword in role.lower() for keyword in recruiter_keywords):
-                return {
-                    'name': name,
-                    'role': role,
-                    'company': company,
-                    'profile_url': profile_url,
-                    'status': 'pending',
-                    'created_at': time.time()
-                }
-            
-            return None
+            return self._build_recruiter(name, role, company, profile_url)
             
         except Exception as e:
             print(f"Error extracting data from card: {str(e)}")
             return None
     
     def _extract_recruiters_alternative(self):
-        """Alternative method to extract recruiters when primary method fails"""
-        recruiters = []
+        """Alternative method to extract recruiters when primary method fails
+
+        Returns (profiles found on the page, new recruiters).
+        """
+        cards, recruiters = 0, []
         
         try:
             # Use JavaScript to extract data directly
@@ -539,9 +701,10 @@ class LinkedInScraper:
             """
             
             # Execute script and get results
-            js_results = self.driver.execute_script(script)
+            js_results = self.backend.execute_script(script)
             
             if js_results:
+                cards = len(js_results)
                 print(f"JavaScript extraction found {len(js_results)} potential profiles")
                 
                 # Convert to our format and filter for recruiters
@@ -554,6 +717,9 @@ class LinkedInScraper:
                     role = result.get('role', '')
                     company = result.get('company', '')
                     
+                    if self._is_known(result.get('name'), company, result.get('profileUrl')):
+                        continue
+
                     if any(keyword in (role + " " + company).lower() for keyword in recruiter_keywords):
                         recruiters.append({
                             'name': result.get('name', 'Unknown'),
@@ -567,60 +733,48 @@ class LinkedInScraper:
         except Exception as e:
             print(f"Error during alternative extraction: {str(e)}")
         
-        return recruiters
+        return cards, recruiters
         
     def _go_to_next_page(self):
         """Navigate to the next page of search results"""
         try:
-            # Try multiple selectors for the next button
-            next_selectors = [
-                'button.artdeco-pagination__button--next',
-                'li.artdeco-pagination__indicator--number.active + li a',
-                'a[aria-label="Next"]',
-                'button[aria-label="Next"]'
-            ]
-            
-            for selector in next_selectors:
-                try:
-                    next_buttons = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    for button in next_buttons:
-                        if button.is_displayed() and button.is_enabled():
-                            print(f"Found next button with selector: {selector}")
-                            
-                            # Scroll to button
-                            self.driver.execute_script("arguments[0].scrollIntoView(true);", button)
-                            time.sleep(random.uniform(0.5, 1.5))
-                            
-                            # Click the button
-                            button.click()
-                            print("Clicked next page button")
-                            
-                            # Wait for page to load
-                            time.sleep(random.uniform(3, 5))
-                            
-                            # Take screenshot after navigation
-                            if self.debug_mode:
-                                self.driver.save_screenshot('after_next_page_click.png')
-                            
-                            # Check if URL changed
-                            if "page=" in self.driver.current_url:
-                                print(f"Successfully navigated to next page: {self.driver.current_url}")
-                                return True
-                            else:
-                                # Try to verify we're on a new page another way
-                                return True
-                except Exception as e:
-                    print(f"Error with next button selector {selector}: {str(e)}")
+            # Try multiple selectors for the next button, best-performing first
+            selectors = self.selector_registry.ordered('next_page', NEXT_PAGE_SELECTORS)
+            current_url = self.backend.current_url
+            selector = self.backend.next_page(selectors, before_click=self.pacing.before_action)
+            self.selector_registry.record_attempts('next_page', selectors, selector)
+
+            if not selector:
+                print("Could not find a working next button")
+                return False
+
+            print(f"Clicked next page button with selector: {selector}")
             
-            print("Could not find a working next button")
-            return False
+            # Wait for the next page of results to load
+            self.readiness.wait_for_url_change(current_url)
+            self.readiness.wait_for_results()
+            
+            # Take screenshot after navigation
+            self.artifacts.capture(self.backend, 'after_next_page_click')
+            
+            # Check if URL changed
+            if "page=" in self.backend.current_url:
+                print(f"Successfully navigated to next page: {self.backend.current_url}")
+            return True
             
         except Exception as e:
             print(f"Error navigating to next page: {str(e)}")
             return False
     
-    def _extract_element_text(self, parent_element, selectors):
-        """Extract text using multiple possible selectors with improved reliability"""
+    def _extract_element_text(self, parent_element, selectors, group=None):
+        """Extract text using multiple possible selectors with improved reliability
+
+        When group is given, selectors are tried best-performing first and the
+        outcome is recorded in the selector registry under that group.
+        """
+        if group:
+            selectors = self.selector_registry.ordered(group, selectors)
+
         for selector in selectors:
             try:
                 elements = parent_element.find_elements(By.CSS_SELECTOR, selector)
@@ -628,29 +782,36 @@ class LinkedInScraper:
                     try:
                         # Try getting text attribute first
                         text = element.text.strip()
+                        if not text:
+                            # If text attribute is empty, try getting attribute content
+                            text = element.get_attribute('textContent').strip()
+                        if not text:
+                            # Try innerHTML as last resort
+                            text = element.get_attribute('innerHTML').strip()
+                            if text.startswith('<'):
+                                text = ''
                         if text:
-                            return text
-                        
-                        # If text attribute is empty, try getting attribute content
-                        text = element.get_attribute('textContent').strip()
-                        if text:
-                            return text
-                        
-                        # Try innerHTML as last resort
-                        text = element.get_attribute('innerHTML').strip()
-                        if text and not text.startswith('<'):
+                            if group:
+                                self.selector_registry.record_attempts(group, selectors, selector)
                             return text
                     except:
                         continue
             except Exception:
                 continue
+
+        if group:
+            self.selector_registry.record_attempts(group, selectors, None)
         return ""
     
-    def _filter_unique_recruiters(self, recruiters):
-        """Filter out duplicate recruiters based on profile URL or name+company"""
+    def _filter_unique_recruiters(self, recruiters, seen_urls=None, seen_name_company=None):
+        """Filter out duplicate recruiters based on profile URL or name+company
+
+        Pass the same seen_urls and seen_name_company sets across calls to dedupe
+        incrementally; they are updated in place.
+        """
         unique_recruiters = []
-        seen_urls = set()
-        seen_name_company = set()
+        seen_urls = set() if seen_urls is None else seen_urls
+        seen_name_company = set() if seen_name_company is None else seen_name_company
         
         for recruiter in recruiters:
             profile_url = recruiter.get('profile_url', '').strip()
@@ -675,11 +836,25 @@ class LinkedInScraper:
         
         return unique_recruiters
 
+    def _reset_backend(self):
+        """Shut the browser down and forget it so start_driver creates a fresh one"""
+        try:
+            self.backend.close()
+        except Exception as e:
+            print(f"Error closing browser: {str(e)}")
+        finally:
+            self.backend = None
+            self.driver = None
+            self.wait = None
+            self.readiness = None
+
     def close(self):
         """Close the browser"""
-        if self.driver:
+        self.selector_registry.save()
+        self.artifacts.close()
+        if self.backend:
             print("Closing browser...")
-            self.driver.quit() 
+            self._reset_backend()
 
 # Example usage
 if __name__ == "__main__":
@@ -0,0 +1,130 @@
+import os
+import time
+import random
+from typing import Tuple
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+
+RESULTS_CONTAINER_SELECTOR = 'div.search-results-container'
+LOADER_SELECTOR = '.artdeco-loader'
+
+
+def _env_range(name: str, default: Tuple[float, float]) -> Tuple[float, float]:
+    value = os.getenv(name)
+    if not value:
+        return default
+    low, high = (float(part) for part in value.split(','))
+    return low, high
+
+
+class PacingPolicy:
+    """Deliberate delays that keep the request rate human-like.
+
+    These sleeps exist only to pace traffic; waiting for pages to load is handled by
+    PageReadiness. Every range is configurable (SCRAPER_PAGE_DELAY="4,7", ...) and
+    SCRAPER_PACING=false turns pacing off, e.g. against local fixtures.
+    """
+
+    def __init__(self, enabled: bool = None,
+                 page_delay: Tuple[float, float] = None,
+                 action_delay: Tuple[float, float] = None,
+                 keystroke_delay: Tuple[float, float] = None,
+                 scroll_delay: Tuple[float, float] = None):
+        self.enabled = os.getenv('SCRAPER_PACING', 'true').lower() == 'true' if enabled is None else enabled
+        self.page_delay = page_delay or _env_range('SCRAPER_PAGE_DELAY', (4, 7))
+        self.action_delay = action_delay or _env_range('SCRAPER_ACTION_DELAY', (0.5, 1.5))
+        self.keystroke_delay = keystroke_delay or _env_range('SCRAPER_KEYSTROKE_DELAY', (0.05, 0.25))
+        self.scroll_delay = scroll_delay or _env_range('SCRAPER_SCROLL_DELAY', (0.7, 1.5))
+
+    def _pause(self, delay_range: Tuple[float, float]):
+        if self.enabled:
+            time.sleep(random.uniform(*delay_range))
+
+    def between_pages(self):
+        """Pause before requesting the next results page"""
+        self._pause(self.page_delay)
+
+    def before_action(self):
+        """Pause before a click or a switch between form fields"""
+        self._pause(self.action_delay)
+
+    def keystroke(self):
+        """Pause between typed characters"""
+        self._pause(self.keystroke_delay)
+
+    def scroll(self):
+        """Pause between scroll steps"""
+        self._pause(self.scroll_delay)
+
+
+class PageReadiness:
+    """Condition-based waits that return as soon as the page is usable"""
+
+    def __init__(self, driver, timeout: float = 15, poll_frequency: float = 0.25):
+        self.driver = driver
+        self.timeout = timeout
+        self.poll_frequency = poll_frequency
+
+    def _wait(self, timeout: float = None) -> WebDriverWait:
+        return WebDriverWait(self.driver, timeout or self.timeout, poll_frequency=self.poll_frequency)
+
+    def wait_for_document_ready(self, timeout: float = None) -> bool:
+        """Wait until the document has finished loading"""
+        try:
+            self._wait(timeout).until(
+                lambda driver: driver.execute_script("return document.readyState") == 'complete'
+            )
+            return True
+        except TimeoutException:
+            return False
+
+    def wait_for_url_change(self, old_url: str, timeout: float = None) -> bool:
+        """Wait until the browser has navigated away from old_url"""
+        try:
+            self._wait(timeout).until(EC.url_changes(old_url))
+            return True
+        except TimeoutException:
+            return False
+
+    def wait_for_selector(self, selector: str, timeout: float = None) -> bool:
+        """Wait until an element matching selector is present"""
+        try:
+            self._wait(timeout).until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
+            return True
+        except TimeoutException:
+            return False
+
+    def wait_for_results(self, timeout: float = None) -> bool:
+        """Wait for the search results container to be present and the loader to be gone"""
+        try:
+            self._wait(timeout).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, RESULTS_CONTAINER_SELECTOR))
+            )
+            self._wait(timeout).until_not(
+                EC.presence_of_element_located((By.CSS_SELECTOR, LOADER_SELECTOR))
+            )
+            return True
+        except TimeoutException:
+            return False
+
+    def wait_for_stable_height(self, timeout: float = None, stable_polls: int = 2) -> bool:
+        """Wait until document scrollHeight stops changing, i.e. lazy content has rendered"""
+        state = {'height': None, 'stable': 0}
+
+        def height_is_stable(driver):
+            height = driver.execute_script("return document.body.scrollHeight")
+            if height == state['height']:
+                state['stable'] += 1
+            else:
+                state['height'] = height
+                state['stable'] = 0
+            return state['stable'] >= stable_polls
+
+        try:
+            self._wait(timeout).until(height_is_stable)
+            return True
+        except TimeoutException:
+            return False
@@ -0,0 +1,111 @@
+import os
+import json
+import threading
+from typing import List, Dict, Optional
+
+
+class SelectorRegistry:
+    """Tracks hits and misses per fallback selector and orders selectors by hit rate.
+
+    Selectors are grouped by what they look for ('card', 'name', 'role', 'company',
+    'next_page', ...). Within a group the selector with the best smoothed hit rate is
+    tried first; ties keep the order the selectors were declared in. Statistics are
+    persisted to a small JSON file so the ordering carries over between runs.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv('SELECTOR_STATS_PATH', 'selector_stats.json')
+        self.stats = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def _entry(self, group: str, selector: str) -> Dict:
+        return self.stats.setdefault(group, {}).setdefault(selector, {'hits': 0, 'misses': 0})
+
+    def _score(self, group: str, selector: str) -> float:
+        entry = self.stats.get(group, {}).get(selector)
+        if not entry:
+            # Untried selectors start neutral so they still get a chance
+            return 0.5
+        return (entry['hits'] + 1) / (entry['hits'] + entry['misses'] + 2)
+
+    def ordered(self, group: str, selectors: List[str]) -> List[str]:
+        """Return selectors ordered best first"""
+        with self._lock:
+            scores = {selector: self._score(group, selector) for selector in selectors}
+        # sorted() is stable, so equal scores keep their declared order
+        return sorted(selectors, key=lambda selector: -scores[selector])
+
+    def record(self, group: str, selector: str, hit: bool):
+        """Record a single lookup result"""
+        with self._lock:
+            entry = self._entry(group, selector)
+            entry['hits' if hit else 'misses'] += 1
+
+    def record_attempts(self, group: str, tried: List[str], hit_selector: Optional[str]):
+        """Record a fallback chain: every selector tried before hit_selector missed"""
+        with self._lock:
+            for selector in tried:
+                if selector == hit_selector:
+                    self._entry(group, selector)['hits'] += 1
+                    break
+                self._entry(group, selector)['misses'] += 1
+
+    def get_stats(self) -> List[Dict]:
+        """Get hit/miss counts and hit rate for every recorded selector"""
+        with self._lock:
+            rows = []
+            for group, selectors in self.stats.items():
+                for selector, entry in selectors.items():
+                    attempts = entry['hits'] + entry['misses']
+                    rows.append({
+                        'group': group,
+                        'selector': selector,
+                        'hits': entry['hits'],
+                        'misses': entry['misses'],
+                        'hit_rate': entry['hits'] / attempts if attempts else 0.0
+                    })
+        return sorted(rows, key=lambda row: (row['group'], -row['hit_rate']))
+
+    def dead_selectors(self, min_attempts: int = 20) -> List[Dict]:
+        """Get selectors that have never matched after at least min_attempts lookups"""
+        return [
+            row for row in self.get_stats()
+            if row['hits'] == 0 and row['misses'] >= min_attempts
+        ]
+
+    def load(self):
+        """Load statistics from disk, starting empty if the file is missing or unreadable"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.stats = json.load(f)
+        except FileNotFoundError:
+            self.stats = {}
+        except (OSError, ValueError) as e:
+            print(f"Error loading selector stats: {str(e)}")
+            self.stats = {}
+
+    def save(self):
+        """Write statistics to disk atomically"""
+        try:
+            with self._lock:
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self.stats, f, indent=2)
+                os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Error saving selector stats: {str(e)}")
+
+
+# Example usage
+if __name__ == "__main__":
+    registry = SelectorRegistry()
+
+    print("Selector statistics:")
+    for row in registry.get_stats():
+        print(f"[{row['group']}] {row['selector']}: {row['hits']} hits, {row['misses']} misses ({row['hit_rate']:.0%})")
+
+    dead = registry.dead_selectors()
+    print(f"\n{len(dead)} dead selectors:")
+    for row in dead:
+        print(f"[{row['group']}] {row['selector']}")
@@ -0,0 +1,81 @@
+import os
+import threading
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from crawler.linkedin_scraper import LinkedInScraper
+
+
+class SessionPool:
+    """Keeps one warm, logged-in LinkedInScraper per worker process.
+
+    The browser is checked before and after every use and recycled after max_uses
+    tasks, as soon as a task using it fails, or once it stops responding. New browsers restore the saved cookie jar before
+    falling back to the full login flow, so only the very first task pays for login.
+    """
+
+    def __init__(self, scraper_factory: Callable[[], LinkedInScraper] = LinkedInScraper,
+                 max_uses: Optional[int] = None):
+        self.scraper_factory = scraper_factory
+        self.max_uses = max_uses or int(os.getenv('SCRAPER_SESSION_MAX_USES', '20'))
+        self._scraper = None
+        self._uses = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def session(self):
+        """Yield a logged-in scraper; it is discarded if the block raises or the browser died"""
+        with self._lock:
+            scraper = self._acquire()
+            try:
+                yield scraper
+            except Exception:
+                self._discard()
+                raise
+            # The scraper may have swallowed the error that killed its browser
+            if not scraper.is_alive():
+                print("Discarding browser session that stopped responding")
+                self._discard()
+
+    def _acquire(self) -> LinkedInScraper:
+        if self._scraper is not None and self._uses >= self.max_uses:
+            print(f"Recycling browser session after {self._uses} uses")
+            self._discard()
+
+        if self._scraper is None:
+            self._scraper = self.scraper_factory()
+            self._uses = 0
+
+        if not self._scraper.ensure_logged_in():
+            self._discard()
+            raise RuntimeError("Could not log in to LinkedIn")
+
+        self._uses += 1
+        return self._scraper
+
+    def _discard(self):
+        if self._scraper is not None:
+            try:
+                self._scraper.close()
+            except Exception as e:
+                print(f"Error closing browser session: {str(e)}")
+        self._scraper = None
+        self._uses = 0
+
+    def close(self):
+        """Close the pooled browser"""
+        with self._lock:
+            self._discard()
+
+
+_pool = None
+_pool_pid = None
+
+
+def get_session_pool(scraper_factory: Callable[[], LinkedInScraper] = LinkedInScraper) -> SessionPool:
+    """Get the session pool for the current process, creating it after a fork"""
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        _pool = SessionPool(scraper_factory)
+        _pool_pid = os.getpid()
+    return _pool
@@ -9,15 +9,29 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database.mongo_operations import MongoDB
+from database.suppression import SuppressionList, BOUNCE, CONTACTED, DOMAIN, email_domain
 from crawler.linkedin_scraper import LinkedInScraper
+from email_finder.domain_resolver import CompanyDomainResolver
 from email_finder.hunter_api import HunterAPI
+from email_finder.hunter_cache import HunterCache
+from email_finder.pattern_resolver import DomainPatternResolver, split_name
+from email_finder.pre_verify import PreVerifier
 from email_sender.send_email import EmailSender
 
 # Initialize components
 db = MongoDB()
 scraper = None  # Initialize scraper only when needed
-hunter = HunterAPI()
+hunter = HunterAPI(cache=HunterCache(db.hunter_cache))
+domain_resolver = CompanyDomainResolver(db.company_domains)
+email_resolver = DomainPatternResolver(
+    hunter,
+    domain_resolver=domain_resolver,
+    pre_verifier=PreVerifier(),
+    # Paid verification of pattern guesses that pass the local checks
+    verify=os.getenv('VERIFY_PATTERN_EMAILS', 'false').lower() == 'true'
+)
 email_sender = EmailSender()
+suppression = SuppressionList(db.suppressions)
 
 # Page config
 st.set_page_config(
@@ -67,14 +81,13 @@ if col1.button("Scrape Recruiters"):
             if scraper is None:
                 scraper = LinkedInScraper()
             
-            # Search for recruiters
-            recruiters = scraper.search_recruiters(job_title, location, max_results)
-            
-            # Store recruiters in database
-            for recruiter in recruiters:
-                db.insert_recruiter(recruiter)
+            # Search for recruiters, storing each page as it is scraped
+            scraped_count = 0
+            for batch in scraper.iter_recruiters(job_title, location, max_results):
+                db.upsert_recruiters(batch)
+                scraped_count += len(batch)
             
-            st.success(f"Successfully scraped {len(recruiters)} recruiters!")
+            st.success(f"Successfully scraped {scraped_count} recruiters!")
             
             # Close the scraper
             scraper.close()
@@ -91,32 +104,51 @@ if col2.button("Find Emails"):
             recruiters = db.get_pending_recruiters()
             found_count = 0
             
+            people = []
             for recruiter in recruiters:
-                # Extract domain from company name
-                domain = recruiter['company'].lower().replace(' ', '') + '.com'
+                # Resolve the company's domain; companies known not to resolve cost no lookups
+                domain = domain_resolver.resolve(recruiter['company'])
+                if not domain:
+                    continue
                 
                 # Split name into first and last
-                name_parts = recruiter['name'].split()
-                first_name = name_parts[0]
-                last_name = name_parts[-1] if len(name_parts) > 1 else ''
-                
-                # Find email
-                email_data = hunter.find_email(first_name, last_name, domain)
+                first_name, last_name = split_name(recruiter['name'])
+                people.append({
+                    'id': str(recruiter['_id']),
+                    'first_name': first_name,
+                    'last_name': last_name,
+                    'domain': domain,
+                    'company': recruiter['company']
+                })
+            
+            # One domain search per company; per-person lookups only where the pattern can't be used
+            found_emails = email_resolver.resolve(people)
+            
+            emails = []
+            for recruiter in recruiters:
+                email_data = found_emails.get(str(recruiter['_id']))
                 
                 if email_data:
-                    # Store email
-                    email_id = db.insert_email({
+                    emails.append({
                         'recruiter_id': str(recruiter['_id']),
                         'email': email_data['email'],
                         'score': email_data['score'],
                         'status': email_data['status']
                     })
-                    
-                    # Update recruiter status
-                    db.update_recruiter_status(str(recruiter['_id']), 'email_found')
-                    found_count += 1
+            
+            # Store the emails and advance their recruiters in one batch each
+            stored = [
+                email['recruiter_id']
+                for email, outcome in zip(emails, db.insert_emails(emails))
+                if outcome['status'] == 'inserted'
+            ]
+            db.transition_statuses([{'recruiter_id': recruiter_id, 'status': 'email_found'} for recruiter_id in stored])
+            found_count = len(stored)
             
             st.success(f"Found {found_count} email addresses!")
+            cache_stats = hunter.cache.get_stats()
+            st.caption(f"Hunter cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+                       f"{cache_stats['saved_quota']} API calls saved")
             
         except Exception as e:
             st.error(f"Error finding emails: {str(e)}")
@@ -128,7 +160,14 @@ if col3.button("Send Emails"):
             recruiters = db.get_pending_recruiters(status='email_found')
             sent_count = 0
             
+            # Skip bounced, unsubscribed and already-contacted addresses up front
+            _, suppressed = suppression.filter([recruiter['email'] for recruiter in recruiters])
+            recruiters = [recruiter for recruiter in recruiters if recruiter['email'] not in suppressed]
+            
             for recruiter in recruiters:
+                # Sending inline, so wait here for this mailbox's next delivery slot
+                email_sender.wait_for_slot()
+                
                 # Send email
                 result = email_sender.send_email(
                     to_email=recruiter['email'],
@@ -141,7 +180,14 @@ if col3.button("Send Emails"):
                     }
                 )
                 
+                if result['status'] == 'bounced':
+                    if result['bounce'] == DOMAIN:
+                        suppression.add_domain(email_domain(recruiter['email']), BOUNCE)
+                    else:
+                        suppression.add_email(recruiter['email'], BOUNCE)
+                
                 if result['status'] == 'success':
+                    suppression.add_email(recruiter['email'], CONTACTED)
                     # Log outreach
                     db.log_outreach({
                         'recruiter_id': str(recruiter['_id']),
@@ -156,6 +202,8 @@ if col3.button("Send Emails"):
                     sent_count += 1
             
             st.success(f"Successfully sent {sent_count} emails!")
+            if suppressed:
+                st.caption(f"Skipped {len(suppressed)} suppressed addresses")
             
         except Exception as e:
             st.error(f"Error sending emails: {str(e)}")
@@ -1,90 +1,435 @@
 from typing import List, Dict, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
+import uuid
+import sys
+import argparse
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo import MongoClient
+from pymongo import MongoClient, InsertOne
+from pymongo.errors import BulkWriteError, OperationFailure
 from dotenv import load_dotenv
 
+from database.queries import (
+    INDEXES, EXPLAINED_QUERIES, RECENT_OUTREACH_SORT,
+    DAILY_ACTIVITY_PIPELINE, STATUS_DISTRIBUTION_PIPELINE, COMPANY_DISTRIBUTION_PIPELINE,
+    PENDING, EMAIL_FOUND, NO_EMAIL, EMAIL_QUEUED, EMAIL_SENT, EMAIL_FAILED, SUPPRESSED, ALLOWED_TRANSITIONS, TransitionPlan, to_object_id,
+    CLAIM_STAGES, RELEASE_UPDATE, claim_query, claim_update, lease_query, requeue_query, requeue_update,
+    pending_recruiters_query, emails_for_recruiters_query, recruiter_upserts, outreach_writes,
+    record_outreach_write, bulk_outcome, upsert_results, item_results, plan_report
+)
+
 load_dotenv()
 
+
+def _ensure_indexes_enabled(ensure_indexes: Optional[bool]) -> bool:
+    if ensure_indexes is None:
+        return os.getenv("MONGODB_ENSURE_INDEXES", "true").lower() == "true"
+    return ensure_indexes
+
+
+def _index_error(collection_name: str, index, error: Exception):
+    print(f"Error creating index {index.document['name']} on {collection_name}: {error}")
+
+
+def _bulk_write(collection, operations: List) -> Dict:
+    """Run operations unordered in as few round trips as the driver allows
+
+    Returns the upserted ids and write errors keyed by operation index; one failed
+    document does not stop the rest of the batch.
+    """
+    if not operations:
+        return bulk_outcome(None)
+    try:
+        return bulk_outcome(collection.bulk_write(operations, ordered=False).bulk_api_result)
+    except BulkWriteError as e:
+        return bulk_outcome(e.details)
+
+
+async def _bulk_write_async(collection, operations: List) -> Dict:
+    """_bulk_write for a Motor collection"""
+    if not operations:
+        return bulk_outcome(None)
+    try:
+        return bulk_outcome((await collection.bulk_write(operations, ordered=False)).bulk_api_result)
+    except BulkWriteError as e:
+        return bulk_outcome(e.details)
+
+
 class MongoDB:
-    def __init__(self):
+    def __init__(self, ensure_indexes: Optional[bool] = None):
         self.client = MongoClient(os.getenv("MONGODB_URI"))
-        self.db = self.client.recruiter_bot
+        self.db = self.client[os.getenv("MONGODB_DATABASE", "recruiter_bot")]
         self.recruiters = self.db.recruiters
         self.emails = self.db.emails
         self.outreach = self.db.outreach
+        self.seen_profiles = self.db.seen_profiles
+        self.hunter_cache = self.db.hunter_cache
+        self.company_domains = self.db.company_domains
+        self.outbox = self.db.outbox
+        self.email_templates = self.db.email_templates
+        self.suppressions = self.db.suppressions
+
+        # createIndexes is a no-op for indexes that already exist, so this is safe on every start
+        if _ensure_indexes_enabled(ensure_indexes):
+            self.ensure_indexes()
+
+    def ensure_indexes(self) -> Dict[str, List[str]]:
+        """Create the indexes in INDEXES, returning the index names per collection
+
+        An index that cannot be built (e.g. duplicate profile URLs blocking the unique
+        index) is reported and skipped so the others still get created.
+        """
+        created = {}
+        for collection_name, indexes in INDEXES.items():
+            collection = self.db[collection_name]
+            created[collection_name] = []
+            for index in indexes:
+                try:
+                    created[collection_name].extend(collection.create_indexes([index]))
+                except OperationFailure as e:
+                    _index_error(collection_name, index, e)
+        return created
+
+    def check_query_plans(self) -> List[Dict]:
+        """Explain every query in EXPLAINED_QUERIES and flag the ones planned as a COLLSCAN"""
+        report = []
+        for name, collection_name, query, sort in EXPLAINED_QUERIES:
+            cursor = self.db[collection_name].find(query)
+            if sort:
+                cursor = cursor.sort(sort)
+            report.append(plan_report(name, collection_name, cursor.explain()))
+        return report
 
     def insert_recruiter(self, recruiter_data: Dict) -> str:
         """Insert a new recruiter into the database"""
         result = self.recruiters.insert_one(recruiter_data)
         return str(result.inserted_id)
 
+    def upsert_recruiters(self, recruiters: List[Dict]) -> List[Dict]:
+        """Bulk upsert a batch of scraped recruiters, with one result per recruiter
+
+        Recruiters are matched on normalized profile URL (or name and company when
+        the URL is unknown), so re-running a scrape is idempotent; existing documents
+        are left untouched. Each result has a status of inserted (with the new _id),
+        existing or error.
+        """
+        operations = recruiter_upserts(recruiters)
+        return upsert_results(len(operations), _bulk_write(self.recruiters, operations))
+
     def find_recruiter(self, query: Dict) -> Optional[Dict]:
         """Find a recruiter by query"""
         return self.recruiters.find_one(query)
 
-    def update_recruiter_status(self, recruiter_id: str, status: str) -> bool:
-        """Update recruiter status"""
-        result = self.recruiters.update_one(
-            {"_id": recruiter_id},
-            {"$set": {"status": status, "updated_at": datetime.utcnow()}}
-        )
-        return result.modified_count > 0
+    def update_recruiter_status(self, recruiter_id, status: str) -> bool:
+        """Move one recruiter to status if that transition is legal"""
+        return self.transition_statuses([{"recruiter_id": recruiter_id, "status": status}])[0]["status"] == "updated"
+
+    def transition_statuses(self, transitions: List[Dict]) -> List[Dict]:
+        """Apply many {'recruiter_id', 'status'} transitions set-wise
+
+        Current statuses are read in one query, then each target status is applied
+        with one update_many; see TransitionPlan for the per-item results.
+        """
+        plan = TransitionPlan(transitions)
+        results = plan.decide(self.recruiters.find(plan.current_query(), {"status": 1}))
+        for query, update in plan.updates():
+            self.recruiters.update_many(query, update)
+        return results
 
     def insert_email(self, email_data: Dict) -> str:
         """Insert a new email into the database"""
         result = self.emails.insert_one(email_data)
         return str(result.inserted_id)
 
+    def insert_emails(self, emails: List[Dict]) -> List[Dict]:
+        """Insert a batch of emails, with one result (inserted with its _id, or error) per email"""
+        documents = [dict(email) for email in emails]
+        return item_results(documents, _bulk_write(self.emails, [InsertOne(document) for document in documents]))
+
+    def get_emails_for_recruiters(self, recruiter_ids: List[str]) -> Dict[str, Dict]:
+        """Latest stored email per recruiter, keyed by recruiter id"""
+        emails = {}
+        for email in self.emails.find(emails_for_recruiters_query(recruiter_ids)).sort("_id", 1):
+            emails[email["recruiter_id"]] = email
+        return emails
+
     def log_outreach(self, outreach_data: Dict) -> str:
         """Log an outreach attempt"""
         result = self.outreach.insert_one(outreach_data)
         return str(result.inserted_id)
 
+    def log_outreach_many(self, outreach: List[Dict]) -> List[Dict]:
+        """Log a batch of outreach attempts, with one result per attempt
+
+        Attempts with a message_key are logged once per key like record_outreach; one
+        that is already logged comes back as duplicate, so a batch can be safely retried.
+        """
+        documents = [dict(item) for item in outreach]
+        return item_results(documents, _bulk_write(self.outreach, outreach_writes(documents)))
+
+    def record_outreach(self, message_key: str, outreach_data: Dict) -> bool:
+        """Log an outreach attempt once per outbox message; returns False if already logged"""
+        query, update = record_outreach_write(message_key, outreach_data)
+        result = self.outreach.update_one(query, update, upsert=True)
+        return result.upserted_id is not None
+
     def get_pending_recruiters(self, status: str = None, limit: int = 100) -> List[Dict]:
         """Get recruiters pending outreach"""
-        query = {"status": status} if status else {"status": "pending"}
-        cursor = self.recruiters.find(query).limit(limit)
+        cursor = self.recruiters.find(pending_recruiters_query(status)).limit(limit)
         return list(cursor)
 
+    def claim_batch(self, stage: str, n: int = 100, lease_seconds: float = 600) -> List[Dict]:
+        """Lease up to n recruiters for a pipeline stage (see CLAIM_STAGES), oldest first
+
+        Candidates are read, then leased with one update_many that re-checks they are
+        still unclaimed, so overlapping workers never get the same recruiter. A lease
+        that expires (its worker died) makes the recruiter claimable again. Each
+        returned recruiter carries its lease_token for release and complete.
+        """
+        now = datetime.utcnow()
+        query = claim_query(stage, now)
+        candidates = [doc["_id"] for doc in self.recruiters.find(query, {"_id": 1}).sort("created_at", 1).limit(n)]
+        if not candidates:
+            return []
+
+        token = uuid.uuid4().hex
+        self.recruiters.update_many(
+            {**query, "_id": {"$in": candidates}},
+            claim_update(token, stage, now + timedelta(seconds=lease_seconds))
+        )
+        return list(self.recruiters.find({"lease_token": token}).sort("created_at", 1))
+
+    def release(self, recruiters: List[Dict]) -> int:
+        """Hand claimed recruiters back unfinished; leases taken over by another worker are left alone"""
+        if not recruiters:
+            return 0
+        return self.recruiters.update_many(lease_query(recruiters), RELEASE_UPDATE).modified_count
+
+    def complete(self, recruiters: List[Dict], transitions: List[Dict]) -> List[Dict]:
+        """Finish claimed recruiters: apply their transitions and drop the leases"""
+        results = self.transition_statuses(transitions)
+        self.release(recruiters)
+        return results
+
+    def requeue_no_email(self, older_than: float) -> int:
+        """Move recruiters that have been no_email for over older_than seconds back to pending
+
+        Pass the Hunter cache's negative TTL so a requeued lookup asks Hunter again
+        instead of replaying the cached miss. Returns how many were requeued.
+        """
+        now = datetime.utcnow()
+        query = requeue_query(now - timedelta(seconds=older_than))
+        return self.recruiters.update_many(query, requeue_update(now)).modified_count
+
     def get_recent_outreach(self, limit: int = 10) -> List[Dict]:
         """Get recent outreach attempts"""
-        cursor = self.outreach.find().sort("created_at", -1).limit(limit)
+        cursor = self.outreach.find().sort(RECENT_OUTREACH_SORT).limit(limit)
         return list(cursor)
 
     def get_daily_activity(self) -> List[Dict]:
         """Get daily activity statistics"""
-        pipeline = [
-            {
-                "$group": {
-                    "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
-                    "count": {"$sum": 1}
-                }
-            },
-            {"$sort": {"_id": 1}},
-            {"$project": {"date": "$_id", "count": 1, "_id": 0}}
-        ]
-        return list(self.outreach.aggregate(pipeline))
+        return list(self.outreach.aggregate(DAILY_ACTIVITY_PIPELINE))
 
     def get_status_distribution(self) -> List[Dict]:
         """Get distribution of recruiter statuses"""
-        pipeline = [
-            {"$group": {"_id": "$status", "count": {"$sum": 1}}},
-            {"$project": {"status": "$_id", "count": 1, "_id": 0}}
-        ]
-        return list(self.recruiters.aggregate(pipeline))
+        return list(self.recruiters.aggregate(STATUS_DISTRIBUTION_PIPELINE))
 
     def get_company_distribution(self) -> List[Dict]:
         """Get distribution of companies"""
-        pipeline = [
-            {"$group": {"_id": "$company", "count": {"$sum": 1}}},
-            {"$project": {"company": "$_id", "count": 1, "_id": 0}},
-            {"$sort": {"count": -1}},
-            {"$limit": 10}
+        return list(self.recruiters.aggregate(COMPANY_DISTRIBUTION_PIPELINE))
+
+    def close(self):
+        """Close the database connection"""
+        self.client.close()
+
+
+class AsyncMongoDB:
+    """MongoDB on Motor, for code running in an event loop.
+
+    Same methods and queries as MongoDB (both build them from database.queries),
+    but every call is a coroutine so DB round trips can overlap with other I/O.
+    Indexes are not created in __init__; await ensure_indexes() once at start-up.
+    """
+
+    def __init__(self, client: Optional[AsyncIOMotorClient] = None):
+        self.client = client or AsyncIOMotorClient(os.getenv("MONGODB_URI"))
+        self.db = self.client[os.getenv("MONGODB_DATABASE", "recruiter_bot")]
+        self.recruiters = self.db.recruiters
+        self.emails = self.db.emails
+        self.outreach = self.db.outreach
+        self.seen_profiles = self.db.seen_profiles
+        self.hunter_cache = self.db.hunter_cache
+        self.company_domains = self.db.company_domains
+        self.outbox = self.db.outbox
+        self.email_templates = self.db.email_templates
+        self.suppressions = self.db.suppressions
+
+    async def ensure_indexes(self) -> Dict[str, List[str]]:
+        """Create the indexes in INDEXES, returning the index names per collection"""
+        created = {}
+        for collection_name, indexes in INDEXES.items():
+            collection = self.db[collection_name]
+            created[collection_name] = []
+            for index in indexes:
+                try:
+                    created[collection_name].extend(await collection.create_indexes([index]))
+                except OperationFailure as e:
+                    _index_error(collection_name, index, e)
+        return created
+
+    async def check_query_plans(self) -> List[Dict]:
+        """Explain every query in EXPLAINED_QUERIES and flag the ones planned as a COLLSCAN"""
+        report = []
+        for name, collection_name, query, sort in EXPLAINED_QUERIES:
+            cursor = self.db[collection_name].find(query)
+            if sort:
+                cursor = cursor.sort(sort)
+            report.append(plan_report(name, collection_name, await cursor.explain()))
+        return report
+
+    async def insert_recruiter(self, recruiter_data: Dict) -> str:
+        """Insert a new recruiter into the database"""
+        result = await self.recruiters.insert_one(recruiter_data)
+        return str(result.inserted_id)
+
+    async def upsert_recruiters(self, recruiters: List[Dict]) -> List[Dict]:
+        """Bulk upsert a batch of scraped recruiters, with one result per recruiter"""
+        operations = recruiter_upserts(recruiters)
+        return upsert_results(len(operations), await _bulk_write_async(self.recruiters, operations))
+
+    async def find_recruiter(self, query: Dict) -> Optional[Dict]:
+        """Find a recruiter by query"""
+        return await self.recruiters.find_one(query)
+
+    async def update_recruiter_status(self, recruiter_id, status: str) -> bool:
+        """Move one recruiter to status if that transition is legal"""
+        results = await self.transition_statuses([{"recruiter_id": recruiter_id, "status": status}])
+        return results[0]["status"] == "updated"
+
+    async def transition_statuses(self, transitions: List[Dict]) -> List[Dict]:
+        """Apply many {'recruiter_id', 'status'} transitions set-wise"""
+        plan = TransitionPlan(transitions)
+        documents = await self.recruiters.find(plan.current_query(), {"status": 1}).to_list(None)
+        results = plan.decide(documents)
+        for query, update in plan.updates():
+            await self.recruiters.update_many(query, update)
+        return results
+
+    async def insert_email(self, email_data: Dict) -> str:
+        """Insert a new email into the database"""
+        result = await self.emails.insert_one(email_data)
+        return str(result.inserted_id)
+
+    async def insert_emails(self, emails: List[Dict]) -> List[Dict]:
+        """Insert a batch of emails, with one result (inserted with its _id, or error) per email"""
+        documents = [dict(email) for email in emails]
+        operations = [InsertOne(document) for document in documents]
+        return item_results(documents, await _bulk_write_async(self.emails, operations))
+
+    async def get_emails_for_recruiters(self, recruiter_ids: List[str]) -> Dict[str, Dict]:
+        """Latest stored email per recruiter, keyed by recruiter id"""
+        emails = {}
+        async for email in self.emails.find(emails_for_recruiters_query(recruiter_ids)).sort("_id", 1):
+            emails[email["recruiter_id"]] = email
+        return emails
+
+    async def log_outreach(self, outreach_data: Dict) -> str:
+        """Log an outreach attempt"""
+        result = await self.outreach.insert_one(outreach_data)
+        return str(result.inserted_id)
+
+    async def log_outreach_many(self, outreach: List[Dict]) -> List[Dict]:
+        """Log a batch of outreach attempts, with one result per attempt"""
+        documents = [dict(item) for item in outreach]
+        return item_results(documents, await _bulk_write_async(self.outreach, outreach_writes(documents)))
+
+    async def record_outreach(self, message_key: str, outreach_data: Dict) -> bool:
+        """Log an outreach attempt once per outbox message; returns False if already logged"""
+        query, update = record_outreach_write(message_key, outreach_data)
+        result = await self.outreach.update_one(query, update, upsert=True)
+        return result.upserted_id is not None
+
+    async def get_pending_recruiters(self, status: str = None, limit: int = 100) -> List[Dict]:
+        """Get recruiters pending outreach"""
+        return await self.recruiters.find(pending_recruiters_query(status)).limit(limit).to_list(None)
+
+    async def claim_batch(self, stage: str, n: int = 100, lease_seconds: float = 600) -> List[Dict]:
+        """Lease up to n recruiters for a pipeline stage, oldest first"""
+        now = datetime.utcnow()
+        query = claim_query(stage, now)
+        candidates = [
+            doc["_id"]
+            for doc in await self.recruiters.find(query, {"_id": 1}).sort("created_at", 1).limit(n).to_list(None)
         ]
-        return list(self.recruiters.aggregate(pipeline))
+        if not candidates:
+            return []
+
+        token = uuid.uuid4().hex
+        await self.recruiters.update_many(
+            {**query, "_id": {"$in": candidates}},
+            claim_update(token, stage, now + timedelta(seconds=lease_seconds))
+        )
+        return await self.recruiters.find({"lease_token": token}).sort("created_at", 1).to_list(None)
+
+    async def release(self, recruiters: List[Dict]) -> int:
+        """Hand claimed recruiters back unfinished"""
+        if not recruiters:
+            return 0
+        return (await self.recruiters.update_many(lease_query(recruiters), RELEASE_UPDATE)).modified_count
+
+    async def complete(self, recruiters: List[Dict], transitions: List[Dict]) -> List[Dict]:
+        """Finish claimed recruiters: apply their transitions and drop the leases"""
+        results = await self.transition_statuses(transitions)
+        await self.release(recruiters)
+        return results
+
+    async def requeue_no_email(self, older_than: float) -> int:
+        """Move recruiters that have been no_email for over older_than seconds back to pending"""
+        now = datetime.utcnow()
+        query = requeue_query(now - timedelta(seconds=older_than))
+        return (await self.recruiters.update_many(query, requeue_update(now))).modified_count
+
+    async def get_recent_outreach(self, limit: int = 10) -> List[Dict]:
+        """Get recent outreach attempts"""
+        return await self.outreach.find().sort(RECENT_OUTREACH_SORT).limit(limit).to_list(None)
+
+    async def get_daily_activity(self) -> List[Dict]:
+        """Get daily activity statistics"""
+        return await self.outreach.aggregate(DAILY_ACTIVITY_PIPELINE).to_list(None)
+
+    async def get_status_distribution(self) -> List[Dict]:
+        """Get distribution of recruiter statuses"""
+        return await self.recruiters.aggregate(STATUS_DISTRIBUTION_PIPELINE).to_list(None)
+
+    async def get_company_distribution(self) -> List[Dict]:
+        """Get distribution of companies"""
+        return await self.recruiters.aggregate(COMPANY_DISTRIBUTION_PIPELINE).to_list(None)
 
     def close(self):
         """Close the database connection"""
-        self.client.close() 
\ No newline at end of file
+        self.client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create the MongoDB indexes and check query plans")
+    parser.add_argument("--check", action="store_true", help="explain every query and fail on a COLLSCAN")
+    args = parser.parse_args()
+
+    db = MongoDB(ensure_indexes=False)
+    try:
+        for collection_name, names in db.ensure_indexes().items():
+            print(f"{collection_name}: {', '.join(names)}")
+
+        if args.check:
+            report = db.check_query_plans()
+            for row in report:
+                flag = "COLLSCAN" if row["collscan"] else "ok"
+                print(f"{flag:<10}{row['collection']:<12}{row['query']:<30}{' > '.join(row['stages'])}")
+            if any(row["collscan"] for row in report):
+                sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main() 
\ No newline at end of file
@@ -0,0 +1,181 @@
+import uuid
+import hashlib
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+from pymongo import ReturnDocument, UpdateOne
+
+QUEUED = 'queued'
+SENDING = 'sending'
+SENT = 'sent'
+FAILED = 'failed'
+
+
+def normalize_address(email: str) -> str:
+    return (email or '').strip().lower()
+
+
+def message_key(recruiter_id: str, template: str, email: str) -> str:
+    """Deterministic id for one outreach message; the same message always gets the same key"""
+    raw = f"{recruiter_id}|{template}|{normalize_address(email)}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class Outbox:
+    """Durable queue of outgoing emails with a per-message state machine.
+
+    Messages move queued -> sending -> sent, or back to queued for a retry and finally
+    to failed after max_attempts. The message key is the document _id, so enqueueing
+    the same message twice is a no-op. A sender claims a message by moving it to
+    sending with a lease token and expiry; only the holder of the current token can
+    complete it, and a lease that expires (the sender died) makes the message
+    claimable again. Several senders can therefore drain the outbox at once.
+
+    SMTP gives no transactional hand-off, so a sender that dies after the server
+    accepted a message but before mark_sent leaves a window for one resend. The
+    message key is also used as the Message-ID so receivers can drop such a duplicate.
+    """
+
+    def __init__(self, collection, lease_seconds: float = 300, max_attempts: int = 3,
+                 retry_delay: float = 900):
+        self.collection = collection
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._indexes_ready = False
+
+    def _ensure_indexes(self):
+        if not self._indexes_ready:
+            self.collection.create_index([('state', 1), ('send_at', 1)])
+            self.collection.create_index([('state', 1), ('lease_expires_at', 1)])
+            self.collection.create_index('address')
+            self._indexes_ready = True
+
+    def existing_keys(self, keys: List[str]) -> Set[str]:
+        """Which of keys are already in the outbox, in any state"""
+        self._ensure_indexes()
+        return {doc['_id'] for doc in self.collection.find({'_id': {'$in': keys}}, {'_id': 1})}
+
+    def live_addresses(self, emails: List[str]) -> Set[str]:
+        """Which of emails (normalized) already have a message that has not failed"""
+        self._ensure_indexes()
+        query = {'address': {'$in': [normalize_address(email) for email in emails]}, 'state': {'$ne': FAILED}}
+        return {doc['address'] for doc in self.collection.find(query, {'address': 1})}
+
+    def enqueue(self, messages: List[Dict]) -> List[str]:
+        """Queue messages ({'key', 'send_at', ...payload}); returns the keys that were new"""
+        self._ensure_indexes()
+        operations = []
+        for message in messages:
+            document = {k: v for k, v in message.items() if k != 'key'}
+            document.update({
+                'address': normalize_address(message.get('to_email')),
+                'state': QUEUED,
+                'attempts': 0,
+                'send_at': message.get('send_at') or datetime.utcnow(),
+                'created_at': datetime.utcnow()
+            })
+            operations.append(UpdateOne({'_id': message['key']}, {'$setOnInsert': document}, upsert=True))
+
+        if not operations:
+            return []
+
+        result = self.collection.bulk_write(operations, ordered=False)
+        return [messages[index]['key'] for index in result.upserted_ids]
+
+    def claim(self, limit: int = 10, keys: Optional[List[str]] = None,
+              due_before: Optional[datetime] = None) -> List[Dict]:
+        """Lease up to limit messages that are due (or whose lease expired), oldest first"""
+        self._ensure_indexes()
+        now = datetime.utcnow()
+        query = {'$or': [
+            {'state': QUEUED, 'send_at': {'$lte': due_before or now}},
+            {'state': SENDING, 'lease_expires_at': {'$lte': now}, 'attempts': {'$lt': self.max_attempts}}
+        ]}
+        if keys is not None:
+            query['_id'] = {'$in': keys}
+
+        claimed = []
+        for _ in range(limit):
+            # find_one_and_update is atomic, so each message goes to exactly one sender
+            message = self.collection.find_one_and_update(
+                query,
+                {
+                    '$set': {
+                        'state': SENDING,
+                        'lease_token': uuid.uuid4().hex,
+                        'lease_expires_at': now + timedelta(seconds=self.lease_seconds)
+                    },
+                    '$inc': {'attempts': 1}
+                },
+                sort=[('send_at', 1)],
+                return_document=ReturnDocument.AFTER
+            )
+            if message is None:
+                break
+            claimed.append(message)
+        return claimed
+
+    def _update_leased(self, message: Dict, update: Dict) -> bool:
+        result = self.collection.update_one(
+            {'_id': message['_id'], 'state': SENDING, 'lease_token': message['lease_token']},
+            update
+        )
+        return result.modified_count > 0
+
+    def mark_sent(self, message: Dict) -> bool:
+        """Complete a claimed message; False if the lease was lost to another sender"""
+        return self._update_leased(message, {
+            '$set': {'state': SENT, 'sent_at': datetime.utcnow(), 'recorded': False},
+            '$unset': {'lease_token': '', 'lease_expires_at': ''}
+        })
+
+    def mark_failed(self, message: Dict, error: str, retry_at: Optional[datetime] = None,
+                    permanent: bool = False) -> str:
+        """Requeue a claimed message for retry, or fail it for good once attempts run out
+
+        permanent skips the retries, e.g. for a hard bounce or a suppressed address.
+        """
+        if permanent or message['attempts'] >= self.max_attempts:
+            state, fields = FAILED, {'failed_at': datetime.utcnow()}
+        else:
+            state = QUEUED
+            fields = {'send_at': retry_at or datetime.utcnow() + timedelta(seconds=self.retry_delay)}
+
+        fields.update({'state': state, 'last_error': error})
+        self._update_leased(message, {'$set': fields, '$unset': {'lease_token': '', 'lease_expires_at': ''}})
+        return state
+
+    def release(self, message: Dict, send_at: datetime) -> bool:
+        """Hand a claimed message back unsent, without counting the attempt"""
+        return self._update_leased(message, {
+            '$set': {'state': QUEUED, 'send_at': send_at},
+            '$unset': {'lease_token': '', 'lease_expires_at': ''},
+            '$inc': {'attempts': -1}
+        })
+
+    def fail_expired(self) -> List[Dict]:
+        """Fail messages whose last allowed attempt died holding the lease, returning them"""
+        query = {'state': SENDING, 'lease_expires_at': {'$lte': datetime.utcnow()}, 'attempts': {'$gte': self.max_attempts}}
+        expired = list(self.collection.find(query, {'recruiter_id': 1}))
+        if expired:
+            self.collection.update_many(
+                {**query, '_id': {'$in': [message['_id'] for message in expired]}},
+                {
+                    '$set': {'state': FAILED, 'failed_at': datetime.utcnow(), 'last_error': 'lease expired'},
+                    '$unset': {'lease_token': '', 'lease_expires_at': ''}
+                }
+            )
+        return expired
+
+    def unrecorded(self, limit: int = 100) -> List[Dict]:
+        """Sent messages whose outreach log and status update have not been confirmed"""
+        return list(self.collection.find({'state': SENT, 'recorded': False}).limit(limit))
+
+    def mark_recorded(self, keys: List[str]):
+        self.collection.update_many({'_id': {'$in': keys}}, {'$set': {'recorded': True}})
+
+    def get_stats(self) -> Dict:
+        """Count messages per state"""
+        pipeline = [{'$group': {'_id': '$state', 'count': {'$sum': 1}}}]
+        return {row['_id']: row['count'] for row in self.collection.aggregate(pipeline)}
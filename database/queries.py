@@ -0,0 +1,304 @@
+"""Query, pipeline and index definitions shared by MongoDB and AsyncMongoDB.
+
+Everything here is driver-agnostic: filters, bulk operations and aggregation
+pipelines are built and results are interpreted here, and the two classes only
+differ in whether they await the driver call in between.
+"""
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+
+from bson import ObjectId
+from pymongo import InsertOne, UpdateOne, IndexModel, ASCENDING, DESCENDING
+
+from database.seen_profiles import normalize_profile_url
+
+# Indexes every collection owned by the MongoDB classes needs, applied by ensure_indexes.
+# Collections with their own helper class (outbox, suppressions, seen_profiles,
+# hunter_cache) create their indexes themselves.
+INDEXES = {
+    "recruiters": [
+        # get_pending_recruiters filters on status; created_at keeps the oldest first
+        IndexModel([("status", ASCENDING), ("created_at", ASCENDING)], name="status_created_at"),
+        # Dedupe key for upsert_recruiters; older documents without a URL are left out
+        IndexModel([("profile_url", ASCENDING)], name="profile_url_unique", unique=True,
+                   partialFilterExpression={"profile_url": {"$type": "string"}}),
+        IndexModel([("name", ASCENDING), ("company", ASCENDING)], name="name_company"),
+    ],
+    "emails": [
+        IndexModel([("recruiter_id", ASCENDING)], name="recruiter_id"),
+    ],
+    "outreach": [
+        IndexModel([("created_at", DESCENDING)], name="created_at"),
+        IndexModel([("recruiter_id", ASCENDING)], name="recruiter_id"),
+        IndexModel([("message_key", ASCENDING)], name="message_key_unique", unique=True,
+                   partialFilterExpression={"message_key": {"$type": "string"}}),
+    ],
+}
+
+# Recruiter pipeline states
+PENDING = "pending"
+EMAIL_FOUND = "email_found"
+NO_EMAIL = "no_email"
+EMAIL_QUEUED = "email_queued"
+EMAIL_SENT = "email_sent"
+EMAIL_FAILED = "email_failed"
+SUPPRESSED = "suppressed"
+
+# Target status -> statuses a recruiter may move there from
+ALLOWED_TRANSITIONS = {
+    # A recruiter whose lookup came up empty can be requeued for another try
+    PENDING: {NO_EMAIL},
+    # email_failed can be requeued too, e.g. once a broken template is fixed
+    EMAIL_FOUND: {PENDING, EMAIL_FAILED},
+    # Recruiters with no resolvable domain or email leave the pending queue until requeue_no_email
+    NO_EMAIL: {PENDING},
+    # The outbox holds a message for the recruiter
+    EMAIL_QUEUED: {EMAIL_FOUND},
+    EMAIL_SENT: {EMAIL_FOUND, EMAIL_QUEUED},
+    # No usable email, a template that cannot be rendered, or a send that failed for good
+    EMAIL_FAILED: {EMAIL_FOUND, EMAIL_QUEUED},
+    SUPPRESSED: {EMAIL_FOUND, EMAIL_QUEUED},
+}
+
+# Pipeline stage -> status of the recruiters it works on, for claim_batch. Every
+# recruiter a stage claims leaves that status when the stage completes it, so a
+# batch never fills up with recruiters that can make no progress; in particular a
+# recruiter with an outbox message is email_queued and no longer claimable by
+# send_outreach.
+CLAIM_STAGES = {
+    "find_emails": PENDING,
+    "send_outreach": EMAIL_FOUND,
+}
+
+RECENT_OUTREACH_SORT = [("created_at", DESCENDING)]
+
+DAILY_ACTIVITY_PIPELINE = [
+    {
+        "$group": {
+            "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
+            "count": {"$sum": 1}
+        }
+    },
+    {"$sort": {"_id": 1}},
+    {"$project": {"date": "$_id", "count": 1, "_id": 0}}
+]
+
+STATUS_DISTRIBUTION_PIPELINE = [
+    {"$group": {"_id": "$status", "count": {"$sum": 1}}},
+    {"$project": {"status": "$_id", "count": 1, "_id": 0}}
+]
+
+COMPANY_DISTRIBUTION_PIPELINE = [
+    {"$group": {"_id": "$company", "count": {"$sum": 1}}},
+    {"$project": {"company": "$_id", "count": 1, "_id": 0}},
+    {"$sort": {"count": -1}},
+    {"$limit": 10}
+]
+
+
+def to_object_id(value) -> ObjectId:
+    """ObjectId for an id that may have been passed around as a string"""
+    if isinstance(value, ObjectId):
+        return value
+    if isinstance(value, str) and ObjectId.is_valid(value):
+        return ObjectId(value)
+    raise ValueError(f"Invalid recruiter id: {value!r}")
+
+
+def pending_recruiters_query(status: Optional[str] = None) -> Dict:
+    return {"status": status or PENDING}
+
+
+def emails_for_recruiters_query(recruiter_ids: List[str]) -> Dict:
+    return {"recruiter_id": {"$in": recruiter_ids}}
+
+
+def recruiter_upserts(recruiters: List[Dict]) -> List[UpdateOne]:
+    """Upserts matching recruiters on normalized profile URL, or name and company without one"""
+    operations = []
+    for recruiter in recruiters:
+        profile_url = normalize_profile_url(recruiter.get('profile_url'))
+        if profile_url:
+            key = {"profile_url": profile_url}
+        else:
+            key = {"name": recruiter.get('name'), "company": recruiter.get('company')}
+        document = {k: v for k, v in recruiter.items() if k not in key}
+        if not profile_url:
+            # Placeholders like 'Unknown' would collide on the unique profile_url index
+            document.pop("profile_url", None)
+        operations.append(UpdateOne(key, {"$setOnInsert": document}, upsert=True))
+    return operations
+
+
+def claim_query(stage: str, now: datetime) -> Dict:
+    """Recruiters a stage may claim: in its status and not leased, or leased with an expired lease"""
+    if stage not in CLAIM_STAGES:
+        raise ValueError(f"Unknown pipeline stage: {stage}")
+    return {
+        "status": CLAIM_STAGES[stage],
+        "$or": [{"lease_expires_at": {"$exists": False}}, {"lease_expires_at": {"$lte": now}}]
+    }
+
+
+def claim_update(token: str, stage: str, expires_at: datetime) -> Dict:
+    return {"$set": {"lease_token": token, "lease_stage": stage, "lease_expires_at": expires_at}}
+
+
+def lease_query(recruiters: List[Dict]) -> Dict:
+    """Claimed recruiters that still hold the lease they were claimed with"""
+    return {
+        "_id": {"$in": [recruiter["_id"] for recruiter in recruiters]},
+        "lease_token": {"$in": list({recruiter["lease_token"] for recruiter in recruiters})}
+    }
+
+
+RELEASE_UPDATE = {"$unset": {"lease_token": "", "lease_stage": "", "lease_expires_at": ""}}
+
+
+def requeue_query(before: datetime) -> Dict:
+    """no_email recruiters last moved there before `before`; documents without updated_at count as old"""
+    return {"status": NO_EMAIL, "updated_at": {"$not": {"$gt": before}}}
+
+
+def requeue_update(now: datetime) -> Dict:
+    return {"$set": {"status": PENDING, "updated_at": now}}
+
+
+def outreach_writes(documents: List[Dict]) -> List:
+    """Inserts for outreach documents; those with a message_key are upserted once per key"""
+    return [
+        UpdateOne({"message_key": document["message_key"]}, {"$setOnInsert": document}, upsert=True)
+        if document.get("message_key") else InsertOne(document)
+        for document in documents
+    ]
+
+
+def record_outreach_write(message_key: str, outreach_data: Dict) -> Tuple[Dict, Dict]:
+    """(filter, update) for logging one outbox message's outreach exactly once"""
+    return {"message_key": message_key}, {"$setOnInsert": outreach_data}
+
+
+# Representative shape of every find the MongoDB classes issue: (name, collection, filter, sort).
+# check_query_plans explains each one; the full-collection $group aggregations behind the
+# dashboard charts are scans by design and are not listed.
+EXPLAINED_QUERIES = [
+    ("get_pending_recruiters", "recruiters", pending_recruiters_query(), None),
+    ("upsert_recruiters", "recruiters", {"profile_url": "https://www.linkedin.com/in/example"}, None),
+    ("upsert_recruiters (no url)", "recruiters", {"name": "Example", "company": "Example"}, None),
+    ("get_emails_for_recruiters", "emails", emails_for_recruiters_query(["0" * 24]), [("_id", ASCENDING)]),
+    ("claim_batch", "recruiters", claim_query("find_emails", datetime(2000, 1, 1)), [("created_at", ASCENDING)]),
+    ("requeue_no_email", "recruiters", requeue_query(datetime(2000, 1, 1)), None),
+    ("get_recent_outreach", "outreach", {}, RECENT_OUTREACH_SORT),
+    ("outreach by recruiter", "outreach", {"recruiter_id": "0" * 24}, None),
+    ("record_outreach", "outreach", record_outreach_write("0" * 64, {})[0], None),
+]
+
+
+def plan_stages(plan) -> List[str]:
+    """Every stage name in an explain plan tree"""
+    if isinstance(plan, list):
+        return [stage for item in plan for stage in plan_stages(item)]
+    if not isinstance(plan, dict):
+        return []
+    stages = [plan["stage"]] if "stage" in plan else []
+    for value in plan.values():
+        if isinstance(value, (dict, list)):
+            stages.extend(plan_stages(value))
+    return stages
+
+
+def plan_report(name: str, collection_name: str, explain: Dict) -> Dict:
+    stages = plan_stages(explain["queryPlanner"]["winningPlan"])
+    return {"query": name, "collection": collection_name, "stages": stages, "collscan": "COLLSCAN" in stages}
+
+
+def bulk_outcome(details: Optional[Dict]) -> Dict:
+    """Upserted ids and write errors, keyed by operation index, from a bulk write's details"""
+    details = details or {}
+    return {
+        "upserted": {item["index"]: item["_id"] for item in details.get("upserted", [])},
+        "errors": {error["index"]: error for error in details.get("writeErrors", [])}
+    }
+
+
+def upsert_results(count: int, outcome: Dict) -> List[Dict]:
+    """Per-item results of a batch of $setOnInsert upserts: inserted, existing or error"""
+    results = []
+    for index in range(count):
+        if index in outcome["errors"]:
+            results.append({"status": "error", "error": outcome["errors"][index]["errmsg"]})
+        elif index in outcome["upserted"]:
+            results.append({"status": "inserted", "_id": str(outcome["upserted"][index])})
+        else:
+            results.append({"status": "existing"})
+    return results
+
+
+def item_results(documents: List[Dict], outcome: Dict) -> List[Dict]:
+    """Per-document results of a batch of inserts and $setOnInsert upserts
+
+    A document that was written has its _id (set by the driver on insert, reported
+    by the server on upsert); an upsert that matched an existing document is a duplicate.
+    """
+    results = []
+    for index, document in enumerate(documents):
+        if index in outcome["errors"]:
+            results.append({"status": "error", "error": outcome["errors"][index]["errmsg"]})
+        elif index in outcome["upserted"]:
+            results.append({"status": "inserted", "_id": str(outcome["upserted"][index])})
+        elif "_id" in document:
+            results.append({"status": "inserted", "_id": str(document["_id"])})
+        else:
+            results.append({"status": "duplicate"})
+    return results
+
+
+class TransitionPlan:
+    """Set-wise plan for a batch of {'recruiter_id', 'status'} transitions
+
+    ids are converted once; after the current statuses are read (current_query),
+    decide() sorts each transition into updated, unchanged (already there), rejected
+    (illegal from its current status, which is included), not_found or error (an
+    invalid id), and updates() gives one guarded update_many per target status.
+    """
+
+    def __init__(self, transitions: List[Dict]):
+        self.transitions = transitions
+        self.results = [None] * len(transitions)
+        self.ids = {}
+        self.moves = {}
+        for index, transition in enumerate(transitions):
+            try:
+                self.ids[index] = to_object_id(transition["recruiter_id"])
+            except ValueError as e:
+                self.results[index] = {"status": "error", "error": str(e)}
+
+    def current_query(self) -> Dict:
+        return {"_id": {"$in": list(set(self.ids.values()))}}
+
+    def decide(self, documents) -> List[Dict]:
+        current = {doc["_id"]: doc.get("status") for doc in documents}
+        for index, recruiter_id in self.ids.items():
+            target = self.transitions[index]["status"]
+            if recruiter_id not in current:
+                self.results[index] = {"status": "not_found"}
+            elif current[recruiter_id] == target:
+                self.results[index] = {"status": "unchanged"}
+            elif current[recruiter_id] in ALLOWED_TRANSITIONS.get(target, ()):
+                self.results[index] = {"status": "updated"}
+                self.moves.setdefault(target, set()).add(recruiter_id)
+            else:
+                self.results[index] = {"status": "rejected", "current": current[recruiter_id]}
+        return self.results
+
+    def updates(self) -> List[Tuple[Dict, Dict]]:
+        """(filter, update) per target status; the filter also requires a legal source status,
+        so a recruiter that moved on concurrently is left alone"""
+        now = datetime.utcnow()
+        return [
+            (
+                {"_id": {"$in": list(recruiter_ids)}, "status": {"$in": list(ALLOWED_TRANSITIONS[target])}},
+                {"$set": {"status": target, "updated_at": now}}
+            )
+            for target, recruiter_ids in self.moves.items()
+        ]
@@ -0,0 +1,125 @@
+import math
+import hashlib
+import urllib.parse
+from datetime import datetime
+from typing import List, Dict, Optional
+from pymongo import UpdateOne
+
+
+def normalize_profile_url(profile_url: Optional[str]) -> Optional[str]:
+    """Normalize a LinkedIn profile URL so the same profile always maps to the same key"""
+    if not profile_url or profile_url == 'Unknown':
+        return None
+
+    parsed = urllib.parse.urlsplit(profile_url.strip())
+    host = parsed.netloc.lower()
+    if not host:
+        return None
+    # Country subdomains (uk.linkedin.com, ...) point at the same profile
+    if host.endswith('linkedin.com'):
+        host = 'www.linkedin.com'
+
+    path = urllib.parse.unquote(parsed.path).rstrip('/').lower()
+    return f"https://{host}{path}"
+
+
+def normalize_name_company(name: Optional[str], company: Optional[str]) -> Optional[str]:
+    """Build a case and whitespace insensitive name|company key"""
+    if not name or not company or company == 'Unknown Company':
+        return None
+    name = ' '.join(name.lower().split())
+    company = ' '.join(company.lower().split())
+    return f"{name}|{company}"
+
+
+def profile_keys(profile_url: Optional[str] = None, name: Optional[str] = None, company: Optional[str] = None) -> List[str]:
+    """Get every dedupe key for a profile"""
+    keys = []
+    url_key = normalize_profile_url(profile_url)
+    if url_key:
+        keys.append(f"url:{url_key}")
+    name_company_key = normalize_name_company(name, company)
+    if name_company_key:
+        keys.append(f"name:{name_company_key}")
+    return keys
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter using double hashing over a single blake2b digest"""
+
+    def __init__(self, capacity: int = 100000, error_rate: float = 0.01):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, int(round(self.size / capacity * math.log(2))))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class SeenProfileIndex:
+    """Persistent set of already-scraped profiles shared across runs.
+
+    Keys live in a Mongo collection with a unique index. An in-process Bloom filter
+    loaded at startup answers most lookups without a round trip: a Bloom miss means
+    the profile is new, and only possible hits are confirmed against Mongo.
+    """
+
+    def __init__(self, collection, capacity: int = 100000, error_rate: float = 0.01):
+        self.collection = collection
+        self.collection.create_index('key', unique=True)
+        self.bloom = BloomFilter(capacity, error_rate)
+        self._known = set()
+        self.load()
+
+    def load(self):
+        """Warm the Bloom filter with every stored key"""
+        for doc in self.collection.find({}, {'key': 1, '_id': 0}):
+            self.bloom.add(doc['key'])
+
+    def _contains(self, key: str) -> bool:
+        if key not in self.bloom:
+            return False
+        if key in self._known:
+            return True
+        if self.collection.find_one({'key': key}, {'_id': 1}):
+            self._known.add(key)
+            return True
+        return False
+
+    def is_known(self, profile_url: Optional[str] = None, name: Optional[str] = None, company: Optional[str] = None) -> bool:
+        """Check whether a profile was stored by this or any previous run"""
+        return any(self._contains(key) for key in profile_keys(profile_url, name, company))
+
+    def add_many(self, recruiters: List[Dict]) -> int:
+        """Record a batch of stored recruiters, returning how many keys were new"""
+        operations = []
+        keys = []
+        now = datetime.utcnow()
+        for recruiter in recruiters:
+            for key in profile_keys(recruiter.get('profile_url'), recruiter.get('name'), recruiter.get('company')):
+                keys.append(key)
+                operations.append(UpdateOne(
+                    {'key': key},
+                    {'$setOnInsert': {'first_seen': now}},
+                    upsert=True
+                ))
+
+        if not operations:
+            return 0
+
+        result = self.collection.bulk_write(operations, ordered=False)
+        for key in keys:
+            self.bloom.add(key)
+            self._known.add(key)
+        return result.upserted_count
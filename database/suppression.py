@@ -0,0 +1,129 @@
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+EMAIL = 'email'
+DOMAIN = 'domain'
+
+BOUNCE = 'bounce'
+UNSUBSCRIBE = 'unsubscribe'
+REPLIED = 'replied'
+CONTACTED = 'contacted'
+
+
+def normalize_email(email: str) -> str:
+    return (email or '').strip().lower()
+
+
+def email_domain(email: str) -> str:
+    return normalize_email(email).rpartition('@')[2]
+
+
+class SuppressionList:
+    """Addresses and domains that must never be emailed again.
+
+    Entries are stored in Mongo with a unique index on (kind, value) and mirrored in
+    an in-process snapshot (a dict per kind), so each check is a set lookup with no
+    round trip. The snapshot picks up entries other workers added at most
+    refresh_seconds ago; entries added through this instance are visible at once.
+
+    created_at comes from the writer's clock and is set before its write commits,
+    so an entry can turn up after a load that already ran past its timestamp (a
+    slow bulk_write, or a writer whose clock lags). Each refresh therefore reads
+    from overlap_seconds before the newest entry loaded so far, rather than from
+    this worker's own clock.
+    """
+
+    def __init__(self, collection, refresh_seconds: float = 60, overlap_seconds: float = 600):
+        self.collection = collection
+        self.collection.create_index([('kind', 1), ('value', 1)], unique=True)
+        self.collection.create_index('created_at')
+        self.refresh_seconds = refresh_seconds
+        self.overlap = timedelta(seconds=overlap_seconds)
+        self.snapshot = {EMAIL: {}, DOMAIN: {}}
+        self._newest = None
+        self._refreshed_at = 0.0
+        self.load()
+
+    def load(self):
+        """Pull entries added since the last load, and any that committed late, into the snapshot"""
+        query = {'created_at': {'$gte': self._newest - self.overlap}} if self._newest else {}
+        for doc in self.collection.find(query, {'kind': 1, 'value': 1, 'reason': 1, 'created_at': 1, '_id': 0}):
+            self.snapshot[doc['kind']][doc['value']] = doc['reason']
+            created_at = doc.get('created_at')
+            if created_at and (self._newest is None or created_at > self._newest):
+                self._newest = created_at
+        self._refreshed_at = time.monotonic()
+
+    def _refresh(self):
+        if time.monotonic() - self._refreshed_at >= self.refresh_seconds:
+            self.load()
+
+    def reason(self, email: str) -> Optional[str]:
+        """Why an address is suppressed (its own entry or its domain's), or None"""
+        self._refresh()
+        email = normalize_email(email)
+        return self.snapshot[EMAIL].get(email) or self.snapshot[DOMAIN].get(email_domain(email))
+
+    def current_reason(self, email: str) -> Optional[str]:
+        """reason() read from Mongo instead of the snapshot, for a check right before sending"""
+        email = normalize_email(email)
+        doc = self.collection.find_one(
+            {'$or': [{'kind': EMAIL, 'value': email}, {'kind': DOMAIN, 'value': email_domain(email)}]},
+            {'kind': 1, 'value': 1, 'reason': 1, '_id': 0}
+        )
+        if doc is None:
+            return None
+        self.snapshot[doc['kind']][doc['value']] = doc['reason']
+        return doc['reason']
+
+    def filter(self, emails: List[str]) -> Tuple[List[str], Dict[str, str]]:
+        """Split addresses into those that may be emailed and suppressed ones with their reason"""
+        self._refresh()
+        allowed, suppressed = [], {}
+        for email in emails:
+            normalized = normalize_email(email)
+            reason = self.snapshot[EMAIL].get(normalized) or self.snapshot[DOMAIN].get(email_domain(normalized))
+            if reason:
+                suppressed[email] = reason
+            else:
+                allowed.append(email)
+        return allowed, suppressed
+
+    def add_many(self, entries: List[Tuple[str, str, str]]) -> int:
+        """Suppress (kind, value, reason) entries, returning how many were new
+
+        An existing entry keeps its original reason.
+        """
+        operations = []
+        now = datetime.utcnow()
+        for kind, value, reason in entries:
+            value = normalize_email(value)
+            operations.append(UpdateOne(
+                {'kind': kind, 'value': value},
+                {'$setOnInsert': {'reason': reason, 'created_at': now}},
+                upsert=True
+            ))
+            self.snapshot[kind].setdefault(value, reason)
+
+        if not operations:
+            return 0
+
+        result = self.collection.bulk_write(operations, ordered=False)
+        return result.upserted_count
+
+    def add_email(self, email: str, reason: str) -> int:
+        return self.add_many([(EMAIL, email, reason)])
+
+    def add_domain(self, domain: str, reason: str) -> int:
+        return self.add_many([(DOMAIN, domain, reason)])
+
+    def get_stats(self) -> Dict:
+        """Count suppressed entries per kind and reason"""
+        pipeline = [{'$group': {'_id': {'kind': '$kind', 'reason': '$reason'}, 'count': {'$sum': 1}}}]
+        return {
+            f"{row['_id']['kind']}:{row['_id']['reason']}": row['count']
+            for row in self.collection.aggregate(pipeline)
+        }
@@ -0,0 +1,269 @@
+import os
+import time
+import random
+import asyncio
+import threading
+from typing import Callable, Dict, List, Optional
+
+import httpx
+from dotenv import load_dotenv
+
+from email_finder.hunter_api import (
+    DEFAULT_BASE_URL, DEFAULT_TIMEOUT, HunterQuotaExceeded, MonthlyQuota, default_quota, parse_email_finder,
+    parse_email_verifier, parse_domain_search, finder_error, verifier_error, domain_search_error
+)
+from email_finder.hunter_cache import HunterCache, finder_key, verify_key, domain_key
+
+load_dotenv()
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Allows rate requests per second on average, with bursts of up to capacity
+
+    Each acquire reserves a token up front and sleeps off any debt, so the bucket
+    holds no event-loop state and one instance can pace consecutive asyncio.run
+    batches, or several threads' loops, together.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token, returning how many seconds to wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return max(0.0, -self.tokens / self.rate)
+
+    async def acquire(self):
+        delay = self.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class AsyncHunterAPI:
+    """Async Hunter.io client for running many lookups at once.
+
+    All requests share one pooled httpx connection and pass through a token bucket
+    (HUNTER_RATE_PER_SECOND) and the monthly quota (HUNTER_MONTHLY_QUOTA). 429 and 5xx
+    responses are retried with jittered exponential backoff, honouring Retry-After.
+    Results use the same shapes and cache keys as HunterAPI; the cache's Mongo reads
+    and writes run in worker threads so they never block the event loop. In the
+    batch methods a lookup refused by the quota gets an error result instead of
+    failing the whole batch. base_url (or HUNTER_BASE_URL) can point at a local
+    stub server.
+
+        async with AsyncHunterAPI(cache=cache) as hunter:
+            results = await hunter.find_emails_batch(people, concurrency=10)
+    """
+
+    def __init__(self, cache: Optional[HunterCache] = None, base_url: Optional[str] = None,
+                 timeout: float = DEFAULT_TIMEOUT, rate_per_second: Optional[float] = None,
+                 quota: Optional[MonthlyQuota] = None, max_connections: int = 10,
+                 max_retries: int = 4, backoff_base: float = 0.5, backoff_cap: float = 30.0,
+                 limiter: Optional[TokenBucket] = None):
+        self.api_key = os.getenv('HUNTER_API_KEY')
+        self.base_url = base_url or os.getenv('HUNTER_BASE_URL', DEFAULT_BASE_URL)
+        self.cache = cache
+        self.rate_per_second = rate_per_second or float(os.getenv('HUNTER_RATE_PER_SECOND', '15'))
+        self.limiter = limiter or TokenBucket(self.rate_per_second)
+        self.quota = quota or default_quota()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.stats = {'requests': 0, 'retries': 0, 'errors': 0, 'quota_exceeded': 0}
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={
+                'Authorization': f'Bearer {self.api_key}',
+                'Content-Type': 'application/json'
+            },
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        await self.client.aclose()
+
+    async def _cached(self, key: str):
+        if self.cache is None:
+            return False, None
+        return await asyncio.to_thread(self.cache.get, key)
+
+    async def _store(self, key: str, value: Optional[Dict], negative: bool = False):
+        if self.cache is not None:
+            await asyncio.to_thread(self.cache.set, key, value, negative)
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after:
+            try:
+                return min(self.backoff_cap, float(retry_after))
+            except ValueError:
+                pass
+        # Full jitter keeps concurrent workers from retrying in lockstep
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    async def _get(self, path: str, params: Dict) -> Dict:
+        """GET an endpoint, retrying throttled, failed and unreachable requests"""
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire()
+            self.quota.consume()
+            self.stats['requests'] += 1
+            last_attempt = attempt == self.max_retries
+
+            try:
+                response = await self.client.get(f'/{path}', params=params)
+            except httpx.TransportError:
+                self.quota.refund()
+                if last_attempt:
+                    raise
+                self.stats['retries'] += 1
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+
+            if response.status_code in RETRY_STATUSES and not last_attempt:
+                self.quota.refund()
+                self.stats['retries'] += 1
+                await asyncio.sleep(self._backoff(attempt, response.headers.get('Retry-After')))
+                continue
+
+            response.raise_for_status()
+            return response.json()
+
+    async def find_email(self, first_name: str, last_name: str, domain: str) -> Optional[Dict]:
+        """Find email using Hunter.io API
+
+        Returns None when Hunter found nobody, and a finder_error result when the
+        request failed (after retries), timed out or was rejected.
+        """
+        key = finder_key(first_name, last_name, domain)
+        hit, cached = await self._cached(key)
+        if hit:
+            return cached
+
+        params = {
+            'first_name': first_name,
+            'last_name': last_name,
+            'domain': domain
+        }
+
+        try:
+            result = parse_email_finder(await self._get('email-finder', params))
+            await self._store(key, result, negative=result is None)
+            return result
+
+        except httpx.HTTPError as e:
+            self.stats['errors'] += 1
+            print(f"Error finding email: {e}")
+            # Not a miss: the person is looked up again on a later run
+            return finder_error(str(e))
+
+    async def verify_email(self, email: str) -> Dict:
+        """Verify email using Hunter.io API"""
+        key = verify_key(email)
+        hit, cached = await self._cached(key)
+        if hit:
+            return cached
+
+        try:
+            result = parse_email_verifier(email, await self._get('email-verifier', {'email': email}))
+            await self._store(key, result, negative=result['status'] in ('unknown', 'accept_all'))
+            return result
+
+        except httpx.HTTPError as e:
+            self.stats['errors'] += 1
+            print(f"Error verifying email: {e}")
+            return verifier_error(email)
+
+    async def get_domain_search(self, domain: str, limit: int = 100) -> Dict:
+        """Get all emails for a domain"""
+        key = domain_key(domain)
+        hit, cached = await self._cached(key)
+        if hit:
+            return cached
+
+        try:
+            result = parse_domain_search(domain, await self._get('domain-search', {'domain': domain, 'limit': limit}))
+            await self._store(key, result, negative=not (result['emails'] or result['pattern']))
+            return result
+
+        except httpx.HTTPError as e:
+            self.stats['errors'] += 1
+            print(f"Error getting domain search: {e}")
+            return domain_search_error(domain, str(e))
+
+    async def _run_bounded(self, calls: Dict, concurrency: int) -> Dict:
+        """Await {key: (coroutine factory, on_quota)} with at most concurrency in flight
+
+        A call refused by the monthly quota gets on_quota(error) as its result, so
+        the lookups that did succeed are still returned.
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def run(factory, on_quota):
+            async with semaphore:
+                try:
+                    return await factory()
+                except HunterQuotaExceeded as e:
+                    self.stats['quota_exceeded'] += 1
+                    return on_quota(str(e))
+
+        values = await asyncio.gather(*(run(factory, on_quota) for factory, on_quota in calls.values()))
+        return dict(zip(calls.keys(), values))
+
+    async def find_emails_batch(self, people: List[Dict], concurrency: int = 5) -> List[Optional[Dict]]:
+        """Find emails for [{'first_name', 'last_name', 'domain'}], in input order
+
+        Duplicate people in the batch are looked up once.
+        """
+        calls = {}
+        for person in people:
+            key = finder_key(person['first_name'], person['last_name'], person['domain'])
+            calls.setdefault(key, (
+                lambda p=person: self.find_email(p['first_name'], p['last_name'], p['domain']),
+                finder_error
+            ))
+
+        results = await self._run_bounded(calls, concurrency)
+        return [
+            results[finder_key(person['first_name'], person['last_name'], person['domain'])]
+            for person in people
+        ]
+
+    async def verify_batch(self, emails: List[str], concurrency: int = 5) -> List[Dict]:
+        """Verify emails, in input order; duplicates are verified once"""
+        calls = {}
+        for email in emails:
+            calls.setdefault(verify_key(email), (
+                lambda e=email: self.verify_email(e),
+                lambda error, e=email: verifier_error(e)
+            ))
+
+        results = await self._run_bounded(calls, concurrency)
+        return [results[verify_key(email)] for email in emails]
+
+    async def domain_search_batch(self, domains: List[str], concurrency: int = 5, limit: int = 100) -> List[Dict]:
+        """Search domains for up to limit emails each, in input order; duplicates are searched once"""
+        calls = {}
+        for domain in domains:
+            calls.setdefault(domain_key(domain), (
+                lambda d=domain: self.get_domain_search(d, limit),
+                lambda error, d=domain: domain_search_error(d, error)
+            ))
+
+        results = await self._run_bounded(calls, concurrency)
+        return [results[domain_key(domain)] for domain in domains]
@@ -0,0 +1,177 @@
+import os
+import re
+import json
+import threading
+import unicodedata
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+DEFAULT_OVERRIDES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'domain_overrides.json')
+
+# Trailing words that are part of the legal name but never of the domain
+LEGAL_SUFFIXES = {
+    'inc', 'incorporated', 'llc', 'llp', 'lp', 'ltd', 'limited', 'corp', 'corporation',
+    'co', 'company', 'plc', 'gmbh', 'ag', 'sa', 'sas', 'bv', 'nv', 'pte', 'pty', 'pvt',
+    'private', 'srl', 'spa', 'oy', 'ab', 'kk', 'holdings', 'group'
+}
+
+# LinkedIn appends employment type and other details after a separator: "Google · Full-time"
+NOISE_SEPARATORS = re.compile(r'\s+[·|•]\s+|\s+-\s+')
+PARENTHETICAL = re.compile(r'\([^)]*\)|\[[^\]]*\]')
+DOMAIN_LIKE = re.compile(r'^[a-z0-9-]+(\.[a-z0-9-]+)+$')
+PLACEHOLDER_COMPANIES = {'', 'unknown company', 'self employed', 'self-employed', 'freelance', 'confidential'}
+
+
+def normalize_company(company: str) -> str:
+    """Reduce a scraped company name to lowercase words without legal suffixes or LinkedIn noise"""
+    name = NOISE_SEPARATORS.split((company or '').strip(), maxsplit=1)[0]
+    name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
+    name = PARENTHETICAL.sub(' ', name).lower().strip()
+    if name in PLACEHOLDER_COMPANIES:
+        return ''
+
+    # Drop dots first so abbreviations like "S.A." stay one word
+    words = re.sub(r'[^a-z0-9]+', ' ', name.replace('.', '').replace('&', ' ')).split()
+    if words and words[0] == 'the' and len(words) > 1:
+        words = words[1:]
+    while len(words) > 1 and words[-1] in LEGAL_SUFFIXES:
+        words.pop()
+    return ' '.join(words)
+
+
+def guess_domain(company: str) -> Optional[str]:
+    """Best guess at a company's domain when nothing better is known"""
+    raw = (company or '').strip().lower()
+    if DOMAIN_LIKE.match(raw):
+        # Some companies list their website as their name
+        return raw[4:] if raw.startswith('www.') else raw
+
+    normalized = normalize_company(company)
+    if not normalized:
+        return None
+    return normalized.replace(' ', '') + '.com'
+
+
+def load_overrides(path: Optional[str] = None) -> Dict[str, str]:
+    """Load the company -> domain override table, keyed by normalized company name"""
+    path = path or os.getenv('COMPANY_DOMAIN_OVERRIDES', DEFAULT_OVERRIDES_PATH)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            overrides = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error loading domain overrides from {path}: {e}")
+        return {}
+    return {normalize_company(company): domain.strip().lower() for company, domain in overrides.items()}
+
+
+class CompanyDomainResolver:
+    """Maps scraped company names to email domains, remembering what Hunter has confirmed.
+
+    Lookups go override table -> in-memory cache -> Mongo -> heuristic guess. Once a
+    domain search on a domain returns an organization, the domain is confirmed for that
+    company (and for Hunter's spelling of the organization). A guess that comes back
+    empty is recorded as unresolved, so the company is skipped instead of paying for
+    the same dead domain again until retry_after has passed.
+    """
+
+    def __init__(self, collection=None, overrides: Optional[Dict[str, str]] = None,
+                 retry_after: timedelta = timedelta(days=30)):
+        self.collection = collection
+        self.overrides = load_overrides() if overrides is None else {
+            normalize_company(company): domain for company, domain in overrides.items()
+        }
+        self.retry_after = retry_after
+        self.memory = {}
+        self.stats = {'overrides': 0, 'confirmed': 0, 'guesses': 0, 'unresolved': 0}
+        self._lock = threading.Lock()
+
+    def _entry(self, normalized: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self.memory.get(normalized)
+        if entry is not None or self.collection is None:
+            return entry
+
+        doc = self.collection.find_one({'_id': normalized})
+        if doc:
+            entry = {'domain': doc.get('domain'), 'source': doc['source'], 'checked_at': doc.get('checked_at')}
+            with self._lock:
+                self.memory[normalized] = entry
+        return entry
+
+    def _remember(self, normalized: str, domain: Optional[str], source: str, organization: str = ''):
+        entry = {'domain': domain, 'source': source, 'checked_at': datetime.utcnow()}
+        with self._lock:
+            self.memory[normalized] = entry
+
+        if self.collection is not None:
+            self.collection.update_one(
+                {'_id': normalized},
+                {'$set': dict(entry, organization=organization)},
+                upsert=True
+            )
+
+    def lookup(self, company: str) -> Tuple[Optional[str], str]:
+        """Return (domain, source) where source is override, hunter, guess or unresolved"""
+        normalized = normalize_company(company)
+        if not normalized:
+            return None, 'unresolved'
+
+        if normalized in self.overrides:
+            self.stats['overrides'] += 1
+            return self.overrides[normalized], 'override'
+
+        entry = self._entry(normalized)
+        if entry and entry['source'] == 'hunter':
+            self.stats['confirmed'] += 1
+            return entry['domain'], 'hunter'
+        if entry and entry['source'] == 'unresolved':
+            checked_at = entry.get('checked_at')
+            if checked_at and datetime.utcnow() - checked_at < self.retry_after:
+                self.stats['unresolved'] += 1
+                return None, 'unresolved'
+
+        self.stats['guesses'] += 1
+        return guess_domain(company), 'guess'
+
+    def resolve(self, company: str) -> Optional[str]:
+        """Domain to use for a company, or None when it is known not to resolve"""
+        return self.lookup(company)[0]
+
+    def learn(self, company: str, domain_result: Dict) -> bool:
+        """Record what a domain search on the company's domain returned
+
+        Returns False when the domain was only a guess and Hunter knows nothing about
+        it, i.e. per-person lookups against it would be wasted.
+        """
+        normalized = normalize_company(company)
+        if not normalized:
+            return False
+        if domain_result.get('error'):
+            # A failed request says nothing about the domain
+            return True
+
+        domain = domain_result.get('domain')
+        organization = domain_result.get('organization') or ''
+        if organization or domain_result.get('emails') or domain_result.get('pattern'):
+            if normalized not in self.overrides:
+                self._remember(normalized, domain, 'hunter', organization)
+            alias = normalize_company(organization)
+            if alias and alias != normalized and alias not in self.overrides:
+                self._remember(alias, domain, 'hunter', organization)
+            return True
+
+        # Overrides and confirmed domains stay trusted even when Hunter has no data today
+        if normalized in self.overrides:
+            return True
+        entry = self._entry(normalized)
+        if entry and entry['source'] == 'hunter':
+            return True
+
+        self._remember(normalized, None, 'unresolved')
+        return False
+
+    def get_stats(self) -> Dict:
+        """Get counts of how company domains were resolved"""
+        return dict(self.stats)
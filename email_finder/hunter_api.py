@@ -1,97 +1,247 @@
 import os
+import asyncio
+import threading
 import requests
-from typing import Dict, Optional
+from datetime import datetime
+from typing import Dict, List, Optional
 from dotenv import load_dotenv
 
+from email_finder.hunter_cache import HunterCache, finder_key, verify_key, domain_key
+
 load_dotenv()
 
+DEFAULT_BASE_URL = 'https://api.hunter.io/v2'
+DEFAULT_TIMEOUT = 10
+
+
+def parse_email_finder(data: Dict) -> Optional[Dict]:
+    """Email data from an email-finder response, or None when nobody was found"""
+    if not data.get('data', {}).get('email'):
+        return None
+    return {
+        'email': data['data']['email'],
+        'score': data['data'].get('score', 0),
+        'sources': data['data'].get('sources', []),
+        'status': 'verified'
+    }
+
+
+def parse_email_verifier(email: str, data: Dict) -> Dict:
+    return {
+        'email': email,
+        'status': data['data']['status'],
+        'score': data['data'].get('score', 0),
+        'result': data['data'].get('result', 'unknown')
+    }
+
+
+def parse_domain_search(domain: str, data: Dict) -> Dict:
+    return {
+        'domain': domain,
+        'emails': data.get('data', {}).get('emails', []),
+        'pattern': data.get('data', {}).get('pattern', ''),
+        'organization': data.get('data', {}).get('organization', '')
+    }
+
+
+def finder_error(error: str) -> Dict:
+    """A finder lookup that could not be made; unlike None it says nothing about the person"""
+    return {
+        'email': None,
+        'score': 0,
+        'sources': [],
+        'status': 'error',
+        'error': error
+    }
+
+
+def verifier_error(email: str) -> Dict:
+    return {
+        'email': email,
+        'status': 'error',
+        'score': 0,
+        'result': 'error'
+    }
+
+
+def domain_search_error(domain: str, error: str) -> Dict:
+    return {
+        'domain': domain,
+        'emails': [],
+        'pattern': '',
+        'organization': '',
+        'error': error
+    }
+
+
+class HunterQuotaExceeded(Exception):
+    """Raised instead of making a request once the monthly plan limit is used up"""
+
+
+class MonthlyQuota:
+    """Counts paid requests against the plan's monthly limit; resets when the month changes.
+
+    Usage is tracked per process, so pass used= (e.g. from Hunter's account endpoint)
+    when starting mid-month. A limit of 0 disables the check.
+    """
+
+    def __init__(self, limit: int, used: int = 0):
+        self.limit = limit
+        self.used = used
+        self.month = datetime.utcnow().strftime('%Y-%m')
+        self._lock = threading.Lock()
+
+    def consume(self):
+        with self._lock:
+            month = datetime.utcnow().strftime('%Y-%m')
+            if month != self.month:
+                self.month, self.used = month, 0
+            if self.limit and self.used >= self.limit:
+                raise HunterQuotaExceeded(f"Hunter monthly limit of {self.limit} requests reached")
+            self.used += 1
+
+    def refund(self):
+        """Give back a request Hunter rejected without charging for it"""
+        with self._lock:
+            self.used = max(0, self.used - 1)
+
+    @property
+    def remaining(self) -> Optional[int]:
+        return max(0, self.limit - self.used) if self.limit else None
+
+
+_default_quota = None
+
+
+def default_quota() -> MonthlyQuota:
+    """Process-wide quota so short-lived clients share one monthly count"""
+    global _default_quota
+    if _default_quota is None:
+        _default_quota = MonthlyQuota(int(os.getenv('HUNTER_MONTHLY_QUOTA', '0')))
+    return _default_quota
+
+
 class HunterAPI:
-    def __init__(self):
+    def __init__(self, cache: Optional[HunterCache] = None, base_url: Optional[str] = None,
+                 timeout: float = DEFAULT_TIMEOUT, quota: Optional[MonthlyQuota] = None):
         self.api_key = os.getenv('HUNTER_API_KEY')
-        self.base_url = 'https://api.hunter.io/v2'
+        self.base_url = base_url or os.getenv('HUNTER_BASE_URL', DEFAULT_BASE_URL)
         self.headers = {
             'Authorization': f'Bearer {self.api_key}',
             'Content-Type': 'application/json'
         }
+        self.timeout = timeout
+        # Keep-alive session so consecutive calls reuse one TLS connection
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        # Optional cache; lookups that hit it cost no API quota
+        self.cache = cache
+        self.quota = quota or default_quota()
+        # Token bucket shared by every batch, set up by the first one
+        self.limiter = None
+
+    def _cached(self, key: str):
+        if self.cache is None:
+            return False, None
+        return self.cache.get(key)
+
+    def _store(self, key: str, value: Optional[Dict], negative: bool = False):
+        if self.cache is not None:
+            self.cache.set(key, value, negative)
+
+    def _get(self, path: str, params: Dict) -> Dict:
+        self.quota.consume()
+        response = self.session.get(f'{self.base_url}/{path}', params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
 
     def find_email(self, first_name: str, last_name: str, domain: str) -> Optional[Dict]:
         """Find email using Hunter.io API"""
-        endpoint = f'{self.base_url}/email-finder'
+        key = finder_key(first_name, last_name, domain)
+        hit, cached = self._cached(key)
+        if hit:
+            return cached
+
         params = {
             'first_name': first_name,
             'last_name': last_name,
             'domain': domain
         }
-        
+
         try:
-            response = requests.get(endpoint, headers=self.headers, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            if data.get('data', {}).get('email'):
-                return {
-                    'email': data['data']['email'],
-                    'score': data['data'].get('score', 0),
-                    'sources': data['data'].get('sources', []),
-                    'status': 'verified'
-                }
-            return None
-            
+            result = parse_email_finder(self._get('email-finder', params))
+            # Remember misses too so the next run does not pay for them again
+            self._store(key, result, negative=result is None)
+            return result
+
         except requests.exceptions.RequestException as e:
             print(f"Error finding email: {e}")
-            return None
+            # Not a miss: the person is looked up again on a later run
+            return finder_error(str(e))
 
     def verify_email(self, email: str) -> Dict:
         """Verify email using Hunter.io API"""
-        endpoint = f'{self.base_url}/email-verifier'
-        params = {'email': email}
-        
+        key = verify_key(email)
+        hit, cached = self._cached(key)
+        if hit:
+            return cached
+
         try:
-            response = requests.get(endpoint, headers=self.headers, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            return {
-                'email': email,
-                'status': data['data']['status'],
-                'score': data['data'].get('score', 0),
-                'result': data['data'].get('result', 'unknown')
-            }
-            
+            result = parse_email_verifier(email, self._get('email-verifier', {'email': email}))
+            # Inconclusive verdicts may change, so they expire sooner
+            self._store(key, result, negative=result['status'] in ('unknown', 'accept_all'))
+            return result
+
         except requests.exceptions.RequestException as e:
             print(f"Error verifying email: {e}")
-            return {
-                'email': email,
-                'status': 'error',
-                'score': 0,
-                'result': 'error'
-            }
+            return verifier_error(email)
 
     def get_domain_search(self, domain: str, limit: int = 100) -> Dict:
         """Get all emails for a domain"""
-        endpoint = f'{self.base_url}/domain-search'
+        key = domain_key(domain)
+        hit, cached = self._cached(key)
+        if hit:
+            return cached
+
         params = {
             'domain': domain,
             'limit': limit
         }
-        
+
         try:
-            response = requests.get(endpoint, headers=self.headers, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            return {
-                'domain': domain,
-                'emails': data.get('data', {}).get('emails', []),
-                'pattern': data.get('data', {}).get('pattern', ''),
-                'organization': data.get('data', {}).get('organization', '')
-            }
-            
+            result = parse_domain_search(domain, self._get('domain-search', params))
+            self._store(key, result, negative=not (result['emails'] or result['pattern']))
+            return result
+
         except requests.exceptions.RequestException as e:
             print(f"Error getting domain search: {e}")
-            return {
-                'domain': domain,
-                'emails': [],
-                'pattern': '',
-                'organization': ''
-            } 
\ No newline at end of file
+            return domain_search_error(domain, str(e))
+
+    def _run_async(self, method: str, items: List, concurrency: int, **kwargs) -> List:
+        # Imported here so the sync client works without httpx installed
+        from email_finder.async_hunter import AsyncHunterAPI
+
+        async def run():
+            async with AsyncHunterAPI(cache=self.cache, base_url=self.base_url, timeout=self.timeout,
+                                      quota=self.quota, limiter=self.limiter) as client:
+                # Back-to-back batches keep draining one bucket instead of each starting full
+                self.limiter = client.limiter
+                return await getattr(client, method)(items, concurrency, **kwargs)
+
+        return asyncio.run(run())
+
+    def find_emails_batch(self, people: List[Dict], concurrency: int = 5) -> List[Optional[Dict]]:
+        """Find emails for [{'first_name', 'last_name', 'domain'}] concurrently, in input order
+
+        Lookups that failed or were refused by the monthly quota come back as
+        finder_error results rather than None, which means nobody was found.
+        """
+        return self._run_async('find_emails_batch', people, concurrency)
+
+    def verify_batch(self, emails: List[str], concurrency: int = 5) -> List[Dict]:
+        """Verify emails concurrently, in input order"""
+        return self._run_async('verify_batch', emails, concurrency)
+
+    def domain_search_batch(self, domains: List[str], concurrency: int = 5, limit: int = 100) -> List[Dict]:
+        """Search domains concurrently, in input order, returning up to limit emails each"""
+        return self._run_async('domain_search_batch', domains, concurrency, limit=limit)
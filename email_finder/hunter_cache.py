@@ -0,0 +1,124 @@
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+DAY = 24 * 60 * 60
+
+
+def normalize_domain(domain: str) -> str:
+    domain = (domain or '').strip().lower()
+    return domain[4:] if domain.startswith('www.') else domain
+
+
+def finder_key(first_name: str, last_name: str, domain: str) -> str:
+    first = ' '.join((first_name or '').lower().split())
+    last = ' '.join((last_name or '').lower().split())
+    return f"finder:{first}|{last}|{normalize_domain(domain)}"
+
+
+def verify_key(email: str) -> str:
+    return f"verify:{(email or '').strip().lower()}"
+
+
+def domain_key(domain: str) -> str:
+    return f"domain:{normalize_domain(domain)}"
+
+
+class LRUCache:
+    """Small in-process LRU with a per-entry expiry time"""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            value, expires_at = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key: str, value: Any, ttl: float):
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+class HunterCache:
+    """Two-level cache for Hunter.io lookups: an in-process LRU in front of a Mongo collection.
+
+    Results that found nothing are cached as negatives with a shorter TTL, so people
+    without a public address are retried eventually but not on every run. Mongo drops
+    expired documents through a TTL index on expires_at.
+    """
+
+    def __init__(self, collection=None, maxsize: int = 1024,
+                 positive_ttl: float = 30 * DAY, negative_ttl: float = 3 * DAY):
+        self.collection = collection
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.memory = LRUCache(maxsize)
+        self.stats = {'hits': 0, 'misses': 0, 'saved_quota': 0}
+        self._indexes_ready = False
+        self._lock = threading.Lock()
+
+    def _ensure_indexes(self):
+        if self.collection is not None and not self._indexes_ready:
+            self.collection.create_index('expires_at', expireAfterSeconds=0)
+            self._indexes_ready = True
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (hit, value); value is None for a cached negative result"""
+        hit, value = self.memory.get(key)
+
+        if not hit and self.collection is not None:
+            self._ensure_indexes()
+            doc = self.collection.find_one({'_id': key, 'expires_at': {'$gt': datetime.utcnow()}})
+            if doc:
+                hit, value = True, doc.get('value')
+                remaining = (doc['expires_at'] - datetime.utcnow()).total_seconds()
+                self.memory.set(key, value, remaining)
+
+        with self._lock:
+            if hit:
+                self.stats['hits'] += 1
+                # Every hit is a paid request we did not make
+                self.stats['saved_quota'] += 1
+            else:
+                self.stats['misses'] += 1
+        return hit, value
+
+    def set(self, key: str, value: Optional[Dict], negative: bool = False):
+        """Cache a result; negative results expire after negative_ttl"""
+        ttl = self.negative_ttl if negative else self.positive_ttl
+        self.memory.set(key, value, ttl)
+
+        if self.collection is not None:
+            self._ensure_indexes()
+            self.collection.update_one(
+                {'_id': key},
+                {'$set': {
+                    'value': value,
+                    'negative': negative,
+                    'expires_at': datetime.utcnow() + timedelta(seconds=ttl)
+                }},
+                upsert=True
+            )
+
+    def get_stats(self) -> Dict:
+        """Get hit, miss and saved-quota counters"""
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
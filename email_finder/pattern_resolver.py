@@ -0,0 +1,198 @@
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from email_finder.domain_resolver import CompanyDomainResolver
+from email_finder.hunter_api import HunterAPI
+from email_finder.pre_verify import PreVerifier
+
+PATTERN_TOKEN = re.compile(r'\{(first|last|f|l)\}')
+
+
+def split_name(full_name: str) -> Tuple[str, str]:
+    """Split a display name into first and last name"""
+    name_parts = (full_name or '').split()
+    if not name_parts:
+        return '', ''
+    first_name = name_parts[0]
+    last_name = name_parts[-1] if len(name_parts) > 1 else ''
+    return first_name, last_name
+
+
+def _name_token(name: str) -> str:
+    """Lowercase ASCII form of a name as it appears in an address"""
+    ascii_name = unicodedata.normalize('NFKD', name or '').encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]', '', ascii_name.lower())
+
+
+def apply_pattern(pattern: str, first_name: str, last_name: str, domain: str) -> Optional[str]:
+    """Fill a Hunter pattern such as '{first}.{last}' or '{f}{last}'; None if a needed part is missing"""
+    first = _name_token(first_name)
+    last = _name_token(last_name)
+    values = {'first': first, 'last': last, 'f': first[:1], 'l': last[:1]}
+
+    missing = False
+
+    def substitute(match):
+        nonlocal missing
+        value = values[match.group(1)]
+        if not value:
+            missing = True
+        return value
+
+    local_part = PATTERN_TOKEN.sub(substitute, pattern)
+    if missing or not local_part:
+        return None
+    return f"{local_part}@{domain}"
+
+
+def pattern_confidence(domain_result: Dict) -> float:
+    """Share of the named addresses Hunter returned for a domain that follow its pattern"""
+    pattern = domain_result.get('pattern')
+    if not pattern:
+        return 0.0
+
+    named = [
+        email for email in domain_result.get('emails', [])
+        if email.get('first_name') and email.get('last_name') and email.get('value')
+    ]
+    if not named:
+        # Hunter reported a pattern without examples we can check
+        return 0.5
+
+    matches = sum(
+        1 for email in named
+        if apply_pattern(pattern, email['first_name'], email['last_name'], domain_result['domain']) == email['value'].lower()
+    )
+    return matches / len(named)
+
+
+class DomainPatternResolver:
+    """Finds emails with one domain search per company instead of one finder call per person.
+
+    Recruiters are grouped by domain; each domain's Hunter pattern is applied locally
+    to everyone at that company. find_email is only used when the domain has no
+    pattern, the pattern's confidence is below min_confidence, or a person's name
+    does not fill the pattern.
+
+    With a pre_verifier, pattern guesses that fail local checks (syntax, disposable
+    domain, no MX) are dropped; with verify=True the survivors are also confirmed
+    through Hunter's paid verifier.
+    """
+
+    def __init__(self, hunter: HunterAPI, min_confidence: float = 0.6,
+                 domain_resolver: Optional[CompanyDomainResolver] = None, concurrency: int = 5,
+                 pre_verifier: Optional[PreVerifier] = None, verify: bool = False, sample_size: int = 10):
+        self.hunter = hunter
+        self.min_confidence = min_confidence
+        # Sample addresses fetched per domain search; enough to check the pattern against
+        self.sample_size = sample_size
+        # Hunter lookups run this many at a time
+        self.concurrency = concurrency
+        # Learns which guessed company domains exist from the domain searches made here
+        self.domain_resolver = domain_resolver
+        self.pre_verifier = pre_verifier
+        self.verify = verify
+        self.stats = {
+            'domain_searches': 0, 'pattern_matches': 0, 'finder_calls': 0, 'dead_domains': 0,
+            'pre_rejected': 0, 'verify_calls': 0, 'lookup_errors': 0
+        }
+
+    def _domain_exists(self, domain_people: List[Dict], result: Dict) -> bool:
+        if self.domain_resolver is None:
+            return True
+        companies = {person['company'] for person in domain_people if person.get('company')}
+        if not companies:
+            return True
+        return any([self.domain_resolver.learn(company, result) for company in companies])
+
+    def resolve(self, people: List[Dict]) -> Dict[str, Optional[Dict]]:
+        """Resolve emails for people given as {'id', 'first_name', 'last_name', 'domain'}
+
+        An optional 'company' lets the domain resolver learn from the domain search.
+        Returns email data (or None when nothing was found) keyed by id. People whose
+        lookup could not be made, e.g. because the Hunter quota ran out, are left out
+        so they can be retried later.
+        """
+        by_domain = defaultdict(list)
+        for person in people:
+            by_domain[person['domain']].append(person)
+
+        domains = list(by_domain)
+        if not domains:
+            return {}
+        self.stats['domain_searches'] += len(domains)
+        domain_results = dict(zip(domains, self.hunter.domain_search_batch(domains, self.concurrency, self.sample_size)))
+
+        results = {}
+        fallback = []
+        for domain, domain_people in by_domain.items():
+            result = domain_results[domain]
+            if not self._domain_exists(domain_people, result):
+                # A guessed domain Hunter knows nothing about; finder calls would all miss
+                self.stats['dead_domains'] += 1
+                for person in domain_people:
+                    results[person['id']] = None
+                continue
+
+            pattern = result.get('pattern') or None
+            confidence = pattern_confidence(result)
+            use_pattern = pattern and confidence >= self.min_confidence
+
+            for person in domain_people:
+                email = None
+                if use_pattern:
+                    email = apply_pattern(pattern, person['first_name'], person['last_name'], domain)
+
+                if email:
+                    self.stats['pattern_matches'] += 1
+                    results[person['id']] = {
+                        'email': email,
+                        'score': int(confidence * 100),
+                        'sources': [],
+                        'status': 'pattern'
+                    }
+                else:
+                    fallback.append(person)
+
+        # Everyone the patterns could not cover is looked up concurrently
+        if fallback:
+            self.stats['finder_calls'] += len(fallback)
+            found = self.hunter.find_emails_batch(fallback, self.concurrency)
+            for person, email_data in zip(fallback, found):
+                if email_data and email_data['status'] == 'error':
+                    self.stats['lookup_errors'] += 1
+                    continue
+                results[person['id']] = email_data
+
+        if self.pre_verifier is not None:
+            self._screen_patterns(results)
+
+        return results
+
+    def _screen_patterns(self, results: Dict[str, Optional[Dict]]):
+        """Drop undeliverable pattern guesses; optionally pay to verify only the survivors"""
+        candidates = {
+            person_id: email_data['email'] for person_id, email_data in results.items()
+            if email_data and email_data['status'] == 'pattern'
+        }
+        survivors, rejected = self.pre_verifier.screen(sorted(set(candidates.values())))
+        for person_id, email in candidates.items():
+            if email in rejected:
+                self.stats['pre_rejected'] += 1
+                results[person_id] = None
+
+        if not (self.verify and survivors):
+            return
+
+        self.stats['verify_calls'] += len(survivors)
+        verdicts = dict(zip(survivors, self.hunter.verify_batch(survivors, self.concurrency)))
+        for person_id, email in candidates.items():
+            verdict = verdicts.get(email)
+            if not verdict:
+                continue
+            if verdict['status'] in ('invalid', 'disposable'):
+                results[person_id] = None
+            elif verdict['status'] == 'valid':
+                results[person_id] = dict(results[person_id], status='verified', score=verdict['score'])
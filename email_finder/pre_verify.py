@@ -0,0 +1,162 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+from email_finder.hunter_cache import LRUCache, DAY, normalize_domain
+
+try:
+    import dns.resolver
+    import dns.exception
+except ImportError:  # dnspython is optional; without it MX checks report unknown
+    dns = None
+
+# Practical subset of RFC 5322: dot-atom local part and an LDH domain with an alphabetic TLD
+LOCAL_PART = re.compile(r"^[a-z0-9!#$%&'*+/=?^_`{|}~-]+(\.[a-z0-9!#$%&'*+/=?^_`{|}~-]+)*$")
+DOMAIN_LABEL = re.compile(r'^[a-z0-9]([a-z0-9-]{0,61}[a-z0-9])?$')
+TLD = re.compile(r'^[a-z]{2,63}$|^xn--[a-z0-9-]{1,59}$')
+
+DISPOSABLE_DOMAINS = {
+    '10minutemail.com', 'guerrillamail.com', 'guerrillamail.net', 'mailinator.com', 'maildrop.cc',
+    'sharklasers.com', 'tempmail.com', 'temp-mail.org', 'throwawaymail.com', 'trashmail.com',
+    'yopmail.com', 'getnada.com', 'dispostable.com', 'fakeinbox.com', 'mintemail.com',
+    'mohmal.com', 'emailondeck.com', 'burnermail.io', 'tempail.com', 'spamgourmet.com'
+}
+
+# Shared inboxes rather than a person; deliverable, but not who we want to reach
+ROLE_ACCOUNTS = {
+    'admin', 'administrator', 'careers', 'contact', 'hello', 'help', 'hr', 'info', 'jobs',
+    'mail', 'marketing', 'noreply', 'no-reply', 'office', 'postmaster', 'recruiting',
+    'recruitment', 'sales', 'support', 'talent', 'team', 'webmaster'
+}
+
+
+def check_syntax(email: str) -> bool:
+    """Whether an address is syntactically deliverable"""
+    email = (email or '').strip().lower()
+    if len(email) > 254 or email.count('@') != 1:
+        return False
+    local_part, domain = email.split('@')
+    if not local_part or len(local_part) > 64 or not LOCAL_PART.match(local_part):
+        return False
+
+    labels = domain.split('.')
+    if len(labels) < 2 or not all(DOMAIN_LABEL.match(label) for label in labels):
+        return False
+    return bool(TLD.match(labels[-1]))
+
+
+class DNSMXResolver:
+    """Looks up mail exchangers with dnspython
+
+    Returns the MX hosts, an empty list when the domain cannot receive mail, or None
+    when DNS could not give an answer.
+    """
+
+    def __init__(self, timeout: float = 3.0):
+        self.timeout = timeout
+        self.resolver = dns.resolver.Resolver() if dns is not None else None
+
+    def lookup(self, domain: str) -> Optional[List[str]]:
+        if self.resolver is None:
+            return None
+        try:
+            answer = self.resolver.resolve(domain, 'MX', lifetime=self.timeout)
+            hosts = [str(record.exchange).rstrip('.') for record in answer]
+            # A single "." is a null MX: the domain explicitly accepts no mail
+            return [host for host in hosts if host]
+        except dns.resolver.NXDOMAIN:
+            return []
+        except dns.resolver.NoAnswer:
+            # No MX record means mail goes to the domain's A record, if it has one
+            try:
+                self.resolver.resolve(domain, 'A', lifetime=self.timeout)
+                return [domain]
+            except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+                return []
+            except dns.exception.DNSException:
+                return None
+        except dns.exception.DNSException:
+            return None
+
+
+class StaticMXResolver:
+    """Answers MX lookups from a dict; for offline runs and tests"""
+
+    def __init__(self, records: Optional[Dict[str, List[str]]] = None, default: Optional[List[str]] = None):
+        self.records = {normalize_domain(domain): hosts for domain, hosts in (records or {}).items()}
+        self.default = default
+
+    def lookup(self, domain: str) -> Optional[List[str]]:
+        return self.records.get(normalize_domain(domain), self.default)
+
+
+class PreVerifier:
+    """Screens candidate addresses locally before they are sent to paid verification.
+
+    Checks syntax, disposable domains, role accounts and whether the domain has mail
+    exchangers. MX answers are cached per domain, misses for less time than hits.
+    Each check returns a confidence score; only addresses at or above min_confidence
+    are worth a verify_email call.
+    """
+
+    def __init__(self, resolver=None, min_confidence: float = 0.5,
+                 mx_ttl: float = DAY, no_mx_ttl: float = DAY / 24, cache_size: int = 4096):
+        self.resolver = resolver or DNSMXResolver()
+        self.min_confidence = min_confidence
+        self.mx_ttl = mx_ttl
+        self.no_mx_ttl = no_mx_ttl
+        self.mx_cache = LRUCache(cache_size)
+        self.stats = {'checked': 0, 'rejected': 0, 'mx_lookups': 0}
+
+    def mx_hosts(self, domain: str) -> Optional[List[str]]:
+        domain = normalize_domain(domain)
+        hit, hosts = self.mx_cache.get(domain)
+        if hit:
+            return hosts
+
+        self.stats['mx_lookups'] += 1
+        hosts = self.resolver.lookup(domain)
+        if hosts is not None:
+            # Unknown answers are not cached so the next check asks again
+            self.mx_cache.set(domain, hosts, self.mx_ttl if hosts else self.no_mx_ttl)
+        return hosts
+
+    def check(self, email: str) -> Dict:
+        """Score one address: {'email', 'deliverable', 'confidence', 'reasons'}"""
+        self.stats['checked'] += 1
+        email = (email or '').strip().lower()
+        result = {'email': email, 'deliverable': False, 'confidence': 0.0, 'reasons': []}
+
+        if not check_syntax(email):
+            result['reasons'].append('syntax')
+        else:
+            local_part, domain = email.split('@')
+            if normalize_domain(domain) in DISPOSABLE_DOMAINS:
+                result['reasons'].append('disposable')
+            else:
+                hosts = self.mx_hosts(domain)
+                if hosts == []:
+                    result['reasons'].append('no_mx')
+                else:
+                    result['deliverable'] = True
+                    # Without a DNS answer the address is plausible but unconfirmed
+                    result['confidence'] = 0.9 if hosts else 0.6
+                    if hosts is None:
+                        result['reasons'].append('mx_unknown')
+                    if local_part in ROLE_ACCOUNTS:
+                        result['reasons'].append('role_account')
+                        result['confidence'] = 0.3
+
+        if result['confidence'] < self.min_confidence:
+            self.stats['rejected'] += 1
+        return result
+
+    def screen(self, emails: List[str]) -> Tuple[List[str], Dict[str, Dict]]:
+        """Split addresses into survivors worth verifying and rejected checks keyed by address"""
+        survivors, rejected = [], {}
+        for email in emails:
+            result = self.check(email)
+            if result['confidence'] >= self.min_confidence:
+                survivors.append(email)
+            else:
+                rejected[email] = result
+        return survivors, rejected
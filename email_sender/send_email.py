@@ -1,74 +1,66 @@
 import os
-import time
-import random
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from typing import Dict, List
+from typing import Dict, List, Optional
 from dotenv import load_dotenv
 
-load_dotenv()
-
-class EmailSender:
-    def __init__(self):
-        self.smtp_server = "smtp.gmail.com"
-        self.smtp_port = 587
-        self.gmail_user = os.getenv('GMAIL_USER')
-        self.gmail_password = os.getenv('GMAIL_APP_PASSWORD')  # Use App Password for Gmail
-        self.templates = {
-            'initial': """
-            Hi {name},
-
-            I came across your profile while looking into {company} opportunities. 
-            I'm passionate about {field} roles and believe my background fits your hiring goals.
+from email_sender.delivery_scheduler import DeliveryScheduler
+from email_sender.smtp_pool import SMTPSessionManager
+from email_sender.templates import TemplateRegistry
 
-            Would love to connect!
-
-            Best regards,
-            {your_name}
-            """,
-            'follow_up': """
-            Hi {name},
+load_dotenv()
 
-            I hope this email finds you well. I wanted to follow up on my previous message about {field} opportunities at {company}.
+# Enhanced status codes and replies that mean the recipient's whole domain cannot receive mail
+DOMAIN_BOUNCE_MARKERS = ('5.1.2', '5.1.10', 'host unknown', 'domain not found', 'no mx')
 
-            I'm particularly interested in [specific role/team] and would love to learn more about your hiring process.
 
-            Looking forward to your response!
+def classify_bounce(code: int, reply: str) -> Optional[str]:
+    """'email' or 'domain' for a permanent (5xx) refusal, None for a temporary one"""
+    if not 500 <= code < 600:
+        return None
+    reply = reply.lower()
+    return 'domain' if any(marker in reply for marker in DOMAIN_BOUNCE_MARKERS) else 'email'
 
-            Best regards,
-            {your_name}
-            """
-        }
 
-    def send_email(self, to_email: str, template_name: str, template_data: Dict) -> Dict:
-        """Send an email using Gmail SMTP"""
+class EmailSender:
+    def __init__(self, scheduler: Optional[DeliveryScheduler] = None,
+                 templates: Optional[TemplateRegistry] = None):
+        self.smtp_server = os.getenv('SMTP_SERVER', "smtp.gmail.com")
+        self.smtp_port = int(os.getenv('SMTP_PORT', '587'))
+        self.gmail_user = os.getenv('GMAIL_USER')
+        self.gmail_password = os.getenv('GMAIL_APP_PASSWORD')  # Use App Password for Gmail
+        # Send pacing is tracked per sending mailbox
+        self.mailbox = self.gmail_user or 'default'
+        # One authenticated session shared by every send instead of a new login per email
+        self.smtp = SMTPSessionManager(
+            self.smtp_server,
+            self.smtp_port,
+            username=self.gmail_user,
+            password=self.gmail_password,
+            use_tls=os.getenv('SMTP_STARTTLS', 'true').lower() == 'true'
+        )
+        # Decides when this mailbox may send next; send_email itself never waits
+        self.scheduler = scheduler or DeliveryScheduler()
+        # Compiled and validated once; TemplateError surfaces broken templates at startup
+        self.templates = templates or TemplateRegistry.from_directory()
+
+    def send_email(self, to_email: str, template_name: str, template_data: Dict,
+                   message_id: Optional[str] = None) -> Dict:
+        """Send an email using Gmail SMTP
+
+        A stable message_id (e.g. the outbox key) becomes the Message-ID header, so a
+        resend of the same message can be recognised as a duplicate.
+        """
         try:
-            # Get template
-            template = self.templates.get(template_name)
-            if not template:
-                raise ValueError(f"Template {template_name} not found")
-
-            # Format template with data
-            formatted_content = template.format(**template_data)
-
-            # Create message
-            msg = MIMEMultipart()
-            msg['From'] = self.gmail_user
-            msg['To'] = to_email
-            msg['Subject'] = f"Regarding {template_data.get('field', '')} Opportunities at {template_data.get('company', '')}"
-
-            # Add body
-            msg.attach(MIMEText(formatted_content, 'plain'))
-
-            # Add random delay to mimic human behavior
-            time.sleep(random.uniform(5, 10))
-
-            # Connect to SMTP server and send email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.gmail_user, self.gmail_password)
-                server.send_message(msg)
+            # Render subject and body onto the template's prebuilt message skeleton
+            msg = self.templates.get(template_name).message(
+                self.gmail_user,
+                to_email,
+                template_data,
+                message_id=f"<{message_id}@{self.mailbox.split('@')[-1]}>" if message_id else None
+            )
+
+            # Send over the shared SMTP session
+            self.smtp.send_message(msg)
             
             return {
                 'status': 'success',
@@ -76,6 +68,20 @@ class EmailSender:
                 'template': template_name
             }
 
+        except smtplib.SMTPRecipientsRefused as e:
+            # The server refused the recipient outright; 5xx means retrying is pointless
+            code, reply = next(iter(e.recipients.values()))
+            reply = reply.decode('utf-8', 'replace') if isinstance(reply, bytes) else str(reply)
+            bounce = classify_bounce(code, reply)
+            return {
+                'status': 'bounced' if bounce else 'error',
+                'bounce': bounce,
+                'code': code,
+                'error': reply,
+                'email': to_email,
+                'template': template_name
+            }
+
         except Exception as e:
             return {
                 'status': 'error',
@@ -84,12 +90,25 @@ class EmailSender:
                 'template': template_name
             }
 
+    def wait_for_slot(self):
+        """Block until the delivery schedule allows this mailbox to send again"""
+        self.scheduler.wait_for_slot(self.mailbox)
+
     def send_bulk_emails(self, emails: List[Dict], template_name: str, template_data: Dict) -> List[Dict]:
-        """Send emails to multiple recipients"""
+        """Send emails to multiple recipients, paced by the delivery schedule
+
+        This sends inline and so blocks between messages; Celery callers should
+        schedule one send task per message at its slot instead.
+        """
+        # Add recipient-specific data to template data
+        records = [{**template_data, **email_data} for email_data in emails]
+        
+        # Fail on missing fields before the first email goes out, not halfway through
+        self.templates.render_batch(template_name, records)
+        
         results = []
-        for email_data in emails:
-            # Add recipient-specific data to template data
-            recipient_data = {**template_data, **email_data}
+        for email_data, recipient_data in zip(emails, records):
+            self.wait_for_slot()
             
             # Send email
             result = self.send_email(
@@ -100,7 +119,8 @@ class EmailSender:
             
             results.append(result)
             
-            # Add delay between emails
-            time.sleep(random.uniform(30, 60))
-            
-        return results 
\ No newline at end of file
+        return results 
+
+    def close(self):
+        """Close the shared SMTP session"""
+        self.smtp.close()
@@ -0,0 +1,106 @@
+import os
+import time
+import smtplib
+import threading
+from email.message import Message
+from typing import Optional
+
+
+class SMTPSessionManager:
+    """Keeps one authenticated SMTP session open across sends.
+
+    Opening a session costs a TCP connect, EHLO, STARTTLS (with its TLS handshake), a
+    second EHLO and AUTH. The session is reused for every message and checked with
+    NOOP before use after it has been idle; it is replaced after max_messages sends or
+    max_age seconds, since providers drop long-lived sessions. A send that finds the
+    server gone reconnects and retries once.
+    """
+
+    def __init__(self, host: str, port: int, username: Optional[str] = None, password: Optional[str] = None,
+                 use_tls: bool = True, timeout: float = 30, max_messages: Optional[int] = None,
+                 max_age: Optional[float] = None, noop_after: float = 5):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.max_messages = max_messages if max_messages is not None else int(os.getenv('SMTP_MAX_MESSAGES', '100'))
+        self.max_age = max_age if max_age is not None else float(os.getenv('SMTP_MAX_AGE', '300'))
+        # A session used within the last noop_after seconds is assumed alive without a NOOP
+        self.noop_after = noop_after
+        self.stats = {'connects': 0, 'reconnects': 0, 'sent': 0}
+        self._server = None
+        self._opened_at = 0.0
+        self._last_used = 0.0
+        self._messages = 0
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            server.ehlo()
+            if self.use_tls:
+                server.starttls()
+                server.ehlo()
+            if self.username:
+                server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+
+        self.stats['connects'] += 1
+        self._opened_at = self._last_used = time.monotonic()
+        self._messages = 0
+        return server
+
+    def _discard(self):
+        server, self._server = self._server, None
+        if server is None:
+            return
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+    def _expired(self) -> bool:
+        return self._messages >= self.max_messages or time.monotonic() - self._opened_at >= self.max_age
+
+    def _alive(self) -> bool:
+        if time.monotonic() - self._last_used < self.noop_after:
+            return True
+        try:
+            return self._server.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def _session(self) -> smtplib.SMTP:
+        if self._pid != os.getpid():
+            # A session inherited from a parent process shares its socket; never reuse it
+            self._server, self._pid = None, os.getpid()
+
+        if self._server is not None and (self._expired() or not self._alive()):
+            self._discard()
+        if self._server is None:
+            self._server = self._connect()
+        return self._server
+
+    def send_message(self, msg: Message):
+        """Send a message over the shared session, reconnecting once if the server hung up"""
+        with self._lock:
+            try:
+                self._session().send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                self._server = None
+                self.stats['reconnects'] += 1
+                self._session().send_message(msg)
+
+            self._messages += 1
+            self._last_used = time.monotonic()
+            self.stats['sent'] += 1
+
+    def close(self):
+        """Quit the open session, if any"""
+        with self._lock:
+            self._discard()
@@ -0,0 +1,140 @@
+import os
+import glob
+import string
+import textwrap
+from email.charset import Charset, QP
+from email.message import Message
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+DEFAULT_TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'email_templates')
+
+# Quoted-printable keeps mostly-ASCII bodies readable on the wire
+UTF8_QP = Charset('utf-8')
+UTF8_QP.body_encoding = QP
+
+
+class TemplateError(ValueError):
+    """A template that cannot be compiled, or data that cannot fill it"""
+
+
+def _fields(text: str, name: str) -> Set[str]:
+    """Top-level field names a format string needs; raises TemplateError on bad syntax"""
+    try:
+        parsed = list(string.Formatter().parse(text))
+    except ValueError as e:
+        raise TemplateError(f"Template {name}: {e}")
+
+    fields = set()
+    for _, field_name, _, _ in parsed:
+        if field_name is None:
+            continue
+        if not field_name or field_name[0].isdigit():
+            raise TemplateError(f"Template {name}: only named fields are supported")
+        fields.add(field_name.split('.')[0].split('[')[0])
+    return fields
+
+
+class CompiledTemplate:
+    """A subject and body parsed and validated once, with a reusable message skeleton"""
+
+    def __init__(self, name: str, subject: str, body: str):
+        self.name = name
+        self.subject = ' '.join(subject.split())
+        # Templates are written indented in code and files; recipients should not see that
+        self.body = textwrap.dedent(body).strip() + '\n'
+        self.fields = _fields(self.subject, name) | _fields(self.body, name)
+        self._skeletons = {}
+
+    def missing_fields(self, data: Dict) -> Set[str]:
+        return self.fields - data.keys()
+
+    def render(self, data: Dict) -> Tuple[str, str]:
+        """Render (subject, body); raises TemplateError when a field is missing"""
+        missing = self.missing_fields(data)
+        if missing:
+            raise TemplateError(f"Template {self.name} is missing {', '.join(sorted(missing))}")
+        return self.subject.format_map(data), self.body.format_map(data)
+
+    def message(self, sender: str, to_email: str, data: Dict, message_id: Optional[str] = None) -> Message:
+        """Build a ready-to-send message from this template's prebuilt header skeleton"""
+        subject, body = self.render(data)
+
+        skeleton = self._skeletons.get(sender)
+        if skeleton is None:
+            skeleton = self._skeletons[sender] = [('MIME-Version', '1.0'), ('From', sender)]
+
+        msg = Message()
+        for header, value in skeleton:
+            msg[header] = value
+        msg['To'] = to_email
+        msg['Subject'] = subject
+        if message_id:
+            msg['Message-ID'] = message_id
+        msg.set_payload(body, UTF8_QP)
+        return msg
+
+
+class TemplateRegistry:
+    """Named email templates compiled at load time.
+
+    Templates come from files (a 'Subject: ...' line, a blank line, then the body) or
+    from Mongo documents with name, subject and body fields; later loads override
+    earlier ones, so Mongo can patch the checked-in defaults. Broken templates fail
+    when loaded and missing fields are reported before anything is rendered or sent.
+    """
+
+    def __init__(self, templates: Optional[Dict[str, CompiledTemplate]] = None):
+        self.templates = dict(templates or {})
+
+    @classmethod
+    def from_directory(cls, directory: str = DEFAULT_TEMPLATE_DIR) -> 'TemplateRegistry':
+        registry = cls()
+        registry.load_directory(directory)
+        return registry
+
+    def register(self, name: str, subject: str, body: str) -> CompiledTemplate:
+        template = CompiledTemplate(name, subject, body)
+        self.templates[name] = template
+        return template
+
+    def load_directory(self, directory: str) -> int:
+        """Load every *.txt template in directory, named after the file"""
+        paths = sorted(glob.glob(os.path.join(directory, '*.txt')))
+        for path in paths:
+            with open(path, 'r', encoding='utf-8') as f:
+                header, _, body = f.read().partition('\n\n')
+            if not header.lower().startswith('subject:'):
+                raise TemplateError(f"Template file {path} must start with a 'Subject:' line")
+            name = os.path.splitext(os.path.basename(path))[0]
+            self.register(name, header.split(':', 1)[1], body)
+        return len(paths)
+
+    def load_mongo(self, collection) -> int:
+        """Load templates stored as {'name', 'subject', 'body'} documents"""
+        count = 0
+        for doc in collection.find({}, {'name': 1, 'subject': 1, 'body': 1}):
+            self.register(doc['name'], doc['subject'], doc['body'])
+            count += 1
+        return count
+
+    def get(self, name: str) -> CompiledTemplate:
+        template = self.templates.get(name)
+        if template is None:
+            raise TemplateError(f"Template {name} not found")
+        return template
+
+    def validate(self, name: str, records: Iterable[Dict]) -> List[Set[str]]:
+        """Missing fields per record, in order; all empty means the batch can be rendered"""
+        template = self.get(name)
+        return [template.missing_fields(record) for record in records]
+
+    def render_batch(self, name: str, records: List[Dict]) -> List[Tuple[str, str]]:
+        """Render (subject, body) for every record, or raise before rendering any"""
+        template = self.get(name)
+        problems = [
+            f"record {index}: {', '.join(sorted(missing))}"
+            for index, missing in enumerate(self.validate(name, records)) if missing
+        ]
+        if problems:
+            raise TemplateError(f"Template {name} is missing fields for " + '; '.join(problems))
+        return [(template.subject.format_map(record), template.body.format_map(record)) for record in records]
@@ -1,13 +1,26 @@
 import os
 import time
 from celery import Celery
+from celery.signals import worker_process_shutdown
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
 from crawler.linkedin_scraper import LinkedInScraper
+from crawler.session_pool import get_session_pool
+from email_finder.domain_resolver import CompanyDomainResolver
 from email_finder.hunter_api import HunterAPI
+from email_finder.hunter_cache import HunterCache
+from email_finder.pattern_resolver import DomainPatternResolver, split_name
+from email_finder.pre_verify import PreVerifier
+from email_sender.delivery_scheduler import DeliveryScheduler
 from email_sender.send_email import EmailSender
-from database.mongo_operations import MongoDB
+from email_sender.templates import TemplateRegistry
+from database.mongo_operations import (
+    MongoDB, EMAIL_FOUND, EMAIL_QUEUED, EMAIL_SENT, EMAIL_FAILED, NO_EMAIL, SUPPRESSED
+)
+from database.outbox import Outbox, QUEUED, FAILED, message_key
+from database.seen_profiles import SeenProfileIndex
+from database.suppression import SuppressionList, BOUNCE, CONTACTED, DOMAIN, email_domain, normalize_email
 
 load_dotenv()
 
@@ -34,111 +47,363 @@ celery_app.conf.update(
     worker_prefetch_multiplier=1
 )
 
+# Recruiters claimed by a task stay leased for as long as the task may run
+CLAIM_LEASE_SECONDS = celery_app.conf.task_time_limit
+
 # Initialize components
 db = MongoDB()
-hunter = HunterAPI()
-email_sender = EmailSender()
+hunter = HunterAPI(cache=HunterCache(db.hunter_cache))
+domain_resolver = CompanyDomainResolver(db.company_domains)
+email_resolver = DomainPatternResolver(
+    hunter,
+    domain_resolver=domain_resolver,
+    pre_verifier=PreVerifier(),
+    # Paid verification of pattern guesses that pass the local checks
+    verify=os.getenv('VERIFY_PATTERN_EMAILS', 'false').lower() == 'true'
+)
+# Send slots per mailbox live in Redis so every worker paces against the same schedule
+delivery_scheduler = DeliveryScheduler.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+# Checked-in templates, overridden by any stored in Mongo
+templates = TemplateRegistry.from_directory()
+templates.load_mongo(db.email_templates)
+email_sender = EmailSender(scheduler=delivery_scheduler, templates=templates)
+outbox = Outbox(db.outbox)
+# Bounced, unsubscribed and already-contacted addresses, checked before queueing and again before sending
+suppression = SuppressionList(db.suppressions)
+seen_index = None
+
+def get_seen_index() -> SeenProfileIndex:
+    """Profiles stored by earlier runs, loaded once and kept warm for the lifetime of the worker"""
+    global seen_index
+    if seen_index is None:
+        seen_index = SeenProfileIndex(db.seen_profiles)
+    return seen_index
+
+def create_scraper() -> LinkedInScraper:
+    return LinkedInScraper(seen_index=get_seen_index())
+
+@worker_process_shutdown.connect
+def close_browser_session(**kwargs):
+    """Quit the pooled browser and the SMTP session when the worker process exits"""
+    get_session_pool(create_scraper).close()
+    email_sender.close()
 
 @celery_app.task
 def scrape_recruiters(job_title: str, location: str, max_results: int = 100):
     """Task to scrape recruiters from LinkedIn"""
+    count = 0
+    inserted = 0
     try:
-        scraper = LinkedInScraper()
-        recruiters = scraper.search_recruiters(job_title, location, max_results)
-        
-        # Store recruiters in database
-        for recruiter in recruiters:
-            db.insert_recruiter(recruiter)
-            
-        scraper.close()
-        return {'status': 'success', 'count': len(recruiters)}
+        # Reuse this worker's logged-in browser instead of starting Chrome and logging in again
+        with get_session_pool(create_scraper).session() as scraper:
+            # Persist each page as soon as it is scraped so a crash keeps earlier pages
+            for batch in scraper.iter_recruiters(job_title, location, max_results):
+                results = db.upsert_recruiters(batch)
+                inserted += sum(1 for result in results if result['status'] == 'inserted')
+                # A recruiter that failed to store is left unseen so a later scrape retries it
+                scraper.seen_index.add_many([
+                    recruiter for recruiter, result in zip(batch, results)
+                    if result['status'] in ('inserted', 'existing')
+                ])
+                count += len(batch)
+
+        return {'status': 'success', 'count': count, 'inserted': inserted}
         
     except Exception as e:
-        return {'status': 'error', 'error': str(e)}
+        return {'status': 'error', 'error': str(e), 'count': count, 'inserted': inserted}
 
 @celery_app.task
 def find_emails():
     """Task to find emails for pending recruiters"""
+    recruiters = []
     try:
-        recruiters = db.get_pending_recruiters()
+        # Misses get another try once Hunter's cached answer for them has expired
+        requeued = db.requeue_no_email(hunter.cache.negative_ttl)
+        # Leased so an overlapping run or another worker never pays for the same lookups
+        recruiters = db.claim_batch('find_emails', 100, CLAIM_LEASE_SECONDS)
         results = []
         
+        people = []
         for recruiter in recruiters:
-            # Extract domain from company name
-            domain = recruiter['company'].lower().replace(' ', '') + '.com'
-            
+            # Resolve the company's domain; companies known not to resolve cost no lookups
+            domain = domain_resolver.resolve(recruiter['company'])
+            if not domain:
+                results.append({
+                    'recruiter_id': str(recruiter['_id']),
+                    'status': 'no_domain'
+                })
+                continue
+
             # Split name into first and last
-            name_parts = recruiter['name'].split()
-            first_name = name_parts[0]
-            last_name = name_parts[-1] if len(name_parts) > 1 else ''
-            
-            # Find email
-            email_data = hunter.find_email(first_name, last_name, domain)
+            first_name, last_name = split_name(recruiter['name'])
+            people.append({
+                'id': str(recruiter['_id']),
+                'first_name': first_name,
+                'last_name': last_name,
+                'domain': domain,
+                'company': recruiter['company']
+            })
+        
+        # One domain search per company; per-person lookups only where the pattern can't be used
+        found_emails = email_resolver.resolve(people)
+        
+        emails = []
+        for recruiter in recruiters:
+            if str(recruiter['_id']) not in found_emails:
+                continue
+            email_data = found_emails[str(recruiter['_id'])]
             
             if email_data:
-                # Store email
-                email_id = db.insert_email({
+                emails.append({
                     'recruiter_id': str(recruiter['_id']),
                     'email': email_data['email'],
                     'score': email_data['score'],
                     'status': email_data['status']
                 })
-                
-                # Update recruiter status
-                db.update_recruiter_status(str(recruiter['_id']), 'email_found')
-                
+            else:
                 results.append({
                     'recruiter_id': str(recruiter['_id']),
-                    'email_id': email_id,
+                    'status': 'no_email_found'
+                })
+        
+        # Store every email, then advance the recruiters whose email was stored, in one batch each
+        stored = []
+        for email, outcome in zip(emails, db.insert_emails(emails)):
+            if outcome['status'] == 'inserted':
+                stored.append(email['recruiter_id'])
+                results.append({
+                    'recruiter_id': email['recruiter_id'],
+                    'email_id': outcome['_id'],
                     'status': 'success'
                 })
             else:
                 results.append({
-                    'recruiter_id': str(recruiter['_id']),
-                    'status': 'no_email_found'
+                    'recruiter_id': email['recruiter_id'],
+                    'status': 'error',
+                    'error': outcome['error']
                 })
+        # Recruiters without a domain or an email leave the pending queue until they are requeued
+        missing = [result['recruiter_id'] for result in results if result['status'] in ('no_domain', 'no_email_found')]
+        # Advancing the recruiters also drops their leases; any left over become claimable again
+        db.complete(
+            recruiters,
+            [{'recruiter_id': recruiter_id, 'status': EMAIL_FOUND} for recruiter_id in stored] +
+            [{'recruiter_id': recruiter_id, 'status': NO_EMAIL} for recruiter_id in missing]
+        )
                 
-        return {'status': 'success', 'results': results}
+        return {
+            'status': 'success',
+            'results': results,
+            'requeued': requeued,
+            'cache': hunter.cache.get_stats(),
+            'resolver': dict(email_resolver.stats),
+            'domains': domain_resolver.get_stats()
+        }
         
     except Exception as e:
+        db.release(recruiters)
         return {'status': 'error', 'error': str(e)}
 
 @celery_app.task
 def send_outreach_emails():
-    """Task to send outreach emails"""
+    """Task to queue outreach emails in the outbox, each at its own delivery slot"""
+    recruiters = []
     try:
-        # Get recruiters with verified emails
-        recruiters = db.get_pending_recruiters(status='email_found')
-        results = []
+        # Lease recruiters with verified emails so overlapping runs don't both assign them slots
+        recruiters = db.claim_batch('send_outreach', 100, CLAIM_LEASE_SECONDS)
+        # Addresses live in the emails collection, keyed by recruiter id
+        emails = db.get_emails_for_recruiters([str(recruiter['_id']) for recruiter in recruiters])
         
+        # Every claimed recruiter leaves email_found: queued, suppressed or failed
+        transitions = []
+        messages = []
         for recruiter in recruiters:
-            # Send email
-            result = email_sender.send_email(
-                to_email=recruiter['email'],
-                template_name='initial',
-                template_data={
+            email = emails.get(str(recruiter['_id']))
+            if not email:
+                transitions.append({'recruiter_id': recruiter['_id'], 'status': EMAIL_FAILED})
+                continue
+            messages.append({
+                'key': message_key(str(recruiter['_id']), 'initial', email['email']),
+                'recruiter_id': str(recruiter['_id']),
+                'email_id': str(email['_id']),
+                'to_email': email['email'],
+                'template': 'initial',
+                'template_data': {
                     'name': recruiter['name'],
                     'company': recruiter['company'],
                     'field': 'Data Engineering',  # This should be configurable
                     'your_name': 'Your Name'  # This should be configurable
                 }
-            )
-            
-            # Log outreach
-            db.log_outreach({
-                'recruiter_id': str(recruiter['_id']),
-                'email_id': str(recruiter['email_id']),
-                'template': 'initial',
-                'status': result['status'],
-                'timestamp': datetime.utcnow()
             })
+        
+        # Messages that could not be rendered never enter the outbox
+        missing = templates.validate('initial', [message['template_data'] for message in messages])
+        invalid = [
+            {'recruiter_id': message['recruiter_id'], 'missing': sorted(fields)}
+            for message, fields in zip(messages, missing) if fields
+        ]
+        transitions += [{'recruiter_id': item['recruiter_id'], 'status': EMAIL_FAILED} for item in invalid]
+        messages = [message for message, fields in zip(messages, missing) if not fields]
+        
+        # Suppressed addresses are dropped in one pass against the in-memory snapshot
+        _, suppressed = suppression.filter([message['to_email'] for message in messages])
+        transitions += [
+            {'recruiter_id': message['recruiter_id'], 'status': SUPPRESSED}
+            for message in messages if message['to_email'] in suppressed
+        ]
+        messages = [message for message in messages if message['to_email'] not in suppressed]
+        
+        # Messages already in the outbox keep their slot; only new ones take one
+        existing = outbox.existing_keys([message['key'] for message in messages])
+        # One message per address: a recruiter sharing an address with a live outbox message,
+        # or with one earlier in this batch, is suppressed rather than emailed twice
+        taken = outbox.live_addresses([message['to_email'] for message in messages])
+        new_messages, duplicates = [], []
+        for message in messages:
+            if message['key'] in existing:
+                continue
+            address = normalize_email(message['to_email'])
+            if address in taken:
+                duplicates.append(message)
+            else:
+                taken.add(address)
+                new_messages.append(message)
+        transitions += [{'recruiter_id': message['recruiter_id'], 'status': SUPPRESSED} for message in duplicates]
+        duplicate_keys = {message['key'] for message in duplicates}
+        messages = [message for message in messages if message['key'] not in duplicate_keys]
+        for message in new_messages:
+            message['send_at'] = delivery_scheduler.eta(delivery_scheduler.next_slot(email_sender.mailbox))
+        
+        queued = outbox.enqueue(new_messages)
+        send_at = {message['key']: message['send_at'] for message in new_messages}
+        for key in queued:
+            # The worker is released right away; pacing comes from each task's eta
+            send_outbox_message.apply_async(args=[key], eta=send_at[key])
+        # The outbox owns the messages now, including ones queued by an earlier run that
+        # died before advancing its recruiters
+        transitions += [{'recruiter_id': message['recruiter_id'], 'status': EMAIL_QUEUED} for message in messages]
+        db.complete(recruiters, transitions)
             
-            # Update recruiter status
-            db.update_recruiter_status(str(recruiter['_id']), 'email_sent')
-            
-            results.append(result)
+        return {
+            'status': 'success',
+            'queued': len(queued),
+            'already_queued': len(existing),
+            'invalid': invalid,
+            'suppressed': len(suppressed),
+            'duplicates': len(duplicates)
+        }
+        
+    except Exception as e:
+        db.release(recruiters)
+        return {'status': 'error', 'error': str(e)}
+
+def record_sent_messages(messages: list):
+    """Log sent messages and advance their recruiters in one batch each; safe to repeat"""
+    if not messages:
+        return
+    # Already-logged messages come back as duplicates of their message_key
+    db.log_outreach_many([
+        {
+            'message_key': message['_id'],
+            'recruiter_id': message['recruiter_id'],
+            'email_id': message['email_id'],
+            'template': message['template'],
+            'status': 'success',
+            'timestamp': message.get('sent_at') or datetime.utcnow(),
+            'created_at': datetime.utcnow()
+        }
+        for message in messages
+    ])
+    db.transition_statuses([
+        {'recruiter_id': message['recruiter_id'], 'status': EMAIL_SENT} for message in messages
+    ])
+    outbox.mark_recorded([message['_id'] for message in messages])
+
+def deliver_message(message: dict) -> dict:
+    """Send one claimed outbox message and move it to its next state"""
+    # The address may have been suppressed (bounce, unsubscribe, another recruiter's message)
+    # after it was queued; read straight from Mongo since the snapshot can be a minute old
+    reason = suppression.current_reason(message['to_email'])
+    if reason:
+        outbox.mark_failed(message, f'suppressed: {reason}', permanent=True)
+        db.update_recruiter_status(message['recruiter_id'], SUPPRESSED)
+        return {'status': 'suppressed', 'email': message['to_email'], 'reason': reason}
+    
+    result = email_sender.send_email(
+        to_email=message['to_email'],
+        template_name=message['template'],
+        template_data=message['template_data'],
+        message_id=message['_id']
+    )
+    
+    if result['status'] == 'success':
+        # Marked sent before anything else so a crash from here on cannot cause a resend
+        if outbox.mark_sent(message):
+            suppression.add_email(message['to_email'], CONTACTED)
+            record_sent_messages([message])
+        return result
+    
+    if result['status'] == 'bounced':
+        # Hard bounces are fed back so no later batch tries the address (or domain) again
+        if result['bounce'] == DOMAIN:
+            suppression.add_domain(email_domain(message['to_email']), BOUNCE)
+        else:
+            suppression.add_email(message['to_email'], BOUNCE)
+        outbox.mark_failed(message, result['error'], permanent=True)
+        db.update_recruiter_status(message['recruiter_id'], EMAIL_FAILED)
+        return result
+    
+    retry_at = delivery_scheduler.eta(delivery_scheduler.next_slot(email_sender.mailbox))
+    state = outbox.mark_failed(message, result.get('error', ''), retry_at=retry_at)
+    if state == QUEUED:
+        send_outbox_message.apply_async(args=[message['_id']], eta=retry_at)
+    elif state == FAILED:
+        db.update_recruiter_status(message['recruiter_id'], EMAIL_FAILED)
+    return result
+
+@celery_app.task
+def send_outbox_message(key: str):
+    """Task to send one outbox message once its slot has come"""
+    try:
+        claimed = outbox.claim(limit=1, keys=[key])
+        if not claimed:
+            # Already sent, failed for good, or held by another sender
+            return {'status': 'skipped', 'key': key}
+        return deliver_message(claimed[0])
+        
+    except Exception as e:
+        return {'status': 'error', 'error': str(e), 'key': key}
+
+@celery_app.task
+def drain_outbox(batch_size: int = 50, grace_seconds: int = 300):
+    """Task to sweep the outbox in batches for messages whose send task never ran
+
+    Overdue messages (lost eta tasks, expired leases after a crash) get a fresh
+    delivery slot instead of being sent in a burst. Sent messages whose bookkeeping
+    was interrupted are recorded.
+    """
+    try:
+        failed = outbox.fail_expired()
+        db.transition_statuses([{'recruiter_id': message['recruiter_id'], 'status': EMAIL_FAILED} for message in failed])
+        
+        rescheduled = 0
+        due_before = datetime.utcnow() - timedelta(seconds=grace_seconds)
+        for message in outbox.claim(limit=batch_size, due_before=due_before):
+            send_at = delivery_scheduler.eta(delivery_scheduler.next_slot(email_sender.mailbox))
+            if outbox.release(message, send_at):
+                send_outbox_message.apply_async(args=[message['_id']], eta=send_at)
+                rescheduled += 1
+        
+        unrecorded = outbox.unrecorded(limit=batch_size)
+        record_sent_messages(unrecorded)
             
-        return {'status': 'success', 'results': results}
+        return {
+            'status': 'success',
+            'rescheduled': rescheduled,
+            'recorded': len(unrecorded),
+            'failed': len(failed),
+            'outbox': outbox.get_stats()
+        }
         
     except Exception as e:
         return {'status': 'error', 'error': str(e)}
@@ -157,5 +422,9 @@ celery_app.conf.beat_schedule = {
     'send-outreach-emails': {
         'task': 'scheduler.celery_tasks.send_outreach_emails',
         'schedule': timedelta(hours=12)
+    },
+    'drain-outbox': {
+        'task': 'scheduler.celery_tasks.drain_outbox',
+        'schedule': timedelta(minutes=10)
     }
 } 
\ No newline at end of file
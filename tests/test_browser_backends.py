@@ -0,0 +1,222 @@
+"""One suite run against every browser backend over local HTML fixtures.
+
+Fixtures are served from tests/fixtures/backends by a local HTTP server (cookies
+need a real origin). A backend whose browser cannot be started here is skipped:
+Playwright needs `playwright install chromium` or CHROME_BINARY pointing at a
+Chromium build, Selenium needs Chrome plus a matching chromedriver.
+"""
+import os
+import time
+import functools
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from crawler.browser_backends import create_backend, PlaywrightBackend
+from crawler.card_selectors import (
+    CARD_SELECTORS, NAME_SELECTORS, ROLE_SELECTORS, COMPANY_SELECTORS,
+    PROFILE_LINK_SELECTOR, NEXT_PAGE_SELECTORS
+)
+from crawler.page_readiness import LOADER_SELECTOR
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'backends')
+BACKENDS = ['selenium', 'playwright']
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope='session')
+def base_url():
+    handler = functools.partial(_QuietHandler, directory=FIXTURE_DIR)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def _selenium_driver():
+    from selenium import webdriver
+
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless=new')
+    options.add_argument('--no-sandbox')
+    if os.getenv('CHROME_BINARY'):
+        options.binary_location = os.getenv('CHROME_BINARY')
+    return webdriver.Chrome(options=options)
+
+
+def _make_backend(name: str):
+    if name == 'selenium':
+        backend = create_backend('selenium', driver_factory=_selenium_driver, timeout=5)
+    else:
+        backend = create_backend('playwright', timeout=5, executable_path=os.getenv('CHROME_BINARY'))
+    try:
+        backend.start()
+    except Exception as e:
+        backend.close()
+        pytest.skip(f"{name} browser unavailable: {str(e).splitlines()[0]}")
+    return backend
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+    backend = _make_backend(request.param)
+    yield backend
+    backend.close()
+
+
+@pytest.fixture
+def make_backend(request):
+    """Start extra backends of the same kind as `backend`, closed after the test"""
+    started = []
+
+    def make():
+        started.append(_make_backend(request.node.callspec.params['backend']))
+        return started[-1]
+
+    yield make
+    for extra in started:
+        extra.close()
+
+
+def _extract(backend):
+    return backend.extract_cards(
+        CARD_SELECTORS[0], NAME_SELECTORS, ROLE_SELECTORS, COMPANY_SELECTORS, PROFILE_LINK_SELECTOR
+    )
+
+
+def test_execute_script_passes_arguments(backend, base_url):
+    # Playwright runs these through _EVALUATE_WRAPPER's new Function(script).apply
+    backend.goto(f"{base_url}/page1.html")
+    assert backend.execute_script("return arguments[0] + arguments[1];", 2, 3) == 5
+    assert backend.execute_script("return arguments.length;") == 0
+    assert backend.execute_script(
+        "return {total: arguments[0].reduce((a, b) => a + b, 0), label: arguments[1]};", [1, 2, 3], 'x'
+    ) == {'total': 6, 'label': 'x'}
+    assert backend.execute_script("document.title = arguments[0];", 'renamed') is None
+    assert backend.execute_script("return document.title;") == 'renamed'
+
+
+def test_extract_cards(backend, base_url):
+    backend.goto(f"{base_url}/page1.html")
+    cards = _extract(backend)
+
+    assert len(cards) == 3
+    parsed = [card for card in cards if card['parsed']]
+    assert [card['name'] for card in parsed] == ['Jane Doe', 'John Roe']
+    jane, john = parsed
+    assert jane['profile_url'] == 'https://www.linkedin.com/in/jane-doe'
+    assert (jane['role'], jane['company']) == ('Technical Recruiter', 'Acme Corp')
+    assert jane['hits'] == {'name': NAME_SELECTORS[0], 'role': ROLE_SELECTORS[0], 'company': COMPANY_SELECTORS[0]}
+    assert john['hits'] == {'name': NAME_SELECTORS[3], 'role': ROLE_SELECTORS[2], 'company': COMPANY_SELECTORS[2]}
+
+    unparsed = [card for card in cards if not card['parsed']]
+    assert len(unparsed) == 1
+    if backend.__class__.__name__ == 'PlaywrightBackend':
+        # DOM nodes cannot cross page.evaluate
+        assert unparsed[0]['element'] is None
+    else:
+        assert unparsed[0]['element'] is not None
+
+
+def test_waits(backend, base_url):
+    backend.goto(f"{base_url}/page1.html")
+    assert backend.wait_for_document_ready()
+    assert backend.wait_for_results()
+    assert backend.execute_script(f"return document.querySelectorAll('{LOADER_SELECTOR}').length;") == 0
+    assert backend.wait_for_stable_height()
+    assert backend.wait_for_selector('.entity-result__title-text')
+    assert not backend.wait_for_selector('.not-on-this-page', timeout=0.5)
+    assert not backend.wait_for_url_change(backend.current_url, timeout=0.5)
+
+
+def test_next_page(backend, base_url):
+    backend.goto(f"{base_url}/page1.html")
+    old_url = backend.current_url
+    clicked = []
+
+    # The first matching button is hidden, so the visible one must be picked
+    assert backend.next_page(NEXT_PAGE_SELECTORS, before_click=lambda: clicked.append(True)) == NEXT_PAGE_SELECTORS[0]
+    assert clicked == [True]
+    assert backend.wait_for_url_change(old_url)
+    assert backend.current_url.endswith('/page2.html')
+    backend.wait_for_document_ready()
+    assert [card['name'] for card in _extract(backend)] == ['Ana Lee']
+
+    # The last page's next button is disabled
+    assert backend.next_page(NEXT_PAGE_SELECTORS) is None
+
+
+def test_cookie_round_trip(backend, make_backend, base_url):
+    backend.goto(f"{base_url}/page1.html")
+    expiry = int(time.time()) + 3600
+    backend.add_cookies([
+        {'name': 'li_at', 'value': 'token', 'domain': '127.0.0.1', 'path': '/',
+         'secure': False, 'httpOnly': True, 'expiry': expiry, 'sameSite': 'Lax'},
+        {'name': 'session', 'value': 'abc', 'domain': '127.0.0.1', 'path': '/'}
+    ])
+
+    cookies = {cookie['name']: cookie for cookie in backend.get_cookies()}
+    assert cookies['li_at']['value'] == 'token'
+    assert cookies['li_at']['expiry'] == expiry
+    assert cookies['li_at']['httpOnly'] is True
+    # Session cookies have no expiry; Playwright reports them with expires=-1
+    assert 'expiry' not in cookies['session']
+
+    # A saved jar restores into a fresh browser unchanged
+    fresh = make_backend()
+    fresh.goto(f"{base_url}/page1.html")
+    fresh.add_cookies(list(cookies.values()))
+    restored = {cookie['name']: cookie for cookie in fresh.get_cookies()}
+    assert restored['li_at']['expiry'] == expiry
+    assert restored['session']['value'] == 'abc'
+    assert fresh.execute_script("return document.cookie;") == 'session=abc'
+
+
+def test_is_alive_and_artifacts(backend, base_url):
+    backend.goto(f"{base_url}/page2.html")
+    assert backend.is_alive()
+    assert backend.screenshot().startswith(b'\x89PNG')
+    assert 'Ana Lee' in backend.page_source()
+
+
+class _CookieContext:
+    """Stands in for a Playwright BrowserContext's cookie jar"""
+
+    def __init__(self, cookies=None):
+        self.jar = list(cookies or [])
+
+    def cookies(self):
+        return self.jar
+
+    def add_cookies(self, cookies):
+        self.jar.extend(cookies)
+
+
+def test_playwright_cookie_conversion():
+    # Runs without a browser: Selenium's integer expiry maps to Playwright's expires and back
+    backend = PlaywrightBackend()
+    backend._context = _CookieContext()
+    backend.add_cookies([
+        {'name': 'li_at', 'value': 'token', 'domain': '.linkedin.com', 'path': '/',
+         'secure': True, 'httpOnly': True, 'expiry': 1900000000, 'sameSite': 'None'},
+        {'name': 'JSESSIONID', 'value': 'ajax', 'domain': '', 'secure': True}
+    ])
+    li_at, session = backend._context.jar
+    assert li_at['expires'] == 1900000000 and 'expiry' not in li_at and 'sameSite' not in li_at
+    assert 'expires' not in session
+    assert (session['domain'], session['path'], session['httpOnly']) == ('.linkedin.com', '/', False)
+
+    backend._context = _CookieContext([
+        dict(li_at, expires=1900000000.75, sameSite='None'),
+        dict(session, expires=-1, sameSite='Lax')
+    ])
+    li_at, session = backend.get_cookies()
+    assert li_at['expiry'] == 1900000000 and isinstance(li_at['expiry'], int)
+    assert 'expires' not in li_at and 'sameSite' not in li_at
+    assert 'expiry' not in session
@@ -0,0 +1,40 @@
+import os
+
+from crawler.card_selectors import CARD_SELECTORS
+from crawler.html_parser import parse_search_page, parse_search_results
+from crawler.selector_stats import SelectorRegistry
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'backends', 'page1.html')
+
+
+def _page():
+    with open(FIXTURE, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def test_parse_search_page_counts_every_card():
+    cards, recruiters = parse_search_page(_page())
+
+    assert cards == 3
+    assert [(r['name'], r['company'], r['profile_url']) for r in recruiters] == [
+        ('Jane Doe', 'Acme Corp', 'https://www.linkedin.com/in/jane-doe'),
+        ('John Roe', 'Globex', 'https://www.linkedin.com/in/john-roe'),
+    ]
+    assert [r['name'] for r in parse_search_results(_page())] == ['Jane Doe', 'John Roe']
+
+
+def test_card_selector_is_a_hit_when_all_cards_are_known(tmp_path):
+    registry = SelectorRegistry(str(tmp_path / 'stats.json'))
+
+    cards, recruiters = parse_search_page(_page(), registry, is_known=lambda name, company, url: True)
+
+    assert (cards, recruiters) == (3, [])
+    assert registry.stats['card'] == {CARD_SELECTORS[0]: {'hits': 1, 'misses': 0}}
+
+
+def test_card_selectors_miss_on_a_page_without_cards(tmp_path):
+    registry = SelectorRegistry(str(tmp_path / 'stats.json'))
+
+    assert parse_search_page('<html><body><p>No results</p></body></html>', registry) == (0, [])
+    assert all(entry == {'hits': 0, 'misses': 1} for entry in registry.stats['card'].values())
+    assert len(registry.stats['card']) == len(CARD_SELECTORS)
@@ -0,0 +1,189 @@
+"""Batch Hunter lookups against a local stub of the Hunter API"""
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import mongomock
+import pytest
+
+from email_finder.hunter_api import HunterAPI, MonthlyQuota
+from email_finder.hunter_cache import HunterCache
+from email_finder.pattern_resolver import DomainPatternResolver
+
+
+class StubHunter:
+    """Answers email-finder, email-verifier and domain-search like Hunter does
+
+    Every path is throttled once with a 429 before it succeeds, so the retry
+    path runs on each batch. Paths in failing answer 500 every time.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.throttled = set()
+        self.failing = set()
+        self._lock = threading.Lock()
+
+    def respond(self, path: str, params: dict):
+        with self._lock:
+            self.requests.append((path, params))
+            if path in self.failing:
+                return 500, None
+            if path not in self.throttled:
+                self.throttled.add(path)
+                return 429, None
+        if path.endswith('email-finder'):
+            return 200, {'data': {'email': f"{params['first_name']}.{params['last_name']}@{params['domain']}", 'score': 91}}
+        if path.endswith('email-verifier'):
+            return 200, {'data': {'status': 'valid', 'score': 97, 'result': 'deliverable'}}
+        sample = {'first_name': 'Jo', 'last_name': 'Kim', 'value': f"jo.kim@{params['domain']}"}
+        return 200, {'data': {'pattern': '{first}.{last}', 'emails': [sample], 'organization': params['domain'].upper()}}
+
+
+@pytest.fixture
+def stub():
+    stub = StubHunter()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {key: values[0] for key, values in parse_qs(url.query).items()}
+            status, body = stub.respond(url.path, params)
+            payload = json.dumps(body).encode() if body else b''
+            self.send_response(status)
+            if status != 200:
+                self.send_header('Retry-After', '0')
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    stub.base_url = f"http://127.0.0.1:{server.server_address[1]}/v2"
+    yield stub
+    server.shutdown()
+
+
+def _people(count: int, domain: str = 'acme.com'):
+    return [{'first_name': f'p{i}', 'last_name': 'doe', 'domain': domain} for i in range(count)]
+
+
+def test_batches_keep_input_order_and_dedupe(stub):
+    hunter = HunterAPI(base_url=stub.base_url, quota=MonthlyQuota(0))
+    people = _people(6) + _people(1)
+
+    found = hunter.find_emails_batch(people, concurrency=4)
+
+    assert [result['email'] for result in found] == [f'p{i}.doe@acme.com' for i in range(6)] + ['p0.doe@acme.com']
+    # Six lookups plus the one throttled request that was retried
+    assert len(stub.requests) == 7
+
+    verdicts = hunter.verify_batch(['a@acme.com', 'A@acme.com'])
+    assert [verdict['status'] for verdict in verdicts] == ['valid', 'valid']
+    domains = hunter.domain_search_batch(['acme.com', 'globex.com', 'acme.com'])
+    assert [result['organization'] for result in domains] == ['ACME.COM', 'GLOBEX.COM', 'ACME.COM']
+
+
+def test_quota_refusal_keeps_the_rest_of_the_batch(stub):
+    quota = MonthlyQuota(3)
+    hunter = HunterAPI(base_url=stub.base_url, quota=quota)
+
+    found = hunter.find_emails_batch(_people(5), concurrency=1)
+
+    assert [result['status'] for result in found] == ['verified'] * 3 + ['error'] * 2
+    assert found[3]['email'] is None and 'monthly limit' in found[3]['error']
+    # The throttled request was refunded, so exactly the plan's three were paid for
+    assert quota.used == 3
+
+    verdicts = hunter.verify_batch(['a@acme.com'])
+    assert verdicts[0]['status'] == 'error'
+    domains = hunter.domain_search_batch(['acme.com'])
+    assert domains[0]['domain'] == 'acme.com' and 'monthly limit' in domains[0]['error']
+
+
+def test_limiter_carries_over_between_batches(stub, monkeypatch):
+    monkeypatch.setenv('HUNTER_RATE_PER_SECOND', '10')
+    hunter = HunterAPI(base_url=stub.base_url, quota=MonthlyQuota(0))
+    stub.throttled.update({'/v2/email-finder', '/v2/email-verifier'})
+
+    started = time.monotonic()
+    hunter.find_emails_batch(_people(10), concurrency=10)
+    limiter = hunter.limiter
+    # The first batch spends the whole burst, so the next one has to wait for refills
+    hunter.verify_batch([f'p{i}@acme.com' for i in range(5)], concurrency=5)
+
+    assert hunter.limiter is limiter
+    assert time.monotonic() - started >= 0.4
+
+
+class SlowCache(HunterCache):
+    """A cache whose backing store takes a while to answer, like a remote Mongo"""
+
+    def get(self, key):
+        time.sleep(0.2)
+        return super().get(key)
+
+
+def test_cache_lookups_do_not_block_the_event_loop(stub):
+    cache = SlowCache(mongomock.MongoClient().db.hunter_cache)
+    hunter = HunterAPI(cache=cache, base_url=stub.base_url, quota=MonthlyQuota(0))
+
+    started = time.monotonic()
+    hunter.find_emails_batch(_people(5), concurrency=5)
+    # Five 0.2s lookups overlap instead of running back to back
+    assert time.monotonic() - started < 0.8
+
+    requests_made = len(stub.requests)
+    again = hunter.find_emails_batch(_people(5), concurrency=5)
+    assert [result['email'] for result in again] == [f'p{i}.doe@acme.com' for i in range(5)]
+    assert len(stub.requests) == requests_made
+    assert cache.collection.count_documents({}) == 5
+
+
+def test_resolver_leaves_quota_refused_people_unresolved(stub):
+    hunter = HunterAPI(base_url=stub.base_url, quota=MonthlyQuota(2))
+    resolver = DomainPatternResolver(hunter)
+    people = [
+        {'id': 'a', 'first_name': 'Ann', 'last_name': 'Lee', 'domain': 'acme.com'},
+        {'id': 'b', 'first_name': 'Bo', 'last_name': '', 'domain': 'globex.com'},
+    ]
+
+    results = resolver.resolve(people)
+
+    # Both domain searches spend the quota; Bo has no last name for the pattern and
+    # the finder fallback is refused
+    assert results == {'a': {'email': 'ann.lee@acme.com', 'score': 100, 'sources': [], 'status': 'pattern'}}
+    assert resolver.stats['lookup_errors'] == 1
+
+
+def test_resolver_fetches_a_small_sample_per_domain(stub):
+    hunter = HunterAPI(base_url=stub.base_url, quota=MonthlyQuota(0))
+    resolver = DomainPatternResolver(hunter)
+
+    resolver.resolve([{'id': 'a', 'first_name': 'Ann', 'last_name': 'Lee', 'domain': 'acme.com'}])
+
+    assert {params['limit'] for path, params in stub.requests if path.endswith('domain-search')} == {'10'}
+    assert hunter.domain_search_batch(['globex.com'])[0]['organization'] == 'GLOBEX.COM'
+    assert stub.requests[-1][1]['limit'] == '100'
+
+
+def test_failed_lookups_are_not_taken_for_misses(stub):
+    cache = HunterCache(mongomock.MongoClient().db.hunter_cache)
+    hunter = HunterAPI(cache=cache, base_url=stub.base_url, quota=MonthlyQuota(0))
+    resolver = DomainPatternResolver(hunter)
+    stub.failing.update({'/v2/email-finder', '/v2/domain-search'})
+    people = [{'id': 'a', 'first_name': 'Ann', 'last_name': 'Lee', 'domain': 'acme.com'}]
+
+    # Left out rather than resolved to None, so the recruiter is not marked no_email
+    assert resolver.resolve(people) == {}
+    assert resolver.stats['lookup_errors'] == 1
+    assert cache.collection.count_documents({}) == 0
+
+    stub.failing.clear()
+    assert resolver.resolve(people)['a']['email'] == 'ann.lee@acme.com'
@@ -0,0 +1,105 @@
+import pytest
+
+from crawler.card_selectors import CARD_SELECTORS
+from crawler.linkedin_scraper import LinkedInScraper
+
+
+@pytest.fixture(autouse=True)
+def selector_stats(tmp_path, monkeypatch):
+    monkeypatch.setenv('SELECTOR_STATS_PATH', str(tmp_path / 'selector_stats.json'))
+    monkeypatch.setenv('SCRAPER_PACING', 'false')
+
+
+def test_extraction_mode_from_argument_or_env(monkeypatch):
+    assert LinkedInScraper().extraction_mode == 'batch'
+    monkeypatch.setenv('SCRAPER_EXTRACTION_MODE', 'html')
+    assert LinkedInScraper().extraction_mode == 'html'
+    assert LinkedInScraper(extraction_mode='element').extraction_mode == 'element'
+
+
+def test_unknown_extraction_mode_is_rejected(monkeypatch):
+    with pytest.raises(ValueError, match='Unknown extraction mode'):
+        LinkedInScraper(extraction_mode='xpath')
+    monkeypatch.setenv('SCRAPER_EXTRACTION_MODE', 'HTML ')
+    with pytest.raises(ValueError):
+        LinkedInScraper()
+
+
+class FakeSeenIndex:
+    def __init__(self, known_urls):
+        self.known_urls = set(known_urls)
+
+    def is_known(self, profile_url, name, company):
+        return profile_url in self.known_urls
+
+
+class FakeBackend:
+    """Serves one list of extract_cards results per page of a search"""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.page = 0
+        self.current_url = 'about:blank'
+
+    def goto(self, url):
+        self.current_url = url
+
+    def execute_script(self, script, *args):
+        return 0
+
+    def next_page(self, selectors, before_click=None):
+        if self.page + 1 >= len(self.pages):
+            return None
+        self.page += 1
+        self.current_url = f'https://www.linkedin.com/search/results/people/?keywords=x&page={self.page + 1}'
+        return selectors[0]
+
+    def wait_for_url_change(self, old_url, timeout=None):
+        return True
+
+    def wait_for_results(self, timeout=None):
+        return True
+
+    def wait_for_stable_height(self, timeout=None, stable_polls=2):
+        return True
+
+    def extract_cards(self, card_selector, name_selectors, role_selectors, company_selectors, link_selector):
+        return self.pages[self.page]
+
+
+def _card(name, slug, role='Technical Recruiter'):
+    return {
+        'parsed': True, 'name': name, 'role': role, 'company': 'Acme',
+        'profile_url': f'https://www.linkedin.com/in/{slug}', 'hits': {}
+    }
+
+
+def _scraper(pages, known=()):
+    scraper = LinkedInScraper(seen_index=FakeSeenIndex(known))
+    scraper.backend = scraper.readiness = FakeBackend(pages)
+    return scraper
+
+
+def test_card_selector_is_a_hit_when_all_cards_are_filtered():
+    known = ['https://www.linkedin.com/in/jane-doe']
+    scraper = _scraper([[_card('Jane Doe', 'jane-doe'), _card('Bo Kim', 'bo-kim', role='Engineer')]], known)
+
+    assert scraper._extract_recruiters_from_page() == (2, [])
+    first = scraper.selector_registry.ordered('card', CARD_SELECTORS)[0]
+    assert scraper.selector_registry.stats['card'] == {first: {'hits': 1, 'misses': 0}}
+
+
+def test_pages_of_known_profiles_do_not_end_the_search():
+    known = [f'https://www.linkedin.com/in/known-{i}' for i in range(3)]
+    pages = [
+        [_card(f'Known {i}', f'known-{i}') for i in range(3)],
+        [_card('Ana Lee', 'ana-lee'), _card('Known 0', 'known-0')],
+        [],
+    ]
+    scraper = _scraper(pages, known)
+
+    batches = list(scraper.iter_recruiters('engineering', 'Berlin'))
+
+    assert [[recruiter['name'] for recruiter in batch] for batch in batches] == [['Ana Lee']]
+    # The empty third page is where the search stops
+    assert scraper.backend.page == 2
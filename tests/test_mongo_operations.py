@@ -0,0 +1,279 @@
+"""MongoDB and AsyncMongoDB against a real mongod, or in-memory servers as a fallback
+
+With MONGODB_TEST_URI set, every test runs against that server in a throwaway
+database (dropped afterwards) with the indexes from INDEXES built, so the unique
+and partial indexes are exercised too. Without it the mongod runs are skipped and
+the same tests run on mongomock and mongomock-motor, which ignore
+partialFilterExpression and so run without indexes.
+
+Every test runs against both classes through call(), and test_sync_async_parity
+runs one whole pipeline through each and compares what they return.
+"""
+import os
+import uuid
+import inspect
+from datetime import datetime, timedelta
+
+import mongomock
+import pymongo
+import pytest
+import pytest_asyncio
+from bson import ObjectId
+from mongomock_motor import AsyncMongoMockClient
+
+from database import mongo_operations
+from database.mongo_operations import (
+    MongoDB, AsyncMongoDB, PENDING, EMAIL_FOUND, NO_EMAIL, EMAIL_QUEUED, EMAIL_SENT
+)
+
+pytestmark = pytest.mark.asyncio
+
+TEST_URI = os.getenv('MONGODB_TEST_URI')
+
+RECRUITERS = [
+    {'name': 'Jane Doe', 'company': 'Acme', 'status': PENDING,
+     'profile_url': 'https://www.linkedin.com/in/jane-doe?miniProfileUrn=1', 'created_at': datetime(2024, 1, 1)},
+    {'name': 'John Roe', 'company': 'Acme', 'status': PENDING,
+     'profile_url': 'https://www.linkedin.com/in/john-roe/', 'created_at': datetime(2024, 1, 2)},
+    {'name': 'Ana Lee', 'company': 'Globex', 'status': PENDING, 'created_at': datetime(2024, 1, 3)},
+]
+
+
+async def call(db, method: str, *args, **kwargs):
+    """Call a method on either class, awaiting it on AsyncMongoDB"""
+    result = getattr(db, method)(*args, **kwargs)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+@pytest.fixture(params=['mongod', 'mongomock'])
+def make_db(request, monkeypatch):
+    """Factory for MongoDB ('sync') or AsyncMongoDB ('async') on the server under test"""
+    if request.param == 'mongod' and not TEST_URI:
+        pytest.skip('MONGODB_TEST_URI is not set')
+    if request.param == 'mongomock' and TEST_URI:
+        pytest.skip('running against MONGODB_TEST_URI instead')
+
+    opened, databases = [], []
+
+    async def make(kind: str):
+        # A database of its own, so two instances in one test do not see each other's writes
+        databases.append(f'recruiter_bot_test_{uuid.uuid4().hex[:12]}')
+        monkeypatch.setenv('MONGODB_DATABASE', databases[-1])
+        if request.param == 'mongod':
+            monkeypatch.setenv('MONGODB_URI', TEST_URI)
+            if kind == 'sync':
+                db = MongoDB(ensure_indexes=True)
+            else:
+                db = AsyncMongoDB()
+                await db.ensure_indexes()
+        elif kind == 'sync':
+            monkeypatch.setattr(mongo_operations, 'MongoClient', lambda uri: mongomock.MongoClient())
+            # mongomock ignores partialFilterExpression, so the unique indexes would reject documents without a key
+            db = MongoDB(ensure_indexes=False)
+        else:
+            db = AsyncMongoDB(client=AsyncMongoMockClient())
+        opened.append(db)
+        return db
+
+    yield make
+    for db in opened:
+        db.close()
+    if request.param == 'mongod':
+        client = pymongo.MongoClient(TEST_URI)
+        for database in databases:
+            client.drop_database(database)
+        client.close()
+
+
+@pytest_asyncio.fixture(params=['sync', 'async'])
+async def db(request, make_db):
+    return await make_db(request.param)
+
+
+async def _seed(db):
+    results = await call(db, 'upsert_recruiters', RECRUITERS)
+    return [ObjectId(result['_id']) for result in results]
+
+
+async def test_upsert_recruiters_is_idempotent(db):
+    first = await call(db, 'upsert_recruiters', RECRUITERS)
+    assert [result['status'] for result in first] == ['inserted'] * 3
+
+    # New recruiters first: mongomock numbers upserts by their count rather than their position in the batch
+    rescraped = [
+        {'name': 'Bo Kim', 'company': 'Initech', 'status': PENDING, 'profile_url': 'https://www.linkedin.com/in/bo-kim'},
+        dict(RECRUITERS[0], profile_url='https://uk.linkedin.com/in/Jane-Doe/', status=EMAIL_SENT),
+        dict(RECRUITERS[2], status=EMAIL_SENT),
+    ]
+    second = await call(db, 'upsert_recruiters', rescraped)
+    assert [result['status'] for result in second] == ['inserted', 'existing', 'existing']
+
+    # Existing documents keep what they had
+    jane = await call(db, 'find_recruiter', {'_id': ObjectId(first[0]['_id'])})
+    assert jane['profile_url'] == 'https://www.linkedin.com/in/jane-doe'
+    assert jane['status'] == PENDING
+    assert await call(db.recruiters, 'count_documents', {}) == 4
+
+
+async def test_placeholder_profile_urls_are_not_stored(db):
+    scraped = [
+        {'name': 'Bo Kim', 'company': 'Initech', 'status': PENDING, 'profile_url': 'Unknown'},
+        {'name': 'Al Poe', 'company': 'Initech', 'status': PENDING, 'profile_url': 'Unknown'},
+    ]
+
+    results = await call(db, 'upsert_recruiters', scraped)
+
+    # Stored as 'Unknown', the second would be rejected by the unique profile_url index
+    assert [result['status'] for result in results] == ['inserted', 'inserted']
+    assert await call(db.recruiters, 'count_documents', {'profile_url': {'$exists': True}}) == 0
+
+
+async def test_transition_statuses(db):
+    jane, john, ana = await _seed(db)
+
+    results = await call(db, 'transition_statuses', [
+        {'recruiter_id': str(jane), 'status': EMAIL_FOUND},
+        {'recruiter_id': john, 'status': EMAIL_SENT},
+        {'recruiter_id': ana, 'status': PENDING},
+        {'recruiter_id': str(ObjectId()), 'status': NO_EMAIL},
+        {'recruiter_id': 'not-an-id', 'status': NO_EMAIL},
+    ])
+
+    assert results == [
+        {'status': 'updated'},
+        {'status': 'rejected', 'current': PENDING},
+        {'status': 'unchanged'},
+        {'status': 'not_found'},
+        {'status': 'error', 'error': "Invalid recruiter id: 'not-an-id'"},
+    ]
+    assert (await call(db, 'find_recruiter', {'_id': jane}))['status'] == EMAIL_FOUND
+    assert (await call(db, 'find_recruiter', {'_id': john}))['status'] == PENDING
+    assert await call(db, 'update_recruiter_status', str(jane), EMAIL_QUEUED)
+    assert not await call(db, 'update_recruiter_status', str(jane), PENDING)
+
+
+async def test_claim_release_complete(db):
+    jane, john, ana = await _seed(db)
+
+    claimed = await call(db, 'claim_batch', 'find_emails', 2, 60)
+    assert [recruiter['_id'] for recruiter in claimed] == [jane, john]
+    assert len({recruiter['lease_token'] for recruiter in claimed}) == 1
+    # A second worker only gets what is left
+    other = await call(db, 'claim_batch', 'find_emails', 5, 60)
+    assert [recruiter['_id'] for recruiter in other] == [ana]
+    assert await call(db, 'claim_batch', 'find_emails', 5, 60) == []
+
+    assert await call(db, 'release', other) == 1
+    results = await call(db, 'complete', claimed, [{'recruiter_id': str(jane), 'status': EMAIL_FOUND}])
+    assert results == [{'status': 'updated'}]
+
+    # John was released unfinished and Ana was handed back; Jane moved on to send_outreach
+    again = await call(db, 'claim_batch', 'find_emails', 5, 60)
+    assert [recruiter['_id'] for recruiter in again] == [john, ana]
+    outreach = await call(db, 'claim_batch', 'send_outreach', 5, 60)
+    assert [recruiter['_id'] for recruiter in outreach] == [jane]
+
+
+async def test_expired_lease_is_claimable_again(db):
+    await _seed(db)
+    stale = await call(db, 'claim_batch', 'find_emails', 1, -1)
+
+    taken_over = await call(db, 'claim_batch', 'find_emails', 1, 60)
+    assert [recruiter['_id'] for recruiter in taken_over] == [stale[0]['_id']]
+    # The worker whose lease expired cannot release the new holder's lease
+    assert await call(db, 'release', stale) == 0
+    assert await call(db, 'release', taken_over) == 1
+
+
+async def test_requeue_no_email_after_the_negative_ttl(db):
+    jane, john, ana = await _seed(db)
+    await call(db, 'transition_statuses', [{'recruiter_id': jane, 'status': NO_EMAIL},
+                                           {'recruiter_id': john, 'status': NO_EMAIL}])
+    await call(db.recruiters, 'update_one', {'_id': john}, {'$set': {'updated_at': datetime.utcnow() - timedelta(days=4)}})
+
+    assert await call(db, 'requeue_no_email', timedelta(days=3).total_seconds()) == 1
+    assert (await call(db, 'find_recruiter', {'_id': john}))['status'] == PENDING
+    assert (await call(db, 'find_recruiter', {'_id': jane}))['status'] == NO_EMAIL
+    # Requeued recruiters are claimed by the next find_emails run
+    claimed = await call(db, 'claim_batch', 'find_emails', 5, 60)
+    assert [recruiter['_id'] for recruiter in claimed] == [john, ana]
+
+
+async def test_emails_and_outreach(db):
+    jane, john, _ = await _seed(db)
+
+    stored = await call(db, 'insert_emails', [
+        {'recruiter_id': str(jane), 'email': 'old@acme.com'},
+        {'recruiter_id': str(jane), 'email': 'jane@acme.com'},
+        {'recruiter_id': str(john), 'email': 'john@acme.com'},
+    ])
+    assert [result['status'] for result in stored] == ['inserted'] * 3
+    emails = await call(db, 'get_emails_for_recruiters', [str(jane), str(john), str(ObjectId())])
+    assert {key: email['email'] for key, email in emails.items()} == {
+        str(jane): 'jane@acme.com', str(john): 'john@acme.com'
+    }
+
+    now = datetime.utcnow()
+    logged = await call(db, 'log_outreach_many', [
+        {'recruiter_id': str(jane), 'message_key': 'k1', 'created_at': now},
+        {'recruiter_id': str(john), 'created_at': now - timedelta(days=1)},
+    ])
+    assert [result['status'] for result in logged] == ['inserted', 'inserted']
+    retried = await call(db, 'log_outreach_many', [{'recruiter_id': str(jane), 'message_key': 'k1', 'created_at': now}])
+    assert retried == [{'status': 'duplicate'}]
+    assert await call(db, 'record_outreach', 'k2', {'recruiter_id': str(john), 'created_at': now})
+    assert not await call(db, 'record_outreach', 'k2', {'recruiter_id': str(john), 'created_at': now})
+
+    recent = await call(db, 'get_recent_outreach', 2)
+    assert [item.get('message_key') for item in recent] == ['k1', 'k2']
+
+
+async def test_aggregations(db):
+    jane, _, _ = await _seed(db)
+    await call(db, 'transition_statuses', [{'recruiter_id': jane, 'status': NO_EMAIL}])
+    await call(db, 'log_outreach_many', [
+        {'recruiter_id': str(jane), 'created_at': datetime(2024, 3, 1, 9)},
+        {'recruiter_id': str(jane), 'created_at': datetime(2024, 3, 1, 17)},
+        {'recruiter_id': str(jane), 'created_at': datetime(2024, 3, 2, 9)},
+    ])
+
+    assert await call(db, 'get_daily_activity') == [
+        {'date': '2024-03-01', 'count': 2}, {'date': '2024-03-02', 'count': 1}
+    ]
+    statuses = await call(db, 'get_status_distribution')
+    assert sorted(statuses, key=lambda item: item['status']) == [
+        {'status': NO_EMAIL, 'count': 1}, {'status': PENDING, 'count': 2}
+    ]
+    assert await call(db, 'get_company_distribution') == [
+        {'company': 'Acme', 'count': 2}, {'company': 'Globex', 'count': 1}
+    ]
+
+
+async def _pipeline(db):
+    """One pass through the recruiter pipeline, reduced to values both classes should agree on"""
+    upserted = await call(db, 'upsert_recruiters', RECRUITERS + RECRUITERS[:1])
+    ids = {result['_id'] for result in upserted if '_id' in result}
+    claimed = await call(db, 'claim_batch', 'find_emails', 2, 60)
+    transitions = [{'recruiter_id': str(claimed[0]['_id']), 'status': EMAIL_FOUND},
+                   {'recruiter_id': str(claimed[1]['_id']), 'status': EMAIL_SENT}]
+    completed = await call(db, 'complete', claimed, transitions)
+    pending = await call(db, 'get_pending_recruiters')
+    statuses = await call(db, 'get_status_distribution')
+    return {
+        'upserted': [result['status'] for result in upserted],
+        'ids': len(ids),
+        'claimed': [recruiter['name'] for recruiter in claimed],
+        'completed': completed,
+        'pending': [recruiter['name'] for recruiter in pending],
+        'statuses': sorted((item['status'], item['count']) for item in statuses),
+        'companies': await call(db, 'get_company_distribution'),
+    }
+
+
+async def test_sync_async_parity(make_db):
+    sync_db = await make_db('sync')
+    async_db = await make_db('async')
+
+    assert await _pipeline(sync_db) == await _pipeline(async_db)
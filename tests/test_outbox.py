@@ -0,0 +1,23 @@
+import mongomock
+
+from database.outbox import Outbox, message_key
+
+
+def _message(recruiter_id: str, email: str) -> dict:
+    return {'key': message_key(recruiter_id, 'initial', email), 'recruiter_id': recruiter_id,
+            'to_email': email, 'template': 'initial', 'template_data': {}}
+
+
+def test_live_addresses_skip_failed_messages():
+    outbox = Outbox(mongomock.MongoClient().db.outbox)
+    outbox.enqueue([_message('a', 'Jane@acme.com'), _message('b', 'john@acme.com'), _message('c', 'ana@acme.com')])
+
+    claimed = outbox.claim(limit=3, keys=[message_key('b', 'initial', 'john@acme.com')])
+    outbox.mark_failed(claimed[0], 'mailbox full', permanent=True)
+    claimed = outbox.claim(limit=3, keys=[message_key('c', 'initial', 'ana@acme.com')])
+    outbox.mark_sent(claimed[0])
+
+    # A sent message still counts; a failed one frees its address for another recruiter
+    assert outbox.live_addresses(['jane@acme.com', 'John@acme.com', 'ana@acme.com', 'bo@acme.com']) == {
+        'jane@acme.com', 'ana@acme.com'
+    }
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+
+import mongomock
+import pytest
+
+from database.suppression import SuppressionList, EMAIL, DOMAIN, BOUNCE, UNSUBSCRIBE, CONTACTED
+
+
+@pytest.fixture
+def collection():
+    return mongomock.MongoClient().db.suppressions
+
+
+def test_filter_checks_addresses_and_domains(collection):
+    suppression = SuppressionList(collection)
+    assert suppression.add_many([(EMAIL, ' Jane@Acme.com ', UNSUBSCRIBE), (DOMAIN, 'globex.com', BOUNCE)]) == 2
+    # An existing entry keeps its reason
+    assert suppression.add_email('jane@acme.com', BOUNCE) == 0
+
+    allowed, suppressed = suppression.filter(['JANE@acme.com', 'john@acme.com', 'ana@globex.com'])
+    assert allowed == ['john@acme.com']
+    assert suppressed == {'JANE@acme.com': UNSUBSCRIBE, 'ana@globex.com': BOUNCE}
+    assert suppression.get_stats() == {'email:unsubscribe': 1, 'domain:bounce': 1}
+
+
+def test_other_workers_entries_are_picked_up_on_refresh(collection):
+    reader = SuppressionList(collection, refresh_seconds=0)
+    writer = SuppressionList(collection)
+
+    writer.add_email('jane@acme.com', BOUNCE)
+    assert reader.reason('jane@acme.com') == BOUNCE
+
+
+def test_entries_committed_late_are_not_missed(collection):
+    reader = SuppressionList(collection, refresh_seconds=0)
+    collection.insert_one({'kind': EMAIL, 'value': 'first@acme.com', 'reason': BOUNCE, 'created_at': datetime.utcnow()})
+    assert reader.reason('first@acme.com') == BOUNCE
+
+    # Stamped before the reader's last load (a lagging clock, or a write that was
+    # still in flight) but only visible now
+    collection.insert_one({
+        'kind': EMAIL, 'value': 'late@acme.com', 'reason': BOUNCE,
+        'created_at': datetime.utcnow() - timedelta(minutes=2)
+    })
+    assert reader.reason('late@acme.com') == BOUNCE
+
+
+def test_refresh_reads_only_the_overlap_window(collection):
+    now = datetime.utcnow()
+    collection.insert_one({'kind': EMAIL, 'value': 'new@acme.com', 'reason': BOUNCE, 'created_at': now})
+    reader = SuppressionList(collection, refresh_seconds=0, overlap_seconds=60)
+
+    # Far older than the newest entry loaded, so outside what a refresh re-reads
+    collection.insert_one({
+        'kind': EMAIL, 'value': 'ancient@acme.com', 'reason': BOUNCE, 'created_at': now - timedelta(hours=1)
+    })
+    assert reader.reason('ancient@acme.com') is None
+    reader_after_restart = SuppressionList(collection)
+    assert reader_after_restart.reason('ancient@acme.com') == BOUNCE
+
+
+def test_current_reason_does_not_wait_for_a_refresh(collection):
+    reader = SuppressionList(collection, refresh_seconds=3600)
+    writer = SuppressionList(collection)
+
+    writer.add_many([(EMAIL, 'jane@acme.com', CONTACTED), (DOMAIN, 'globex.com', BOUNCE)])
+
+    assert reader.reason('jane@acme.com') is None
+    assert reader.current_reason(' Jane@Acme.com') == CONTACTED
+    assert reader.current_reason('ana@globex.com') == BOUNCE
+    assert reader.current_reason('john@acme.com') is None
+    # What was read is kept in the snapshot
+    assert reader.reason('jane@acme.com') == CONTACTED